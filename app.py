@@ -1,12 +1,22 @@
-# Home.py
+# app.py
+"""Single entry point: ``streamlit run app.py``.
+
+Pages are registered by file, so a page's script and its imports run only
+when someone opens it; the Home page never loads the dashboard's or the
+research template's dependencies.
+"""
 import streamlit as st
-from stock_dashbaord.stock_dashboard import stock_dashboard
 
 st.set_page_config(page_title="Main Dashboard", layout="wide")
 
-page = st.sidebar.selectbox("Go to Page", ["Home", "Stock Dashboard"])
 
-if page == "Home":
+def home():
     st.write("Welcome to the main dashboard!")
-elif page == "Stock Dashboard":
-    stock_dashboard()  # Calls your stock page
+
+
+pages = [
+    st.Page(home, title="Home", icon="🏠", default=True),
+    st.Page("stock_dashbaord/stock_dashboard.py", title="Stock Dashboard", icon="📊", url_path="stock_dashboard"),
+    st.Page("equity_research_template/equity_research_template.py", title="Equity Research", icon="📝", url_path="equity_research"),
+]
+st.navigation(pages).run()
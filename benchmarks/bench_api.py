@@ -0,0 +1,119 @@
+# bench_api.py
+"""HTTP API throughput for concurrent pollers: full payloads vs ETag 304s.
+
+    python -m benchmarks.bench_api [n_stocks] [clients] [requests_per_client]
+
+Starts the API on a scratch copy of a synthetic tree, then ``clients``
+keep-alive connections each send ``requests_per_client`` requests. The
+baseline is what a service does without the API: re-read sectors.json
+for every poll.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import write_tree
+from stock_dashbaord.api import HierarchyAPI, serve
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+
+
+def start_server(api):
+    """Run the API on its own loop in a thread; returns the port."""
+    ready = threading.Event()
+    port = []
+
+    def on_ready(server):
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve("127.0.0.1", 0, api, on_ready)), daemon=True)
+    thread.start()
+    ready.wait()
+    return port[0]
+
+
+async def request(reader, writer, method, target, headers=None, body=b""):
+    lines = [f"{method} {target} HTTP/1.1", "Host: bench", f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    payload = await reader.readexactly(int(response_headers.get("content-length", 0)))
+    return status, response_headers, payload
+
+
+async def load(port, clients, per_client, target, headers=None):
+    """(requests/s, bytes per response, {status: count}) for ``clients`` concurrent pollers."""
+    statuses = {}
+    received = 0
+
+    async def client():
+        nonlocal received
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for _ in range(per_client):
+            status, _, payload = await request(reader, writer, "GET", target, headers)
+            statuses[status] = statuses.get(status, 0) + 1
+            received += len(payload)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = clients * per_client
+    return total / elapsed, received / total, statuses
+
+
+async def main(port, clients, per_client, symbol):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, headers, _ = await request(reader, writer, "GET", "/sectors")
+    etag = headers["etag"]
+
+    cases = [
+        ("GET /sectors", "/sectors", None),
+        ("GET /sectors gzip", "/sectors", {"Accept-Encoding": "gzip"}),
+        ("GET /sectors If-None-Match", "/sectors", {"If-None-Match": etag}),
+        ("GET /sectors/<sector>", "/sectors/Sector%2000", None),
+        (f"GET /symbols/{symbol}", f"/symbols/{symbol}", None),
+    ]
+    for name, target, headers in cases:
+        rate, size, statuses = await load(port, clients, per_client, target, headers)
+        print(f"  {name:28s} {rate:9.0f} req/s  {size / 1024:9.1f}KB/response  {statuses}")
+
+    # A poller that saw the tree before an edit gets one 200, then 304s again
+    op = json.dumps({"op": "add_stock", "path": ["Sector 00", "Industry 00.00", "Sub-Industry 00.00.00"], "stock": "BENCH1"})
+    start = time.perf_counter()
+    status, headers, _ = await request(reader, writer, "POST", "/ops", body=op.encode())
+    commit_ms = (time.perf_counter() - start) * 1000
+    _, _, statuses = await load(port, clients, 1, "/sectors", {"If-None-Match": etag})
+    new_etag = headers["etag"]
+    _, _, after = await load(port, clients, 1, "/sectors", {"If-None-Match": new_etag})
+    print(f"  POST /ops add_stock: {status} in {commit_ms:.2f}ms; pollers with the old ETag {statuses}, "
+          f"with the new one {after}")
+    writer.close()
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    per_client = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    os.chdir(tempfile.mkdtemp())
+    write_tree("sectors.json", n_stocks)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        with open("sectors.json") as f:
+            json.load(f)
+    scrape = (time.perf_counter() - start) / 5
+    print(f"{n_stocks} stocks, {clients} clients x {per_client} requests, sectors.json {os.path.getsize('sectors.json') / 1024:.0f}KB")
+    print(f"  re-read sectors.json per poll  {1 / scrape:9.0f} polls/s")
+
+    api = HierarchyAPI(SharedHierarchy(JsonStore()))
+    asyncio.run(main(start_server(api), clients, per_client, "SYM00042"))
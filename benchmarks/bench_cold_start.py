@@ -0,0 +1,78 @@
+# bench_cold_start.py
+"""Cold start of app.py: time to first render of each page in a fresh process.
+
+    python -m benchmarks.bench_cold_start [repeat]
+
+Every sample is a new interpreter, so nothing is imported or cached yet.
+It imports Streamlit, renders Home (the default page), then opens the page
+being measured. Reported per page, best of ``repeat``:
+
+  import     importing streamlit and AppTest
+  home       first run of app.py (Home)
+  page       first run of the page after that: its imports plus its render
+  heavy      which of pandas / numpy / reportlab the process had loaded
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+PAGES = {
+    "Home": None,
+    "Stock Dashboard": "stock_dashbaord/stock_dashboard.py",
+    "Equity Research": "equity_research_template/equity_research_template.py",
+}
+HEAVY = ("pandas", "numpy", "reportlab")
+
+# Runs in the child process
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+set_log_level("error")
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.run()
+home = time.perf_counter()
+if sys.argv[2]:
+    at.switch_page(sys.argv[2]).run()
+page = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "home": home - imported,
+    "page": page - home,
+    "errors": [str(e.value) for e in at.exception],
+    "heavy": [m for m in sys.argv[3:] if m in sys.modules],
+}))
+"""
+
+
+def sample(page_path, workdir):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, str(REPO / "app.py"), page_path or "", *HEAVY],
+        cwd=workdir, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(REPO)},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    workdir = tempfile.mkdtemp()
+    shutil.copy(REPO / "sectors.json", workdir)
+    # The research page writes its indexes next to the reports, so give it a copy
+    os.environ["REPORTS_FOLDER"] = shutil.copytree(REPO / "equity_research_template" / "saved_reports",
+                                                   os.path.join(workdir, "saved_reports"))
+
+    for name, page_path in PAGES.items():
+        runs = [sample(page_path, workdir) for _ in range(repeat)]
+        if runs[0]["errors"]:
+            raise RuntimeError(f"{name} raised: {runs[0]['errors'][0]}")
+        best = {key: min(r[key] for r in runs) for key in ("import", "home", "page")}
+        print(f"{name:16s} import {best['import'] * 1000:7.1f}ms  home {best['home'] * 1000:7.1f}ms  "
+              f"page {best['page'] * 1000:7.1f}ms  heavy: {', '.join(runs[0]['heavy']) or '-'}")
@@ -0,0 +1,72 @@
+# bench_compact.py
+"""Nested dict/list hierarchy vs CompactUniverse: bytes per stock and traversal time.
+
+    python -m benchmarks.bench_compact [n_stocks]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_tree
+from stock_dashbaord.compact import CompactUniverse
+
+
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def stocks_per_sector_dict(sectors):
+    counts = {}
+    for sector, industries in sectors.items():
+        n = 0
+        for sub_data in industries.values():
+            if isinstance(sub_data, dict):
+                for stocks in sub_data.values():
+                    n += len(stocks)
+            elif isinstance(sub_data, list):
+                n += len(sub_data)
+        counts[sector] = n
+    return counts
+
+
+def symbols_dict(sectors):
+    out = []
+    for industries in sectors.values():
+        for sub_data in industries.values():
+            lists = sub_data.values() if isinstance(sub_data, dict) else [sub_data]
+            for stocks in lists:
+                out.extend(s["symbol"] if isinstance(s, dict) else s for s in stocks)
+    return out
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    for with_metadata in (False, True):
+        text = json.dumps(generate_tree(n_stocks, with_metadata=with_metadata))
+        sectors, dict_bytes = retained_bytes(lambda: json.loads(text))
+        universe, compact_bytes = retained_bytes(lambda: CompactUniverse.from_json(json.loads(text)))
+        assert universe.to_json() == sectors
+
+        shape = "dict stocks" if with_metadata else "str stocks "
+        print(f"{n_stocks} {shape}  bytes/stock: dict={dict_bytes / n_stocks:6.1f}  compact={compact_bytes / n_stocks:6.1f}")
+        print(f"{' ' * len(str(n_stocks))} {' ' * 11}  per-sector counts: dict={timed(lambda: stocks_per_sector_dict(sectors)) * 1000:7.2f}ms"
+              f"  compact={timed(universe.stocks_per_sector) * 1000:7.2f}ms")
+        print(f"{' ' * len(str(n_stocks))} {' ' * 11}  all symbols:       dict={timed(lambda: symbols_dict(sectors)) * 1000:7.2f}ms"
+              f"  compact={timed(universe.symbols) * 1000:7.2f}ms")
@@ -0,0 +1,102 @@
+# bench_fragments.py
+"""Rerun latency of sidebar interactions on a large tree: what a click reruns and how long it takes.
+
+    python -m benchmarks.bench_fragments [n_stocks] [modes ...]
+
+Two interactions, each timed as the best of ``REPEAT`` reruns:
+
+  browse      pick another sector in the "Add Stock" form's selectbox
+  add stock   type a new symbol and click "Add Stock"
+
+AppTest always replays a widget interaction as a full script run, whereas a
+browser reruns only the fragment holding the widget. When the page
+registered the form as a fragment the benchmark scopes the rerun the same
+way, so running it on a checkout without fragments measures the old
+full-page reruns. "elements" counts the deltas the rerun sent.
+"""
+import functools
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from streamlit.errors import StreamlitAPIException
+from streamlit.logger import set_log_level
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from benchmarks.bench_render import count_elements
+from benchmarks.synthetic import write_tree
+
+APP = Path(__file__).resolve().parent.parent / "stock_dashbaord" / "stock_dashboard.py"
+FORM = "add_forms"
+REPEAT = 5
+
+
+def rerun(at, fragment_key=None):
+    """Rerun ``at`` with its pending widget changes, scoped to ``fragment_key`` when the page has it."""
+    try:
+        fragment_ids = at._fragment_storage.resolve_target(fragment_key) if fragment_key else []
+    except StreamlitAPIException:
+        fragment_ids = []
+    scoped = functools.partial(RerunData, fragment_id_queue=fragment_ids, is_fragment_scoped_rerun=bool(fragment_ids))
+    start = time.perf_counter()
+    with mock.patch.object(local_script_runner, "RerunData", scoped):
+        at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"Dashboard raised: {at.exception[0].value}")
+    return elapsed, count_elements(at.main) + count_elements(at.sidebar), bool(fragment_ids)
+
+
+def full_run(at, mode):
+    at.session_state["render_mode"] = mode
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start
+
+
+def browse(at, mode, sectors):
+    best = (float("inf"), 0, False)
+    for i in range(REPEAT):
+        full_run(at, mode)
+        at.sidebar.selectbox(key="stock_sector_select").set_value(sectors[i % len(sectors)])
+        best = min(best, rerun(at, FORM))
+    return best
+
+
+def add_stock(at, mode, sectors):
+    best = (float("inf"), 0, False)
+    for i in range(REPEAT):
+        full_run(at, mode)
+        at.sidebar.selectbox(key="stock_sector_select").set_value(sectors[i % len(sectors)])
+        rerun(at, FORM)
+        full_run(at, mode)
+        direct = not any(s.key == "stock_subindustry_select" for s in at.sidebar.selectbox)
+        input_key, label = ("stock_input_direct", "Add Stock Directly") if direct else ("stock_input", "Add Stock")
+        at.sidebar.text_input(key=input_key).input(f"NEW{mode}{i:03d}")
+        button = next(b for b in at.sidebar.button if b.label == label)
+        button.click()
+        best = min(best, rerun(at, FORM))
+    return best
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    modes = sys.argv[2:] or ["Batched", "Lazy"]
+    set_log_level("error")
+    os.chdir(tempfile.mkdtemp())
+    write_tree("sectors.json", n_stocks)
+
+    for mode in modes:
+        at = AppTest.from_file(str(APP), default_timeout=600)
+        full_s = min(full_run(at, mode) for _ in range(REPEAT))
+        elements = count_elements(at.main) + count_elements(at.sidebar)
+        sectors = at.sidebar.selectbox(key="stock_sector_select").options
+        print(f"{n_stocks} stocks  {mode:8s} full rerun      {full_s * 1000:9.1f}ms  elements={elements}")
+        for name, interaction in (("browse", browse), ("add stock", add_stock)):
+            seconds, elements, scoped = interaction(at, mode, sectors)
+            print(f"{n_stocks} stocks  {mode:8s} {name:15s} {seconds * 1000:9.1f}ms  elements={elements}"
+                  f"  ({'fragment' if scoped else 'full'} rerun)")
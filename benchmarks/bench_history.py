@@ -0,0 +1,109 @@
+# bench_history.py
+"""Version history cost: memory per version, commits, diffs, undo and reload.
+
+    python -m benchmarks.bench_history [n_stocks] [n_versions]
+
+Builds ``n_versions`` single-stock edits on a synthetic tree through
+SharedHierarchy.commit and compares the structurally shared history with
+keeping a deep copy per version. The last line compacts the history to a
+quarter of its versions, as retention does once SECTORS_HISTORY_KEEP is
+exceeded. The diff compares two versions one edit
+apart, first as the history holds them (shared subtrees skipped) and then
+as separately loaded trees (every subtree walked).
+"""
+import copy
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_tree
+from stock_dashbaord.history import History, diff
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from stock_dashbaord.symbol_index import iter_stock_lists
+
+
+def traced(fn):
+    gc.collect()
+    tracemalloc.start()
+    kept = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return kept, current
+
+
+def edits(tree, n_versions, seed=0):
+    """Alternating adds and deletes of one stock each, spread over the tree's stock lists."""
+    rng = random.Random(seed)
+    paths = [path for path, _ in iter_stock_lists(tree)]
+    for n in range(n_versions):
+        path = list(rng.choice(paths))
+        yield {"op": "add_stock", "path": path, "stock": f"NEW{n:05d}"}
+        if n + 1 < n_versions:
+            yield {"op": "delete_stock", "path": path, "stock": f"NEW{n:05d}"}
+
+
+def load_history():
+    history = History("sectors.history")
+    history.catch_up()
+    return history
+
+
+def best_ms(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    n_versions = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    os.chdir(tempfile.mkdtemp())
+    write_tree("sectors.json", n_stocks)
+
+    model = SharedHierarchy(JsonStore(), History("sectors.history"))
+    ops = list(edits(model.sectors, n_versions))[:n_versions]
+    start = time.perf_counter()
+    for op in ops:
+        model.commit(op)
+    commit = (time.perf_counter() - start) / len(ops)
+    history = model.history
+    size = os.path.getsize("sectors.history")
+    print(f"{n_stocks} stocks, {len(history)} versions; history file {size / 2**20:.1f}MB")
+    print(f"  commit (journal + history)   {commit * 1000:8.2f}ms per edit")
+
+    _, tree_bytes = traced(lambda: json.loads(json.dumps(history.tree(0))))
+    # A deep copy shares the symbol strings, so a copied version costs only its containers
+    _, copy_bytes = traced(lambda: copy.deepcopy(history.tree(0)))
+    reloaded, history_bytes = traced(load_history)
+    per_version = (history_bytes - tree_bytes) / (len(reloaded) - 1)
+    print(f"  one tree as loaded           {tree_bytes / 2**20:8.2f}MB")
+    print(f"  shared history, all versions {history_bytes / 2**20:8.2f}MB "
+          f"({per_version / 1024:.1f}KB per version after the first)")
+    print(f"  deep copy per version        {(tree_bytes + copy_bytes * (len(reloaded) - 1)) / 2**20:8.2f}MB "
+          f"({copy_bytes / 1024:.1f}KB per version after the first)")
+    print(f"  reload history from file     {best_ms(load_history, 3):8.1f}ms")
+
+    old, new = history.tree(len(history) - 2), history.tree(len(history) - 1)
+    old_copy, new_copy = copy.deepcopy(old), copy.deepcopy(new)
+    assert diff(old, new) == diff(old_copy, new_copy)
+    print(f"  diff, shared subtrees skipped {best_ms(lambda: diff(old, new)):7.3f}ms")
+    print(f"  diff, full walk              {best_ms(lambda: diff(old_copy, new_copy)):8.1f}ms")
+    print(f"  diff, first vs last version  {best_ms(lambda: diff(history.tree(0), new)):8.1f}ms")
+
+    print(f"  undo                         {best_ms(lambda: (model.jump('undo'), model.jump('redo')), 3) / 2:8.1f}ms")
+
+    keep = len(history) // 4
+    start = time.perf_counter()
+    history.compact(keep)
+    compact = time.perf_counter() - start
+    print(f"  compact to the last {keep} versions {compact * 1000:6.1f}ms; file "
+          f"{os.path.getsize('sectors.history') / 2**20:.1f}MB, reloaded in {best_ms(load_history, 3):.1f}ms")
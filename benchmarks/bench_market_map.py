@@ -0,0 +1,71 @@
+# bench_market_map.py
+"""Market map vs the sector grid on large universes.
+
+    python -m benchmarks.bench_market_map [n_stocks ...]
+
+For each size: the vectorized treemap layout alone, then a full dashboard
+run per layout with mock quotes for every stock. "payload" is the
+serialized size of everything the page sent to the browser.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_render import count_elements
+from benchmarks.synthetic import generate_tree, write_tree
+from stock_dashbaord.analytics import QuoteTable
+from stock_dashbaord.market_map import treemap_layout
+from stock_dashbaord.quotes import MockQuoteProvider, QuoteEngine
+
+APP = Path(__file__).resolve().parent.parent / "stock_dashbaord" / "stock_dashboard.py"
+MODES = ("Market map", "Batched", "Lazy")
+
+
+def payload_bytes(node):
+    children = getattr(node, "children", None)
+    if not children:
+        proto = getattr(node, "proto", None)
+        return proto.ByteSize() if proto is not None else 0
+    return sum(payload_bytes(child) for child in children.values())
+
+
+def layout(n_stocks):
+    tree = generate_tree(n_stocks, with_metadata=True)
+    table = QuoteTable(tree)
+    table.update(QuoteEngine(MockQuoteProvider()).get_quotes(table.symbols))
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        treemap_layout(table)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(mode):
+    at = AppTest.from_file(str(APP), default_timeout=600)
+    at.session_state["render_mode"] = mode
+    at.run()  # first run builds the quote table and fills the quote cache
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{mode} raised: {at.exception[0].value}")
+    return elapsed, count_elements(at.main), payload_bytes(at.main)
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [5000, 50000]
+    set_log_level("error")
+    os.environ["QUOTES_PROVIDER"] = "mock"
+    os.chdir(tempfile.mkdtemp())
+    for n_stocks in sizes:
+        print(f"{n_stocks} stocks: treemap layout {layout(n_stocks) * 1000:.1f}ms")
+        write_tree("sectors.json", n_stocks, with_metadata=True)
+        for mode in MODES:
+            seconds, elements, size = run(mode)
+            print(f"  {mode:10s} rerun {seconds * 1000:8.1f}ms  elements={elements:6d}  payload={size / 1024:8.1f}KB")
@@ -0,0 +1,48 @@
+# bench_render.py
+"""Classic vs batched vs lazy sector grid: elements, HTML sent and run time.
+
+    python -m benchmarks.bench_render [n_stocks]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import write_tree
+
+APP = Path(__file__).resolve().parent.parent / "stock_dashbaord" / "stock_dashboard.py"
+
+
+def count_elements(node):
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def run(mode, n_stocks):
+    at = AppTest.from_file(str(APP), default_timeout=600)
+    at.session_state["render_mode"] = mode
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "elements": count_elements(at.main),
+        "markdown": len(at.markdown),
+        "html_bytes": sum(len(m.value.encode()) for m in at.markdown),
+        "seconds": round(elapsed, 3),
+    }
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    os.chdir(tempfile.mkdtemp())
+    write_tree("sectors.json", n_stocks)
+    for mode in ("Classic", "Batched", "Lazy"):
+        result = run(mode, n_stocks)
+        print(f"{n_stocks} stocks  {mode:8s} elements={result['elements']:6d}  "
+              f"markdown={result['markdown']:6d}  html={result['html_bytes'] / 1024:8.1f}KB  time={result['seconds']:.3f}s")
@@ -0,0 +1,81 @@
+# bench_report_index.py
+"""Listing saved equity reports with metadata: full JSON parse vs ReportIndex.
+
+    python -m benchmarks.bench_report_index [n_reports]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from equity_research_template.report_index import ReportIndex, filter_reports
+
+REPO = Path(__file__).resolve().parent.parent
+
+TEMPLATE = REPO / "equity_research_template" / "saved_reports" / "Reliance_Industries_2025-10-17.json"
+
+
+def write_reports(folder, n_reports, seed=0):
+    rng = random.Random(seed)
+    with open(TEMPLATE) as f:
+        template = json.load(f)
+    for n in range(n_reports):
+        report = dict(template)
+        report.update(
+            company_name=f"Company {n:05d}",
+            ticker=f"TICK{n:05d}",
+            report_date=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            recommendation=rng.choice(["Buy", "Hold", "Sell"]),
+            target_price=str(rng.randint(100, 5000)),
+        )
+        with open(os.path.join(folder, f"Company {n:05d}_{report['report_date']}.json"), "w") as f:
+            json.dump(report, f, indent=4)
+
+
+def parse_all(folder):
+    """What a metadata listing costs without an index: open every report."""
+    records = []
+    for name in os.listdir(folder):
+        if name.endswith(".json"):
+            with open(os.path.join(folder, name)) as f:
+                data = json.load(f)
+            records.append({k: data.get(k, "") for k in ("company_name", "ticker", "report_date", "recommendation")})
+    return records
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    folder = tempfile.mkdtemp()
+    write_reports(folder, n_reports)
+
+    _, listdir_s = timed(lambda: sorted((f for f in os.listdir(folder) if f.endswith(".json")), reverse=True))
+    _, parse_s = timed(lambda: parse_all(folder))
+    _, cold_s = timed(lambda: ReportIndex(folder).refresh())
+    records, warm_s = timed(lambda: ReportIndex(folder).refresh())
+    index = ReportIndex(folder)
+    index.refresh()
+    _, rerun_s = timed(index.refresh)
+    touched = os.path.join(folder, records[0]["file"])
+    mtime = os.stat(touched).st_mtime_ns + 10**9
+    os.utime(touched, ns=(mtime, mtime))
+    _, one_s = timed(index.refresh)
+    parsed = index.parsed
+    _, filter_s = timed(lambda: filter_reports(index.refresh(), "tick01", ["Buy"], "Rating"))
+
+    print(f"{n_reports} reports")
+    print(f"  os.listdir + sort (filenames only):   {listdir_s * 1000:8.2f}ms")
+    print(f"  parse every report for metadata:      {parse_s * 1000:8.2f}ms")
+    print(f"  ReportIndex cold build:               {cold_s * 1000:8.2f}ms")
+    print(f"  ReportIndex refresh, nothing changed: {warm_s * 1000:8.2f}ms  (new process, index from disk)")
+    print(f"  ReportIndex refresh, same process:    {rerun_s * 1000:8.2f}ms  (what a page rerun pays)")
+    print(f"  ReportIndex refresh, one file touched:{one_s * 1000:8.2f}ms  (parsed {parsed}, index rewritten)")
+    print(f"  refresh + filter + sort:              {filter_s * 1000:8.2f}ms")
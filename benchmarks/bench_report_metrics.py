@@ -0,0 +1,80 @@
+# bench_report_metrics.py
+"""Numeric screens over saved reports: re-parse every report vs the columnar MetricsIndex.
+
+    python -m benchmarks.bench_report_metrics [n_reports]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_report_index import write_reports
+from equity_research_template.report_index import ReportIndex, load_report
+from equity_research_template.report_metrics import MetricsIndex, parse_report
+
+SCREEN = "P/E FY26E < 20 and ROE > 10%"
+
+
+def vary_financials(folder, seed=0):
+    """Random P/E, ROE and EPS figures per report so screens select a real subset."""
+    rng = random.Random(seed)
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        report = load_report(path)
+        rows = [
+            ("EPS (₹)", [round(rng.uniform(5, 200), 1) for _ in range(3)]),
+            ("P/E (x)", [round(rng.uniform(5, 60), 1) for _ in range(3)]),
+            ("ROE (%)", [round(rng.uniform(0, 30), 1) for _ in range(3)]),
+        ]
+        report["key_financials"] = "Y/E March         FY24A    FY25E    FY26E\n" + "\n".join(
+            f"{label:<17}{a:<9}{b:<9}{c}" for label, (a, b, c) in rows
+        )
+        with open(path, "w") as f:
+            json.dump(report, f)
+
+
+def reparse_screen(folder):
+    """The screen without an index: open and parse every report."""
+    hits = []
+    for name in os.listdir(folder):
+        if name.endswith(".json"):
+            m = parse_report(load_report(os.path.join(folder, name)))
+            if m.get("pe_fy26e", float("nan")) < 20 and m.get("roe", float("nan")) > 10:
+                hits.append(name)
+    return hits
+
+
+def timed(fn, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+if __name__ == "__main__":
+    n_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    folder = tempfile.mkdtemp()
+    write_reports(folder, n_reports)
+    vary_financials(folder)
+    records = ReportIndex(folder).refresh()
+
+    expected, reparse_s = timed(lambda: reparse_screen(folder))
+    index = MetricsIndex(folder)
+    _, build_s = timed(lambda: index.sync(records))
+    index.save()
+    _, load_s = timed(lambda: MetricsIndex(folder))
+    (files, values), screen_s = timed(lambda: index.screen(SCREEN), repeat=5)
+
+    name = records[0]["file"]
+    report = load_report(os.path.join(folder, name))
+    _, update_s = timed(lambda: index.update(name, report))
+
+    print(f"{n_reports} reports, {len(index.columns)} metrics, screen {SCREEN!r}")
+    print(f"  re-parse every report:   {reparse_s * 1000:9.2f}ms")
+    print(f"  MetricsIndex cold build: {build_s * 1000:9.2f}ms  (load from disk {load_s * 1000:.2f}ms)")
+    print(f"  MetricsIndex screen:     {screen_s * 1000:9.2f}ms  ({len(files)} matches, identical: {sorted(files) == sorted(expected)})")
+    print(f"  update one saved report: {update_s * 1000:9.2f}ms")
@@ -0,0 +1,107 @@
+# bench_report_search.py
+"""Full-text search over saved reports: index build, incremental update and query latency.
+
+    python -m benchmarks.bench_report_search [n_reports]
+"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_report_index import write_reports
+from equity_research_template.report_index import ReportIndex, load_report
+from equity_research_template.report_search import SEARCH_FIELDS, SearchIndex, snippet, tokenize
+
+WORDS = (
+    "crude oil volatility risk margin refining demand supply regulatory capex debt leverage retail "
+    "digital telecom subscriber tariff growth valuation multiple discount premium earnings guidance "
+    "currency rupee inflation rate monsoon rural urban consumption export import freight steel cement "
+    "power renewable solar hydrogen battery governance board audit promoter pledge dividend buyback"
+).split()
+
+QUERIES = [
+    "crude oil volatility risk",
+    '"crude oil volatility"',
+    'risk:"oil volatility"',
+    "esg:governance",
+    "hydrogen battery pledge",
+]
+
+
+def vary_reports(folder, seed=0, vocab_size=5000):
+    """Replace the free-text sections with random prose so postings are not all identical.
+
+    Words follow a Zipf distribution over WORDS (the most common ranks) plus
+    filler words, roughly like real prose.
+    """
+    import json
+
+    rng = random.Random(seed)
+    vocab = WORDS + [f"word{i}" for i in range(vocab_size - len(WORDS))]
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        report = load_report(path)
+        for field in SEARCH_FIELDS:
+            report[field] = " ".join(rng.choices(vocab, cum_weights=weights, k=rng.randint(40, 160)))
+        with open(path, "w") as f:
+            json.dump(report, f)
+
+
+def brute_force(folder, query_terms):
+    """Files whose sections contain every term (no index), for a correctness check."""
+    hits = set()
+    for name in os.listdir(folder):
+        if name.endswith(".json"):
+            report = load_report(os.path.join(folder, name))
+            tokens = set(t for field in SEARCH_FIELDS for t in tokenize(str(report.get(field, ""))))
+            if all(t in tokens for t in query_terms):
+                hits.add(name)
+    return hits
+
+
+def timed(fn, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+if __name__ == "__main__":
+    n_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    folder = tempfile.mkdtemp()
+    write_reports(folder, n_reports)
+    vary_reports(folder)
+    records = ReportIndex(folder).refresh()
+
+    index = SearchIndex(folder)
+    _, build_s = timed(lambda: index.sync(records))
+    _, save_s = timed(index.save)
+    _, load_s = timed(lambda: SearchIndex(folder))
+    print(f"{n_reports} reports: build {build_s:.2f}s, save {save_s:.2f}s "
+          f"({os.path.getsize(index.path) / 1e6:.1f}MB), load {load_s:.2f}s, {len(index.vocab)} terms")
+
+    for query in QUERIES:
+        results, query_s = timed(lambda: index.search(query), repeat=5)
+        _, snippet_s = timed(lambda: [snippet(load_report(os.path.join(folder, f)), c) for f, _, c in results])
+        print(f"  {query!r:32s} {query_s * 1000:7.2f}ms  +{snippet_s * 1000:6.2f}ms snippets  ({len(results)} shown)")
+
+    # Incremental update of one report, as save_json() does
+    report_name = records[0]["file"]
+    report = load_report(os.path.join(folder, report_name))
+    report["risk_analysis"] = "zeppelin airship tariff shock"
+    import json
+    with open(os.path.join(folder, report_name), "w") as f:
+        json.dump(report, f)
+    _, update_s = timed(lambda: index.update(report_name, report))
+    found = [f for f, _, _ in index.search('risk:"airship tariff"')]
+    print(f"  update one report: {update_s * 1000:.2f}ms, found again: {found == [report_name]}")
+
+    # Correctness: AND query equals a brute-force scan
+    expected = brute_force(folder, ["hydrogen", "pledge", "monsoon"])
+    got = {f for f, _, _ in index.search("hydrogen pledge monsoon", limit=n_reports)}
+    print(f"  brute-force check: {len(expected)} matches, identical: {got == expected}")
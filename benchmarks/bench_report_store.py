@@ -0,0 +1,100 @@
+# bench_report_store.py
+"""Disk use and read latency of report versions: plain JSON vs the content-addressed store.
+
+    python -m benchmarks.bench_report_store [n_companies] [n_versions]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_report_search import WORDS
+from equity_research_template import report_store
+from equity_research_template.report_index import ReportIndex, load_report
+from equity_research_template.report_store import ObjectStore, version_history, write_report
+
+SECTIONS = ("company_overview", "investment_thesis", "financial_analysis", "valuation", "business_quality",
+            "risk_analysis", "esg", "technical", "conclusion")
+
+
+def prose(rng, n_words):
+    lines = []
+    while n_words > 0:
+        k = min(n_words, 12)
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(k)) + f" {rng.randint(1, 9999)}.")
+        n_words -= k
+    return "\n".join(lines)
+
+
+def edit(rng, text):
+    """A day's edit: rewrite one line and append another."""
+    lines = text.split("\n")
+    lines[rng.randrange(len(lines))] = prose(rng, 12)
+    return "\n".join(lines + [prose(rng, 12)])
+
+
+def save_versions(folder, n_companies, n_versions, seed=0):
+    rng = random.Random(seed)
+    for c in range(n_companies):
+        report = {"company_name": f"Company {c:04d}", "ticker": f"TICK{c:04d}", "recommendation": "Buy"}
+        report.update({section: prose(rng, rng.randint(200, 600)) for section in SECTIONS})
+        previous = None
+        for day in range(n_versions):
+            report["report_date"] = f"2025-{1 + day // 28:02d}-{1 + day % 28:02d}"
+            for section in rng.sample(SECTIONS, 2):
+                report[section] = edit(rng, report[section])
+            filename = f"{report['company_name']}_{report['report_date']}.json"
+            write_report(folder, filename, report, previous)
+            previous = filename
+    save_versions.last_date = report["report_date"]
+
+
+def folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder) for name in names)
+
+
+if __name__ == "__main__":
+    n_companies = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_versions = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    print(f"{n_companies} companies x {n_versions} daily saves, 2 sections edited per save")
+
+    results = {}
+    for mode in ("json", "sections"):
+        os.environ["REPORTS_STORAGE"] = mode
+        folder = tempfile.mkdtemp()
+        start = time.perf_counter()
+        save_versions(folder, n_companies, n_versions)
+        save_s = time.perf_counter() - start
+        files = sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+        results[mode] = folder
+        latest = [name for name in files if name.endswith(f"_{save_versions.last_date}.json")]
+
+        ObjectStore._cache.clear()
+        start = time.perf_counter()
+        for name in latest:
+            load_report(os.path.join(folder, name))
+        cold_ms = (time.perf_counter() - start) / len(latest) * 1000
+        start = time.perf_counter()
+        for name in latest:
+            load_report(os.path.join(folder, name))
+        warm_ms = (time.perf_counter() - start) / len(latest) * 1000
+        records = ReportIndex(folder).refresh()
+        start = time.perf_counter()
+        history = version_history(records, "Company 0000")
+        history_ms = (time.perf_counter() - start) * 1000
+
+        print(f"  {mode:8s} {folder_bytes(folder) / 1e6:7.2f}MB on disk, save {save_s / len(files) * 1000:.2f}ms/report, "
+              f"load latest {cold_ms:.2f}ms cold / {warm_ms:.2f}ms warm, history of {len(history)} in {history_ms:.2f}ms")
+
+    # Every version reconstructs to exactly what was saved
+    plain, packed = results["json"], results["sections"]
+    ObjectStore._cache.clear()
+    identical = all(
+        load_report(os.path.join(plain, name)) == load_report(os.path.join(packed, name))
+        for name in os.listdir(plain) if name.endswith(".json")
+    )
+    stats = report_store.stats(packed)
+    print(f"  all versions identical: {identical}; {stats['objects']} section objects, "
+          f"{stats['object_bytes'] / 1e6:.2f}MB objects + {stats['report_bytes'] / 1e6:.2f}MB manifests")
@@ -0,0 +1,58 @@
+# bench_shared_cache.py
+"""Per-session hierarchy copies vs one shared model: memory and parse time.
+
+    python -m benchmarks.bench_shared_cache [n_stocks]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_tree
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from stock_dashbaord.symbol_index import SymbolIndex
+
+SESSION_COUNTS = (1, 10, 50)
+
+
+def per_session(n_sessions):
+    """What every session used to do: its own load_data() and index."""
+    store = JsonStore()
+    sessions = []
+    start = time.perf_counter()
+    for _ in range(n_sessions):
+        sectors = store.load()
+        sessions.append((sectors, SymbolIndex(sectors)))
+    return sessions, time.perf_counter() - start
+
+
+def shared(n_sessions):
+    start = time.perf_counter()
+    model = SharedHierarchy(JsonStore())
+    sessions = [model.snapshot() for _ in range(n_sessions)]
+    return (model, sessions), time.perf_counter() - start
+
+
+def measure(fn, n_sessions):
+    gc.collect()
+    tracemalloc.start()
+    kept, seconds = fn(n_sessions)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current, peak, seconds
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    os.chdir(tempfile.mkdtemp())
+    write_tree("sectors.json", n_stocks)
+    print(f"{n_stocks} stocks")
+    for n_sessions in SESSION_COUNTS:
+        for label, fn in (("per-session", per_session), ("shared", shared)):
+            current, peak, seconds = measure(fn, n_sessions)
+            print(f"  {n_sessions:3d} sessions  {label:11s} resident={current / 2**20:7.1f}MB  "
+                  f"peak={peak / 2**20:7.1f}MB  load+parse={seconds * 1000:8.1f}ms")
@@ -0,0 +1,86 @@
+# bench_sparklines.py
+"""Price history lookups and sparkline cost.
+
+    python -m benchmarks.bench_sparklines [n_stocks] [days]
+
+Two parts:
+
+  one long series   five years of minute bars for one symbol: opening the
+                    memory map, slicing the sparkline window, downsampling
+                    it, and the markup size with and without LTTB
+  one sector        sector_html for a synthetic tree whose every stock has
+                    ``days`` of daily history: no sparklines, first render
+                    (sparklines built) and a repeat render (cached)
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_tree
+from stock_dashbaord.price_history import SPARKLINE_POINTS, PriceHistory, lttb, mock_history, sparkline_svg
+from stock_dashbaord.render import sector_html
+from stock_dashbaord.storage import stock_name
+from stock_dashbaord.symbol_index import iter_stock_lists
+
+MINUTES_PER_DAY = 375
+
+
+def best_ms(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def long_series(history):
+    n = 5 * 250 * MINUTES_PER_DAY
+    minute = np.arange(n)
+    times = 1_600_000_000 + 86400 * (minute // MINUTES_PER_DAY) + 60 * (minute % MINUTES_PER_DAY)
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.0005, n)))
+    history.append("LONG", times, prices)
+    size = os.path.getsize(history.path("LONG"))
+
+    window = history.window("LONG")
+    t, price = np.asarray(window["t"], dtype=float), np.asarray(window["price"], dtype=float)
+    keep = lttb(t, price, SPARKLINE_POINTS)
+    print(f"one series: {n} points ({size / 2**20:.1f}MB), sparkline window {len(window)} points")
+    print(f"  open memory map           {best_ms(lambda: history.series('LONG')):8.3f}ms")
+    print(f"  slice window              {best_ms(lambda: history.window('LONG')):8.3f}ms")
+    print(f"  LTTB to {SPARKLINE_POINTS} points         {best_ms(lambda: lttb(t, price, SPARKLINE_POINTS)):8.3f}ms")
+    print(f"  sparkline, first render   {best_ms(lambda: history._stock_svg('LONG')):8.3f}ms")
+    history.stock_sparkline("LONG")
+    print(f"  sparkline, cached         {best_ms(lambda: history.stock_sparkline('LONG')):8.3f}ms")
+    print(f"  markup: all window points {len(sparkline_svg(t, price)) / 1024:8.1f}KB, "
+          f"LTTB {len(sparkline_svg(t[keep], price[keep]))}B")
+
+
+def sector(history, n_stocks, days):
+    tree = generate_tree(n_stocks)
+    symbols = list(dict.fromkeys(stock_name(s) for _, stocks in iter_stock_lists(tree) for s in stocks))
+    start = time.perf_counter()
+    mock_history(history, symbols, days)
+    print(f"{n_stocks} stocks x {days} days: history written in {time.perf_counter() - start:.1f}s")
+
+    name, industries = next(iter(tree.items()))
+    n_sector = sum(len(stocks) for path, stocks in iter_stock_lists({name: industries}))
+    plain = best_ms(lambda: sector_html(name, industries))
+    start = time.perf_counter()
+    html = sector_html(name, industries, history=history)
+    first = (time.perf_counter() - start) * 1000
+    cached = best_ms(lambda: sector_html(name, industries, history=history))
+    print(f"  sector_html, {n_sector} stocks: no sparklines {plain:.1f}ms, first render {first:.1f}ms, "
+          f"cached {cached:.1f}ms; {html.count('<svg')} sparklines, "
+          f"{(len(html) - len(sector_html(name, industries))) / n_sector:.0f}B per stock")
+
+
+if __name__ == "__main__":
+    n_stocks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 750
+    history = PriceHistory(tempfile.mkdtemp())
+    long_series(history)
+    sector(history, n_stocks, days)
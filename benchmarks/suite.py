@@ -0,0 +1,176 @@
+# suite.py
+"""Load, save, stock formatting and full dashboard rerun timings as the tree grows.
+
+    python -m benchmarks.suite [--sizes 100 1000 5000 20000 50000] [--out results.json]
+    python -m benchmarks.suite --compare before.json after.json
+
+Each size writes a synthetic sectors.json (mixing direct-list and
+sub-industry industries) into a scratch directory and times:
+
+  load_data / save_data     the configured storage backend
+  format_stock_display      every stock in the tree, HTML only
+  rerun_cold / rerun_warm   stock_dashboard() in Streamlit's headless AppTest,
+                            first run after the file changed and later reruns
+
+Timings are the best of ``--repeat`` runs, in seconds. Results are written as
+JSON with enough metadata (commit, versions, generator parameters) to compare
+two runs; ``--compare`` prints the ratio for every shared measurement.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import streamlit as st
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import generate_tree
+from stock_dashbaord import storage
+from stock_dashbaord.render import RENDER_MODES, format_stock_display
+from stock_dashbaord.symbol_index import iter_stock_lists
+
+REPO = Path(__file__).resolve().parent.parent
+SIZES = (100, 1000, 5000, 20000, 50000)
+METRICS = ("load_data", "save_data", "format_stock_display", "rerun_cold", "rerun_warm")
+
+# AppTest runs this as the page script
+DASHBOARD_SCRIPT = """
+from stock_dashbaord.stock_dashboard import stock_dashboard
+stock_dashboard()
+"""
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def format_all(sectors):
+    for _, stocks in iter_stock_lists(sectors):
+        for stock in stocks:
+            format_stock_display(stock)
+
+
+def rerun_timings(mode, repeat):
+    at = AppTest.from_string(DASHBOARD_SCRIPT, default_timeout=600)
+    at.session_state["render_mode"] = mode
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"Dashboard raised: {at.exception[0].value}")
+    return cold, best_of(at.run, repeat)
+
+
+def run_size(n_stocks, tree_args, mode, repeat):
+    # Start each size from a clean process-wide model and store
+    st.cache_resource.clear()
+    storage._store = None
+    storage.save_data(generate_tree(n_stocks, **tree_args))
+
+    sectors = storage.load_data()
+    cold, warm = rerun_timings(mode, repeat)
+    return {
+        "n_stocks": n_stocks,
+        "file_bytes": sum(f.stat().st_size for f in Path().iterdir() if f.name.startswith("sectors.")),
+        "load_data": best_of(storage.load_data, repeat),
+        "save_data": best_of(lambda: storage.save_data(sectors), repeat),
+        "format_stock_display": best_of(lambda: format_all(sectors), repeat),
+        "rerun_cold": cold,
+        "rerun_warm": warm,
+    }
+
+
+def metadata(args, tree_args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "platform": platform.platform(),
+        "backend": os.environ.get("SECTORS_BACKEND", "json"),
+        "render_mode": args.mode,
+        "repeat": args.repeat,
+        "tree": tree_args,
+    }
+
+
+def compare(before_file, after_file):
+    with open(before_file) as f:
+        before = {r["n_stocks"]: r for r in json.load(f)["results"]}
+    with open(after_file) as f:
+        after = json.load(f)["results"]
+    print(f"{'stocks':>8}  " + "  ".join(f"{m:>22}" for m in METRICS))
+    for row in after:
+        old = before.get(row["n_stocks"])
+        if old is None:
+            continue
+        cells = []
+        for metric in METRICS:
+            if metric in old and metric in row and old[metric]:
+                cells.append(f"{old[metric]:9.4f} -> x{row[metric] / old[metric]:5.2f}")
+            else:
+                cells.append(" " * 22)
+        print(f"{row['n_stocks']:>8}  " + "  ".join(f"{c:>22}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic-load benchmark suite for the stock dashboard.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--sectors", type=int, default=12)
+    parser.add_argument("--industries", type=int, default=5, help="industries per sector")
+    parser.add_argument("--subs", type=int, default=4, help="sub-industries per dict-shaped industry")
+    parser.add_argument("--direct-ratio", type=float, default=0.25, help="share of industries listing stocks directly")
+    parser.add_argument("--metadata", action="store_true", help="dict stocks with name/price/change/market_cap")
+    parser.add_argument("--mode", choices=RENDER_MODES, default=RENDER_MODES[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    tree_args = {
+        "n_sectors": args.sectors,
+        "industries_per_sector": args.industries,
+        "subs_per_industry": args.subs,
+        "direct_ratio": args.direct_ratio,
+        "with_metadata": args.metadata,
+    }
+    out = Path(args.out).resolve()
+    # Clearing caches outside a script run logs a harmless warning per call
+    set_log_level("error")
+    # The pages resolve sectors.json relative to the working directory
+    sys.path.insert(0, str(REPO))
+    os.chdir(tempfile.mkdtemp())
+    report = {"meta": metadata(args, tree_args), "results": []}
+    for n_stocks in args.sizes:
+        result = run_size(n_stocks, tree_args, args.mode, args.repeat)
+        report["results"].append(result)
+        print(f"{n_stocks:>6} stocks  " + "  ".join(f"{m}={result[m] * 1000:9.2f}ms" for m in METRICS), flush=True)
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
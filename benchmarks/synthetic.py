@@ -0,0 +1,47 @@
+# synthetic.py
+"""Synthetic sectors.json-shaped trees for benchmarks."""
+import json
+import random
+
+
+def generate_tree(n_stocks, n_sectors=12, industries_per_sector=5, subs_per_industry=4,
+                  direct_ratio=0.25, with_metadata=False, seed=0):
+    """Build a hierarchy holding ``n_stocks`` symbols.
+
+    Roughly ``direct_ratio`` of industries list their stocks directly (the
+    list shape); the rest use sub-industry dicts. Stocks are spread evenly
+    over all stock lists, as bare symbols or, with ``with_metadata``, as
+    dicts carrying name, price, change and market_cap.
+    """
+    rng = random.Random(seed)
+    tree = {}
+    stock_lists = []
+    for s in range(n_sectors):
+        industries = tree[f"Sector {s:02d}"] = {}
+        for i in range(industries_per_sector):
+            name = f"Industry {s:02d}.{i:02d}"
+            if rng.random() < direct_ratio:
+                industries[name] = []
+                stock_lists.append(industries[name])
+            else:
+                subs = industries[name] = {}
+                for k in range(subs_per_industry):
+                    subs[f"Sub-Industry {s:02d}.{i:02d}.{k:02d}"] = []
+                    stock_lists.append(subs[f"Sub-Industry {s:02d}.{i:02d}.{k:02d}"])
+    for n in range(n_stocks):
+        stock = f"SYM{n:05d}"
+        if with_metadata:
+            stock = {
+                "symbol": stock,
+                "name": f"Company {n:05d} Ltd",
+                "price": round(rng.uniform(10, 5000), 2),
+                "change": round(rng.uniform(-5, 5), 2),
+                "market_cap": round(rng.uniform(100, 500000), 2),
+            }
+        stock_lists[n % len(stock_lists)].append(stock)
+    return tree
+
+
+def write_tree(path, n_stocks, **kwargs):
+    with open(path, "w") as f:
+        json.dump(generate_tree(n_stocks, **kwargs), f, indent=4)
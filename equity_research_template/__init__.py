@@ -0,0 +1,2 @@
+# __init__.py
+"""Equity research report template: the Streamlit page and its report storage, search and export modules."""
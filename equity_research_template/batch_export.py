@@ -0,0 +1,124 @@
+# batch_export.py
+"""Batch PDF export of saved equity research reports.
+
+    python -m equity_research_template.batch_export [report.json ...] [--out DIR] [--workers N]
+
+With no report files every report in saved_reports/ is exported. Reports
+are rendered in a process pool (one worker per core by default), each
+worker writes its PDF as soon as it is done, and the totals are reported
+as reports per second. Reports whose content has not changed since their
+last render are copied from the PDF cache instead of re-rendered.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from equity_research_template.pdf_cache import PdfCache
+from equity_research_template.pdf_render import render_report_pdf
+from equity_research_template.report_index import load_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXPORT_FOLDER = os.path.join(HERE, "exported_pdfs")
+# Reports handed to a worker per task; amortises the IPC round trip
+CHUNK_REPORTS = 8
+
+
+def export_path(report_path, out_dir):
+    """PDF path for a report; named after the JSON file so exports never collide."""
+    stem = os.path.splitext(os.path.basename(report_path))[0]
+    return os.path.join(out_dir, f"{stem}_Equity_Research.pdf")
+
+
+def _export_chunk(report_paths, out_dir, cache_folder=None):
+    """Render and write one chunk of reports; returns [(report_path, (size, cached) or error)]."""
+    cache = PdfCache(cache_folder) if cache_folder else None
+    results = []
+    for report_path in report_paths:
+        try:
+            report = load_report(report_path)
+            if cache:
+                pdf, cached = cache.get_or_render(report)
+            else:
+                pdf, cached = render_report_pdf(report), False
+            with open(export_path(report_path, out_dir), "wb") as f:
+                f.write(pdf)
+            results.append((report_path, (len(pdf), cached)))
+        except (OSError, ValueError) as e:
+            results.append((report_path, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def export_reports(report_paths, out_dir, workers=None, progress=None, cache_folder=None):
+    """Export ``report_paths`` to PDFs in ``out_dir``; returns a stats dict.
+
+    ``progress`` is called as ``progress(done, total)`` as chunks finish.
+    With ``cache_folder`` unchanged reports come from that folder's PdfCache.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    report_paths = list(report_paths)
+    workers = workers or os.cpu_count() or 1
+    stats = {"reports": len(report_paths), "exported": 0, "bytes": 0, "cached": 0, "failed": {}, "seconds": 0.0, "workers": workers}
+    start = time.perf_counter()
+
+    def collect(results):
+        for report_path, outcome in results:
+            if isinstance(outcome, tuple):
+                stats["exported"] += 1
+                stats["bytes"] += outcome[0]
+                stats["cached"] += outcome[1]
+            else:
+                stats["failed"][report_path] = outcome
+        if progress:
+            progress(stats["exported"] + len(stats["failed"]), stats["reports"])
+
+    chunks = [report_paths[i:i + CHUNK_REPORTS] for i in range(0, len(report_paths), CHUNK_REPORTS)]
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            collect(_export_chunk(chunk, out_dir, cache_folder))
+    else:
+        # spawn, not fork: the Streamlit server is multi-threaded
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+            futures = [pool.submit(_export_chunk, chunk, out_dir, cache_folder) for chunk in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def format_stats(stats):
+    rate = stats["exported"] / stats["seconds"] if stats["seconds"] else 0.0
+    text = (
+        f"{stats['exported']} of {stats['reports']} PDFs exported in {stats['seconds']:.1f}s "
+        f"({rate:.1f} reports/s, {stats['cached']} from cache, {stats['bytes'] / 1e6:.1f}MB, {stats['workers']} workers)"
+    )
+    if stats["failed"]:
+        text += f", {len(stats['failed'])} failed"
+    return text
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render saved equity research reports to PDF in parallel.")
+    parser.add_argument("reports", nargs="*", help="report JSON files (default: every file in saved_reports/)")
+    parser.add_argument("--out", default=EXPORT_FOLDER, help="output folder")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--no-cache", action="store_true", help="re-render every PDF, bypassing the PDF cache")
+    args = parser.parse_args()
+
+    folder = os.path.join(HERE, "saved_reports")
+    reports = args.reports
+    if not reports:
+        reports = sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".json"))
+
+    def report(done, total):
+        print(f"\r{done}/{total} reports", end="", file=sys.stderr, flush=True)
+
+    stats = export_reports(reports, args.out, args.workers, report, None if args.no_cache else folder)
+    print(file=sys.stderr)
+    for path, error in stats["failed"].items():
+        print(f"failed: {path}: {error}", file=sys.stderr)
+    print(format_stats(stats))
@@ -1,169 +1,289 @@
-import streamlit as st
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from io import BytesIO
-import json
 import os
-from datetime import datetime
-
-# Setup folder
-REPORT_FOLDER = "saved_reports"
-os.makedirs(REPORT_FOLDER, exist_ok=True)
-
-st.set_page_config(layout="wide")
-st.title("Professional Equity Research Template Manager")
-
-# ------------------------
-# Load previous report
-st.sidebar.header("Load Previous Report")
-all_files = [f for f in os.listdir(REPORT_FOLDER) if f.endswith(".json")]
-all_files.sort(reverse=True)
-selected_file = st.sidebar.selectbox("Select a report to load", ["New Report"] + all_files)
-
-data = {}
-if selected_file != "New Report":
-    file_path = os.path.join(REPORT_FOLDER, selected_file)
-    with open(file_path, "r") as f:
-        data = json.load(f)
-    st.sidebar.success(f"Loaded report: {selected_file}")
-
-# ------------------------
-# 0. Report Date
-st.header("Report Date")
-report_date = st.text_input("Report Date (YYYY-MM-DD)", data.get("report_date",""))
-if st.button("Use Today's Date"):
-    report_date = datetime.now().strftime("%Y-%m-%d")
-    st.success(f"Report Date set: {report_date}")
-
-# ------------------------
-# 1. Company Overview
-st.header("1. Company Overview")
-company_overview_text = st.text_area("Paste Company Overview Table Here", data.get("company_overview",""), height=150)
-col1, col2, col3 = st.columns(3)
-company_name = col1.text_input("Company Name", data.get("company_name",""))
-ticker = col2.text_input("Ticker Symbol", data.get("ticker",""))
-recommendation = col3.selectbox("Recommendation", ["Buy", "Hold", "Sell"], index=["Buy","Hold","Sell"].index(data.get("recommendation","Buy")))
-
-# ------------------------
-# 2. Investment Thesis
-st.header("2. Investment Thesis")
-investment_thesis_text = st.text_area("Paste Investment Thesis / Table", data.get("investment_thesis",""), height=150)
-
-# ------------------------
-# 3. Financial Analysis
-st.header("3. Financial Analysis")
-financial_text = st.text_area("Paste Financial Table / Ratios", data.get("financial_analysis",""), height=150)
-
-# ------------------------
-# 4. Valuation
-st.header("4. Valuation")
-valuation_text = st.text_area("Paste Valuation Table / DCF / Relative Valuation", data.get("valuation",""), height=150)
-
-# ------------------------
-# 5. Business Quality Assessment
-st.header("5. Business Quality Assessment")
-business_quality_text = st.text_area("Paste Business Quality Table / Notes", data.get("business_quality",""), height=150)
-
-# ------------------------
-# 6. Risk Analysis
-st.header("6. Risk Analysis")
-risk_text = st.text_area("Paste Risk Analysis Table / Notes", data.get("risk_analysis",""), height=150)
-
-# ------------------------
-# 7. ESG / Sustainability
-st.header("7. ESG / Sustainability")
-esg_text = st.text_area("Paste ESG / Sustainability Table / Notes", data.get("esg",""), height=150)
-
-# ------------------------
-# 8. Technical / Trading Notes
-st.header("8. Technical / Trading Notes")
-technical_text = st.text_area("Paste Technical Analysis / Charts / Levels", data.get("technical",""), height=150)
-
-# ------------------------
-# 9. Conclusion
-st.header("9. Conclusion")
-conclusion_text = st.text_area("Paste Final Recommendation / Notes / Horizon", data.get("conclusion",""), height=150)
-
-# ------------------------
-# PDF Generation
-def generate_pdf():
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)  # Portrait A4
-    width, height = A4
-    x_margin = 40
-    y_margin = 50
-    y = height - y_margin
-
-    def write_section(title, text, bold=True, size=14):
-        nonlocal y
-        c.setFont("Helvetica-Bold" if bold else "Courier", size)
-        c.setFillColor(colors.darkblue if bold else colors.black)
-        c.drawString(x_margin, y, title)
-        y -= 20
-        c.setFont("Courier", 11)
-        for line in text.splitlines():
-            c.drawString(x_margin + 10, y, line)
-            y -= 15
-            if y < y_margin:
-                c.showPage()
-                y = height - y_margin
-
-    # Report Date
-    write_section(f"Report Date: {report_date}", "", bold=False, size=12)
-
-    # Sections
-    write_section("1. Company Overview", company_overview_text)
-    write_section("Key Info", f"Company: {company_name} | Ticker: {ticker} | Recommendation: {recommendation}", bold=False)
-    write_section("2. Investment Thesis", investment_thesis_text)
-    write_section("3. Financial Analysis", financial_text)
-    write_section("4. Valuation", valuation_text)
-    write_section("5. Business Quality Assessment", business_quality_text)
-    write_section("6. Risk Analysis", risk_text)
-    write_section("7. ESG / Sustainability", esg_text)
-    write_section("8. Technical / Trading Notes", technical_text)
-    write_section("9. Conclusion", conclusion_text)
-
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer
-
-# ------------------------
-# Save JSON Data
-def save_json():
-    data_to_save = {
-        "report_date": report_date,
-        "company_overview": company_overview_text,
-        "company_name": company_name,
-        "ticker": ticker,
-        "recommendation": recommendation,
-        "investment_thesis": investment_thesis_text,
-        "financial_analysis": financial_text,
-        "valuation": valuation_text,
-        "business_quality": business_quality_text,
-        "risk_analysis": risk_text,
-        "esg": esg_text,
-        "technical": technical_text,
-        "conclusion": conclusion_text
-    }
-    filename = f"{company_name}_{report_date}.json"
-    path = os.path.join(REPORT_FOLDER, filename)
-    with open(path, "w") as f:
-        json.dump(data_to_save, f, indent=4)
-    return path
-
-# ------------------------
-if st.button("Save & Download Professional PDF"):
-    if report_date == "":
-        st.warning("Please set a report date (or click 'Use Today's Date').")
-    else:
-        pdf_buffer = generate_pdf()
-        json_file = save_json()
-        st.success(f"Data saved: {json_file}")
-        st.download_button(
-            "Download PDF",
-            data=pdf_buffer,
-            file_name=f"{company_name}_{report_date}_Equity_Research.pdf",
-            mime="application/pdf"
+
+import streamlit as st
+
+from equity_research_template.report_index import (
+    RATINGS, SORT_KEYS, ReportIndex, filter_reports, load_report, report_label,
+)
+from equity_research_template.report_metrics import MetricsIndex, format_value
+from equity_research_template.report_search import SearchIndex, snippet
+from equity_research_template.report_store import section_digests, version_history, write_report
+from stock_dashbaord.instrumentation import start_rerun
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def equity_research(profiler):
+    profiler.phase("imports")
+    from equity_research_template.pdf_cache import PdfCache
+    from equity_research_template.pdf_render import pdf_filename
+    from equity_research_template.batch_export import EXPORT_FOLDER, export_reports, format_stats as format_export_stats
+    from io import BytesIO
+    from datetime import datetime
+
+    # Setup folder, next to this file whatever directory the app was started from
+    REPORT_FOLDER = os.environ.get("REPORTS_FOLDER", os.path.join(HERE, "saved_reports"))
+    os.makedirs(REPORT_FOLDER, exist_ok=True)
+
+    st.set_page_config(layout="wide")
+    st.title("Professional Equity Research Template Manager")
+
+    # ------------------------
+    # Load previous report
+    profiler.phase("load report")
+    st.sidebar.header("Load Previous Report")
+
+    @st.cache_resource
+    def get_report_index(folder):
+        return ReportIndex(folder)
+
+    # Metadata only; report bodies are opened just for the selected report
+    report_index = get_report_index(os.path.abspath(REPORT_FOLDER))
+    records = report_index.refresh()
+    report_filter = st.sidebar.text_input("Filter by ticker or company", key="report_filter")
+    report_ratings = st.sidebar.multiselect("Rating", RATINGS, key="report_ratings")
+    report_sort = st.sidebar.selectbox("Sort by", list(SORT_KEYS), key="report_sort")
+    matches = filter_reports(records, report_filter, report_ratings, report_sort)
+    labels = {r["file"]: report_label(r) for r in matches}
+    selected_file = st.sidebar.selectbox(
+        "Select a report to load", ["New Report"] + list(labels), format_func=lambda f: labels.get(f, f),
+        key="report_select",
+    )
+    st.sidebar.caption(f"{len(matches)} of {len(records)} reports")
+
+    @st.cache_data(max_entries=2000)
+    def get_section_digests(path, mtime_ns, size):
+        # Keyed on the file's mtime and size too, so only new or rewritten saves are read again
+        return section_digests(path)
+
+    data = {}
+    if selected_file != "New Report":
+        data = load_report(os.path.join(REPORT_FOLDER, selected_file))
+        st.sidebar.success(f"Loaded report: {selected_file}")
+        versions = version_history(records, str(data.get("company_name", "")).strip())
+        if len(versions) > 1:
+            with st.sidebar.expander(f"Version history ({len(versions)} saves)"):
+                previous = {}
+                for version in versions:
+                    digests = get_section_digests(
+                        os.path.join(REPORT_FOLDER, version["file"]), version["mtime_ns"], version["size"],
+                    )
+                    changed = [k for k in digests.keys() | previous.keys() if digests.get(k) != previous.get(k)]
+                    marker = " ← loaded" if version["file"] == selected_file else ""
+                    summary = ", ".join(sorted(changed)) if previous else "first save"
+                    st.markdown(f"**{version['report_date']}**{marker}  \n{summary or 'no section changes'}")
+                    previous = digests
+
+    # ------------------------
+    # Full-text search
+    profiler.phase("search")
+    st.sidebar.header("Search Reports")
+
+    @st.cache_resource
+    def get_search_index(folder):
+        return SearchIndex(folder)
+
+    def open_report(filename):
+        # Clear the filters so the selectbox offers the report, then select it
+        st.session_state["report_filter"] = ""
+        st.session_state["report_ratings"] = []
+        st.session_state["report_select"] = filename
+
+    search_index = get_search_index(os.path.abspath(REPORT_FOLDER))
+    search_query = st.sidebar.text_input(
+        "Search thesis, risks, valuation, ESG...",
+        key="report_search",
+        help='Words must all match. Use "quotes" for phrases and risk:, thesis:, valuation:, esg:, tech:, conclusion: to search one section.',
+    )
+    if search_query.strip():
+        # Only reports saved outside this app (or before the index existed) are parsed here
+        search_index.sync(records)
+        search_index.save()
+        record_by_file = {r["file"]: r for r in records}
+        results = search_index.search(search_query)
+        st.sidebar.caption(f"{len(results)} matching reports" if results else "No matching reports")
+        for i, (filename, score, clauses) in enumerate(results):
+            section, text = snippet(load_report(os.path.join(REPORT_FOLDER, filename)), clauses)
+            record = record_by_file.get(filename)
+            st.sidebar.markdown(f"**{report_label(record) if record else filename}**")
+            if text:
+                st.sidebar.caption(f"{section}: {text}")
+            st.sidebar.button("Open", key=f"open_result_{i}", on_click=open_report, args=(filename,))
+
+    # ------------------------
+    # Numeric screener
+    profiler.phase("screener")
+    st.sidebar.header("Screen Reports")
+
+    @st.cache_resource
+    def get_metrics_index(folder):
+        return MetricsIndex(folder)
+
+    metrics_index = get_metrics_index(os.path.abspath(REPORT_FOLDER))
+    screen = st.sidebar.text_input(
+        "Screen on financials",
+        key="report_screen",
+        placeholder="pe_fy26e < 20 and roe > 10%",
+        help="Metrics are table row + column, e.g. pe_fy26e, eps_q2fy25, o2c_margin; a bare row (roe) is its furthest fiscal year. Combine comparisons with and / or and parentheses; compare two metrics with target_price > cmp.",
+    )
+    if screen.strip():
+        metrics_index.sync(records)
+        metrics_index.save()
+        try:
+            screened, screened_values = metrics_index.screen(screen)
+        except ValueError as e:
+            st.sidebar.error(str(e))
+        else:
+            st.sidebar.caption(f"{len(screened)} of {len(records)} reports match")
+            if screened:
+                record_by_file = {r["file"]: r for r in records}
+                st.sidebar.dataframe(
+                    {
+                        "Report": [report_label(record_by_file[f]) if f in record_by_file else f for f in screened],
+                        **{name: [format_value(v) for v in values] for name, values in screened_values.items()},
+                    },
+                    hide_index=True,
+                )
+
+    # ------------------------
+    # Batch PDF export
+    profiler.phase("batch export")
+    st.sidebar.header("Batch Export")
+    st.sidebar.caption(f"Renders the {len(matches)} listed reports to PDF in {os.path.basename(EXPORT_FOLDER)}/, one worker process per core.")
+    if st.sidebar.button("Export listed reports to PDF", disabled=not matches):
+        export_bar = st.sidebar.progress(0.0, text="Exporting PDFs...")
+        export_stats = export_reports(
+            [os.path.join(REPORT_FOLDER, r["file"]) for r in matches],
+            EXPORT_FOLDER,
+            cache_folder=REPORT_FOLDER,
+            progress=lambda done, total: export_bar.progress(done / total, text=f"Exported {done}/{total}"),
         )
+        export_bar.empty()
+        (st.sidebar.warning if export_stats["failed"] else st.sidebar.success)(format_export_stats(export_stats))
+
+    # ------------------------
+    # 0. Report Date
+    profiler.phase("form")
+    st.header("Report Date")
+    report_date = st.text_input("Report Date (YYYY-MM-DD)", data.get("report_date",""))
+    if st.button("Use Today's Date"):
+        report_date = datetime.now().strftime("%Y-%m-%d")
+        st.success(f"Report Date set: {report_date}")
+
+    # ------------------------
+    # 1. Company Overview
+    st.header("1. Company Overview")
+    company_overview_text = st.text_area("Paste Company Overview Table Here", data.get("company_overview",""), height=150)
+    col1, col2, col3 = st.columns(3)
+    company_name = col1.text_input("Company Name", data.get("company_name",""))
+    ticker = col2.text_input("Ticker Symbol", data.get("ticker",""))
+    recommendation = col3.selectbox("Recommendation", ["Buy", "Hold", "Sell"], index=["Buy","Hold","Sell"].index(data.get("recommendation","Buy")))
+
+    # ------------------------
+    # 2. Investment Thesis
+    st.header("2. Investment Thesis")
+    investment_thesis_text = st.text_area("Paste Investment Thesis / Table", data.get("investment_thesis",""), height=150)
+
+    # ------------------------
+    # 3. Financial Analysis
+    st.header("3. Financial Analysis")
+    financial_text = st.text_area("Paste Financial Table / Ratios", data.get("financial_analysis",""), height=150)
+
+    # ------------------------
+    # 4. Valuation
+    st.header("4. Valuation")
+    valuation_text = st.text_area("Paste Valuation Table / DCF / Relative Valuation", data.get("valuation",""), height=150)
+
+    # ------------------------
+    # 5. Business Quality Assessment
+    st.header("5. Business Quality Assessment")
+    business_quality_text = st.text_area("Paste Business Quality Table / Notes", data.get("business_quality",""), height=150)
+
+    # ------------------------
+    # 6. Risk Analysis
+    st.header("6. Risk Analysis")
+    risk_text = st.text_area("Paste Risk Analysis Table / Notes", data.get("risk_analysis",""), height=150)
+
+    # ------------------------
+    # 7. ESG / Sustainability
+    st.header("7. ESG / Sustainability")
+    esg_text = st.text_area("Paste ESG / Sustainability Table / Notes", data.get("esg",""), height=150)
+
+    # ------------------------
+    # 8. Technical / Trading Notes
+    st.header("8. Technical / Trading Notes")
+    technical_text = st.text_area("Paste Technical Analysis / Charts / Levels", data.get("technical",""), height=150)
+
+    # ------------------------
+    # 9. Conclusion
+    st.header("9. Conclusion")
+    conclusion_text = st.text_area("Paste Final Recommendation / Notes / Horizon", data.get("conclusion",""), height=150)
+
+    # ------------------------
+    # PDF Generation
+    def current_report():
+        return {
+            "report_date": report_date,
+            "company_overview": company_overview_text,
+            "company_name": company_name,
+            "ticker": ticker,
+            "recommendation": recommendation,
+            "investment_thesis": investment_thesis_text,
+            "financial_analysis": financial_text,
+            "valuation": valuation_text,
+            "business_quality": business_quality_text,
+            "risk_analysis": risk_text,
+            "esg": esg_text,
+            "technical": technical_text,
+            "conclusion": conclusion_text
+        }
+
+    @st.cache_resource
+    def get_pdf_cache(folder):
+        return PdfCache(folder)
+
+    def generate_pdf():
+        """(PDF buffer, True if the unchanged report was served from the PDF cache)."""
+        pdf, cached = get_pdf_cache(os.path.abspath(REPORT_FOLDER)).get_or_render(current_report())
+        return BytesIO(pdf), cached
+
+    # ------------------------
+    # Save JSON Data
+    def save_json():
+        data_to_save = current_report()
+        filename = f"{company_name}_{report_date}.json"
+        # In sections mode, changed sections are stored as deltas against the loaded report
+        path = write_report(REPORT_FOLDER, filename, data_to_save, None if selected_file == "New Report" else selected_file)
+        report_index.record_saved(filename, data_to_save)
+        search_index.update(filename, data_to_save)
+        search_index.save()
+        metrics_index.update(filename, data_to_save)
+        metrics_index.save()
+        return path
+
+    # ------------------------
+    profiler.phase("save & pdf")
+    if st.button("Save & Download Professional PDF"):
+        if report_date == "":
+            st.warning("Please set a report date (or click 'Use Today's Date').")
+        else:
+            with profiler.span("generate_pdf"):
+                pdf_buffer, pdf_cached = generate_pdf()
+            with profiler.span("save_json"):
+                json_file = save_json()
+            st.success(f"Data saved: {json_file}")
+            if pdf_cached:
+                st.caption("Report unchanged since its last export; PDF served from cache.")
+            st.download_button(
+                "Download PDF",
+                data=pdf_buffer,
+                file_name=pdf_filename(current_report()),
+                mime="application/pdf"
+            )
+
+
+# app.py registers this file as a page; Streamlit runs it as __main__
+if __name__ == "__main__":
+    # Leaving the block reports the rerun; a rerun cut short only releases the profiler
+    with start_rerun("equity_research") as profiler:
+        equity_research(profiler)
@@ -0,0 +1,111 @@
+# pdf_cache.py
+"""On-disk cache of rendered report PDFs, keyed by content.
+
+The key is a SHA-256 of the fields the PDF is drawn from plus the
+template version, so an unchanged report is never rendered twice and a
+template change invalidates every entry at once. Files live in
+``<folder>/.index/pdfs/<key>.pdf``; a hit refreshes the file's mtime and
+the least recently used files are evicted once the folder outgrows
+MAX_CACHE_BYTES.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from equity_research_template.pdf_render import RENDERED_FIELDS, TEMPLATE_VERSION, render_report_pdf
+from equity_research_template.report_index import INDEX_DIR
+
+PDF_CACHE_DIR = "pdfs"
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+# Eviction trims to this fraction of the cap so it does not rerun on every put
+EVICT_TO = 0.9
+
+
+def report_digest(report):
+    """Cache key: hash of the rendered fields and the template version."""
+    payload = [TEMPLATE_VERSION] + [str(report.get(field) or "") for field in RENDERED_FIELDS]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """Content-addressed PDF files with LRU eviction by total size."""
+
+    def __init__(self, folder, max_bytes=MAX_CACHE_BYTES):
+        self.folder = os.path.join(folder, INDEX_DIR, PDF_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None  # running size estimate; rescanned only to evict
+        self._lock = threading.Lock()
+
+    def _path(self, digest):
+        return os.path.join(self.folder, f"{digest}.pdf")
+
+    def get(self, report):
+        """Cached PDF bytes for ``report``, or None."""
+        path = self._path(report_digest(report))
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return pdf
+
+    def put(self, report, pdf):
+        os.makedirs(self.folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.folder, prefix=".pdf.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp, self._path(report_digest(report)))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()[1]
+            else:
+                self._bytes += len(pdf)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def get_or_render(self, report):
+        """(pdf bytes, True if served from cache)."""
+        pdf = self.get(report)
+        with self._lock:
+            if pdf is not None:
+                self.hits += 1
+                return pdf, True
+            self.misses += 1
+        pdf = render_report_pdf(report)
+        self.put(report, pdf)
+        return pdf, False
+
+    def _scan(self):
+        """([(mtime_ns, size, path)], total bytes) of the cached files."""
+        entries = []
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        # Other processes share the folder, so evict from a fresh scan
+        entries, total = self._scan()
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # evicted by another process
+            total -= size
+        self._bytes = total
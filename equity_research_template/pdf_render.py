@@ -0,0 +1,81 @@
+# pdf_render.py
+"""PDF rendering of one equity research report, shared by the page and batch export.
+
+Pure function of the report dict, so it can run in worker processes.
+reportlab is imported on the first render, so pages and tools that only
+need the constants below start without it.
+"""
+from io import BytesIO
+
+# Bump whenever the drawing below changes; cached PDFs of older versions are then ignored
+TEMPLATE_VERSION = 1
+
+X_MARGIN = 40
+Y_MARGIN = 50
+
+SECTIONS = [
+    ("2. Investment Thesis", "investment_thesis"),
+    ("3. Financial Analysis", "financial_analysis"),
+    ("4. Valuation", "valuation"),
+    ("5. Business Quality Assessment", "business_quality"),
+    ("6. Risk Analysis", "risk_analysis"),
+    ("7. ESG / Sustainability", "esg"),
+    ("8. Technical / Trading Notes", "technical"),
+    ("9. Conclusion", "conclusion"),
+]
+
+# Every report field the PDF depends on
+RENDERED_FIELDS = (
+    "report_date", "company_overview", "company_name", "ticker", "recommendation",
+    *(key for _, key in SECTIONS),
+)
+
+
+def pdf_filename(report):
+    return f"{report.get('company_name', '')}_{report.get('report_date', '')}_Equity_Research.pdf"
+
+
+def render_report_pdf(report):
+    """PDF bytes for a report dict in the saved JSON layout."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)  # Portrait A4
+    width, height = A4
+    y = height - Y_MARGIN
+
+    def write_section(title, text, bold=True, size=14):
+        nonlocal y
+        c.setFont("Helvetica-Bold" if bold else "Courier", size)
+        c.setFillColor(colors.darkblue if bold else colors.black)
+        c.drawString(X_MARGIN, y, title)
+        y -= 20
+        c.setFont("Courier", 11)
+        for line in text.splitlines():
+            c.drawString(X_MARGIN + 10, y, line)
+            y -= 15
+            if y < Y_MARGIN:
+                c.showPage()
+                y = height - Y_MARGIN
+
+    def field(key):
+        return str(report.get(key) or "")
+
+    # Report Date
+    write_section(f"Report Date: {field('report_date')}", "", bold=False, size=12)
+
+    # Sections
+    write_section("1. Company Overview", field("company_overview"))
+    write_section(
+        "Key Info",
+        f"Company: {field('company_name')} | Ticker: {field('ticker')} | Recommendation: {field('recommendation')}",
+        bold=False,
+    )
+    for title, key in SECTIONS:
+        write_section(title, field(key))
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
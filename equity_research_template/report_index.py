@@ -0,0 +1,157 @@
+# report_index.py
+"""Metadata index over saved equity research reports.
+
+The index keeps one small record per report file (company, ticker, date,
+rating, target price, mtime) in ``<folder>/.index/reports.json``. A refresh
+stats the folder and re-parses only the files that are new or changed
+since the last one, so listing, filtering and sorting never open the
+report bodies.
+"""
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from equity_research_template.report_store import is_manifest, unpack
+
+INDEX_DIR = ".index"
+INDEX_FILE = "reports.json"
+# Bump when the record layout changes so old index files are rebuilt
+INDEX_VERSION = 1
+
+RATINGS = ["Buy", "Hold", "Sell"]
+INDEXED_FIELDS = ("company_name", "ticker", "report_date", "recommendation", "target_price")
+
+
+def load_report(path):
+    """Full report dict for a saved report file (plain JSON or a report_store manifest)."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if is_manifest(data):
+        data = unpack(os.path.dirname(path), data)
+    return data
+
+
+def pack_strings(strings):
+    """One uint8 array holding ``strings``, for np.savez files loaded with allow_pickle=False."""
+    # Each string ends in NUL, which appears in neither words nor file names
+    return np.frombuffer("".join(f"{s}\0" for s in strings).encode(), dtype=np.uint8)
+
+
+def unpack_strings(array):
+    return array.tobytes().decode().split("\0")[:-1]
+
+
+def _record(filename, data, stat):
+    record = {field: str(data.get(field, "")).strip() for field in INDEXED_FIELDS}
+    record.update(file=filename, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    return record
+
+
+def _atomic_write_json(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".reports.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class ReportIndex:
+    """Incrementally maintained {filename: record} for one reports folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.index_path = os.path.join(folder, INDEX_DIR, INDEX_FILE)
+        self.records = {}
+        self.parsed = 0  # report files parsed by the last refresh
+        self._lock = threading.Lock()
+        self._read_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if stored.get("version") == INDEX_VERSION:
+            self.records = {r["file"]: r for r in stored.get("records", [])}
+
+    def _write_index(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        _atomic_write_json(self.index_path, {"version": INDEX_VERSION, "records": list(self.records.values())})
+
+    def refresh(self):
+        """Sync with the folder, parsing only new or modified reports; returns all records."""
+        with self._lock:
+            seen = set()
+            changed = False
+            self.parsed = 0
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    record = self.records.get(entry.name)
+                    if record and record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+                        continue
+                    try:
+                        data = load_report(entry.path)
+                    except (OSError, json.JSONDecodeError):
+                        # Half-written or foreign file; retried on the next refresh
+                        self.records.pop(entry.name, None)
+                        continue
+                    self.records[entry.name] = _record(entry.name, data, stat)
+                    self.parsed += 1
+                    changed = True
+            for name in set(self.records) - seen:
+                del self.records[name]
+                changed = True
+            if changed:
+                self._write_index()
+            return list(self.records.values())
+
+    def record_saved(self, filename, data):
+        """Index a report the app just wrote, without re-reading it."""
+        with self._lock:
+            stat = os.stat(os.path.join(self.folder, filename))
+            self.records[filename] = _record(filename, data, stat)
+            self._write_index()
+
+
+# -------------------
+# Filtering & Sorting
+# -------------------
+SORT_KEYS = {
+    "Date (newest first)": (lambda r: (r["report_date"], r["file"]), True),
+    "Date (oldest first)": (lambda r: (r["report_date"], r["file"]), False),
+    "Ticker": (lambda r: (r["ticker"].casefold(), r["report_date"]), False),
+    "Rating": (lambda r: (RATINGS.index(r["recommendation"]) if r["recommendation"] in RATINGS else len(RATINGS), r["ticker"].casefold()), False),
+}
+
+
+def filter_reports(records, text="", ratings=None, sort="Date (newest first)"):
+    """Records whose ticker or company contains ``text`` and whose rating is in ``ratings``."""
+    text = text.strip().casefold()
+    matches = [
+        r for r in records
+        if (not text or text in r["ticker"].casefold() or text in r["company_name"].casefold())
+        and (not ratings or r["recommendation"] in ratings)
+    ]
+    key, reverse = SORT_KEYS[sort]
+    return sorted(matches, key=key, reverse=reverse)
+
+
+def report_label(record):
+    parts = [record["ticker"] or record["company_name"] or record["file"]]
+    if record["company_name"] and record["ticker"]:
+        parts.append(record["company_name"])
+    parts += [record["report_date"], record["recommendation"]]
+    if record["target_price"]:
+        parts.append(f"TP {record['target_price']}")
+    return " · ".join(p for p in parts if p)
@@ -0,0 +1,358 @@
+# report_metrics.py
+"""Numeric metrics parsed from the tables pasted into saved reports, and a screener over them.
+
+Tables like ``key_financials`` are whitespace-aligned (or markdown ``|``)
+text; every numeric cell becomes a metric named ``<row>_<column>``, with
+labels normalised to lower-case words (``"P/E (x)"`` and ``"FY26E"`` ->
+``pe_fy26e``). A row of a fiscal-year table is also available under its
+bare name for the furthest year (``roe`` = ``roe_fy26e``), and
+``"Label: value"`` lines (``Upside Potential: 16.3%`` -> ``upside_potential``)
+and numeric header fields (``cmp``, ``target_price``) become metrics too.
+Percentages keep the number as written (``ROE (%) 11.0`` -> 11.0).
+
+MetricsIndex keeps one float column per metric across every report, so a
+screen such as ``pe_fy26e < 20 and roe > 10%`` is a few vectorised
+comparisons instead of re-parsing every report.
+"""
+import difflib
+import functools
+import math
+import operator
+import os
+import re
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+
+from equity_research_template.report_index import INDEX_DIR, load_report, pack_strings, unpack_strings
+
+TABLE_FIELDS = ("key_financials", "quarterly_performance", "segment_performance", "valuation", "financial_analysis")
+SCALAR_FIELDS = ("cmp", "target_price", "market_cap", "free_float")
+
+METRICS_FILE = "metrics.npz"
+# Bump when parsing, naming or the saved layout changes so stored metrics are rebuilt
+METRICS_VERSION = 2
+
+NUMBER_RE = re.compile(r"^(\()?[₹$€£]?\s*(-?\d[\d,]*(?:\.\d+)?|-?\.\d+)\s*(%|x|bps|cr)?(\))?$", re.IGNORECASE)
+FISCAL_YEAR_RE = re.compile(r"^fy\d{2}[aef]?$")
+CELL_SPLIT_RE = re.compile(r"\s{2,}|\t")
+KEY_VALUE_RE = re.compile(r"^\s*[•*-]?\s*([^:|]+?):\s*(.+?)\s*$")
+NOTE_RE = re.compile(r"\([^)]*\)")
+DROP_RE = re.compile(r"[/.'’]")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# -------------------
+# Parsing
+# -------------------
+def parse_number(text):
+    """Float for a cell like "1,050,000", "₹2,850", "19.4x", "16.3%" or "(1,200)"; else None."""
+    match = NUMBER_RE.match(text.strip())
+    if not match:
+        return None
+    value = float(match.group(2).replace(",", ""))
+    return -value if match.group(1) and match.group(4) else value
+
+
+@functools.lru_cache(maxsize=4096)
+def metric_name(label):
+    """``metric_name("P/E (x)")`` -> ``"pe"``; row and column labels repeat, hence the cache."""
+    label = NOTE_RE.sub(" ", label.lower())  # units and notes
+    label = DROP_RE.sub("", label).replace("&", " and ")
+    return "_".join(WORD_RE.findall(label))
+
+
+def _split_cells(line):
+    if "|" in line:
+        return [cell.strip() for cell in line.strip().strip("|").split("|")]
+    return [cell.strip() for cell in CELL_SPLIT_RE.split(line.strip())]
+
+
+def parse_tables(text):
+    """{metric: value} from the tables and "Label: value" lines of one section."""
+    metrics = {}
+    header = None
+    for line in text.splitlines() + [""]:
+        if not line.strip():
+            header = None  # a blank line ends a table
+            continue
+        if set(line.strip()) <= set("|-: "):
+            continue  # markdown separator row
+        cells = _split_cells(line)
+        if len(cells) < 2:
+            match = KEY_VALUE_RE.match(line)
+            if match:
+                # "Current PE: 19.4x | Target PE: 18.0x"
+                for part in line.split("|"):
+                    match = KEY_VALUE_RE.match(part)
+                    value = parse_number(match.group(2)) if match else None
+                    if value is not None:
+                        metrics[metric_name(match.group(1))] = value
+            continue
+        if header is None:
+            header = [metric_name(column) for column in cells]
+            years = [i for i, column in enumerate(header) if i and FISCAL_YEAR_RE.match(column)]
+            continue
+        row = metric_name(cells[0])
+        if not row:
+            continue
+        for i, cell in enumerate(cells[1:len(header)], start=1):
+            value = parse_number(cell)
+            if value is None:
+                continue
+            metrics[f"{row}_{header[i]}"] = value
+            if years and i == years[-1]:
+                metrics.setdefault(row, value)
+    return metrics
+
+
+def parse_report(data):
+    """{metric: value} for one report dict."""
+    metrics = {}
+    for field in TABLE_FIELDS:
+        metrics.update(parse_tables(str(data.get(field) or "")))
+    for field in SCALAR_FIELDS:
+        value = parse_number(str(data.get(field) or ""))
+        if value is not None:
+            metrics[field] = value
+    return metrics
+
+
+# -------------------
+# Columnar Index
+# -------------------
+class MetricsIndex:
+    """One float64 column per metric, one row per report; NaN where a report lacks the metric."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, INDEX_DIR, METRICS_FILE)
+        self._lock = threading.RLock()
+        self.columns = {}     # metric -> column
+        self.rows = {}        # filename -> row
+        self.stamps = {}      # filename -> (mtime_ns, size) that was parsed
+        self.row_file = []    # row -> filename (None once deleted)
+        self.values = np.full((0, 0), np.nan, order="F")
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        # Plain arrays only: the reports folder is shared, so loading it must never run code
+        try:
+            with np.load(self.path, allow_pickle=False) as saved:
+                if int(saved["version"]) != METRICS_VERSION:
+                    return
+                arrays = {name: saved[name] for name in saved.files}
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            return
+        names = unpack_strings(arrays["columns"])
+        self.columns = dict(zip(names, range(len(names))))
+        self.row_file = [name or None for name in unpack_strings(arrays["row_file"])]
+        self.rows = {name: row for row, name in enumerate(self.row_file) if name is not None}
+        mtime, size = arrays["stamp_mtime_ns"].tolist(), arrays["stamp_size"].tolist()
+        self.stamps = {name: (mtime[row], size[row]) for name, row in self.rows.items()}
+        self.values = np.asfortranarray(arrays["values"])
+
+    def save(self):
+        """Persist the index if it changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            stamps = [self.stamps.get(name, (0, 0)) if name else (0, 0) for name in self.row_file]
+            arrays = {
+                "version": np.array(METRICS_VERSION),
+                "columns": pack_strings(sorted(self.columns, key=self.columns.get)),
+                "row_file": pack_strings(name or "" for name in self.row_file),
+                "stamp_mtime_ns": np.array([s[0] for s in stamps], dtype=np.int64),
+                "stamp_size": np.array([s[1] for s in stamps], dtype=np.int64),
+                "values": self.values,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".metrics.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._dirty = False
+
+    def _grow(self, n_rows, n_cols):
+        rows, cols = self.values.shape
+        if n_rows <= rows and n_cols <= cols:
+            return
+        if n_rows > rows:
+            rows = max(n_rows, rows * 2, 1024)
+        if n_cols > cols:
+            cols = max(n_cols, cols * 2, 64)
+        grown = np.full((rows, cols), np.nan, order="F")
+        old_rows, old_cols = self.values.shape
+        grown[:old_rows, :old_cols] = self.values
+        self.values = grown
+
+    def _set(self, filename, metrics, stamp):
+        self._drop(filename)
+        row = len(self.row_file)
+        for name in metrics:
+            self.columns.setdefault(name, len(self.columns))
+        self._grow(row + 1, len(self.columns))
+        self.row_file.append(filename)
+        self.rows[filename] = row
+        self.stamps[filename] = stamp
+        if metrics:
+            self.values[row, [self.columns[name] for name in metrics]] = list(metrics.values())
+        self._dirty = True
+        if len(self.row_file) > 2 * max(len(self.rows), 512):
+            self._compact()
+
+    def _drop(self, filename):
+        # An all-NaN row matches no comparison, so screens need no liveness mask
+        row = self.rows.pop(filename, None)
+        if row is not None:
+            self.row_file[row] = None
+            self.values[row] = np.nan
+            self._dirty = True
+
+    def update(self, filename, data):
+        """Re-parse one report that was just written, e.g. from save_json()."""
+        with self._lock:
+            st = os.stat(os.path.join(self.folder, filename))
+            self._set(filename, parse_report(data), (st.st_mtime_ns, st.st_size))
+
+    def sync(self, records):
+        """Bring the index in line with ReportIndex records; returns the number of reports parsed."""
+        with self._lock:
+            current = {r["file"]: (r["mtime_ns"], r["size"]) for r in records}
+            changed = [name for name, stamp in current.items() if self.stamps.get(name) != stamp]
+            for name in [name for name in self.rows if name not in current]:
+                self._drop(name)
+                self.stamps.pop(name, None)
+            for name in changed:
+                try:
+                    data = load_report(os.path.join(self.folder, name))
+                except (OSError, ValueError):
+                    continue
+                self._set(name, parse_report(data), current[name])
+            return len(changed)
+
+    def _compact(self):
+        """Drop the rows of replaced and deleted reports."""
+        keep = [row for row, name in enumerate(self.row_file) if name is not None]
+        self.values = np.asfortranarray(self.values[keep])
+        self.row_file = [self.row_file[row] for row in keep]
+        self.rows = {name: row for row, name in enumerate(self.row_file)}
+        self._dirty = True
+
+    def column(self, name):
+        """Values of one metric for every row (NaN where missing)."""
+        return self.values[:len(self.row_file), self.columns[name]]
+
+    def screen(self, expression):
+        """(filenames, {metric: values}) of the reports matching ``expression``."""
+        with self._lock:
+            tree = parse_screen(expression)
+            names = sorted(set(_metric_refs(tree)))
+            for name in names:
+                if name not in self.columns:
+                    close = difflib.get_close_matches(name, self.columns, n=3)
+                    hint = f" (did you mean {', '.join(close)}?)" if close else ""
+                    raise ValueError(f"Unknown metric: {name}{hint}")
+            mask = _evaluate(tree, self.column, len(self.row_file))
+            rows = np.flatnonzero(mask)
+            return [self.row_file[row] for row in rows], {name: self.column(name)[rows] for name in names}
+
+
+# -------------------
+# Screen Expressions
+# -------------------
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "=": operator.eq, "==": operator.eq, "!=": operator.ne}
+SCREEN_TOKEN_RE = re.compile(r"\s*(\(|\)|<=|>=|==|!=|<|>|=|\band\b|\bor\b|[^()<>=!]+?(?=\s*(?:$|[()<>=!]|\band\b|\bor\b)))", re.IGNORECASE)
+
+
+def parse_screen(expression):
+    """Tree for ``a < 1 and (b > 2 or c >= d)``; ``and`` binds tighter than ``or``."""
+    tokens, pos = [], 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = SCREEN_TOKEN_RE.match(expression, pos)
+        if not match or not match.group(1).strip():
+            raise ValueError(f"Cannot parse screen near: {expression[pos:]!r}")
+        tokens.append(match.group(1).strip())
+        pos = match.end()
+    tokens.append(None)
+    i = 0
+
+    def peek():
+        return tokens[i].lower() if tokens[i] else None
+
+    def take():
+        nonlocal i
+        i += 1
+        return tokens[i - 1]
+
+    def operand():
+        token = take()
+        if token is None or token in COMPARISONS or token in "()":
+            raise ValueError(f"Expected a metric or number in screen: {expression!r}")
+        value = parse_number(token)
+        return ("value", value) if value is not None else ("metric", metric_name(token))
+
+    def comparison():
+        if peek() == "(":
+            take()
+            node = either()
+            if take() != ")":
+                raise ValueError(f"Unbalanced parentheses in screen: {expression!r}")
+            return node
+        left = operand()
+        op = take()
+        if op not in COMPARISONS:
+            raise ValueError(f"Expected a comparison (<, <=, >, >=, =, !=) in screen: {expression!r}")
+        return ("cmp", COMPARISONS[op], left, operand())
+
+    def both():
+        node = comparison()
+        while peek() == "and":
+            take()
+            node = ("and", node, comparison())
+        return node
+
+    def either():
+        node = both()
+        while peek() == "or":
+            take()
+            node = ("or", node, both())
+        return node
+
+    tree = either()
+    if tokens[i] is not None:
+        raise ValueError(f"Unexpected {tokens[i]!r} in screen: {expression!r}")
+    return tree
+
+
+def _metric_refs(node):
+    if node[0] == "cmp":
+        return [side[1] for side in node[2:] if side[0] == "metric"]
+    if node[0] in ("and", "or"):
+        return _metric_refs(node[1]) + _metric_refs(node[2])
+    return []
+
+
+def _evaluate(node, column, n_rows):
+    """Boolean row mask; comparisons involving a missing (NaN) value are False."""
+    kind = node[0]
+    if kind == "and":
+        return _evaluate(node[1], column, n_rows) & _evaluate(node[2], column, n_rows)
+    if kind == "or":
+        return _evaluate(node[1], column, n_rows) | _evaluate(node[2], column, n_rows)
+    _, op, left, right = node
+    left, right = (column(side[1]) if side[0] == "metric" else np.full(n_rows, side[1]) for side in (left, right))
+    with np.errstate(invalid="ignore"):
+        return op(left, right) & ~np.isnan(left) & ~np.isnan(right)
+
+
+def format_value(value):
+    return "" if value is None or math.isnan(value) else f"{value:,.2f}".rstrip("0").rstrip(".")
@@ -0,0 +1,456 @@
+# report_search.py
+"""Full-text search over the free-text sections of saved equity reports.
+
+Queries are ranked with BM25 over the sections in SEARCH_FIELDS:
+
+    crude oil volatility          every word must appear (falls back to any word)
+    "crude oil volatility"        exact phrase
+    risk:crude  risk:"oil price"  restrict a word or phrase to one section
+
+Postings live in numpy arrays rather than per-term dicts so tens of
+thousands of reports fit in memory: a large immutable base segment plus a
+small delta segment that absorbs saves and is merged into the base once it
+grows. Updated or deleted reports are tombstoned until the next merge. The
+whole index is saved as plain arrays to ``<folder>/.index/search.npz`` and
+loaded with allow_pickle=False: the reports folder is shared, so loading
+it must never run code.
+"""
+import math
+import os
+import re
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+
+from equity_research_template.report_index import INDEX_DIR, load_report, pack_strings, unpack_strings
+
+SEARCH_FIELDS = ("investment_thesis", "risk_analysis", "valuation", "esg", "technical", "conclusion")
+FIELD_ALIASES = {
+    "thesis": "investment_thesis",
+    "risk": "risk_analysis",
+    "risks": "risk_analysis",
+    "tech": "technical",
+    **{field: field for field in SEARCH_FIELDS},
+}
+FIELD_LABELS = {
+    "investment_thesis": "Investment Thesis",
+    "risk_analysis": "Risk Analysis",
+    "valuation": "Valuation",
+    "esg": "ESG",
+    "technical": "Technical",
+    "conclusion": "Conclusion",
+}
+
+SEARCH_FILE = "search.npz"
+# Bump when tokenization or the saved layout changes
+SEARCH_VERSION = 2
+# Delta segment size (in reports) that triggers a merge into the base segment
+MERGE_DOCS = 256
+# A (re)build from disk merges in chunks of this many reports to bound memory
+BUILD_CHUNK_DOCS = 2048
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_TOKENS = 12
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+QUERY_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+# -------------------
+# Segments
+# -------------------
+class _Segment:
+    """Immutable postings sorted by (term, doc, field).
+
+    Entry i says term ``e_term[i]`` occurs ``e_tf[i]`` times in field
+    ``e_field[i]`` of doc ``e_doc[i]``, at positions
+    ``pos[e_start[i]:e_start[i] + e_tf[i]]``.
+    """
+
+    def __init__(self, e_term, e_doc, e_field, e_tf, pos):
+        self.e_term, self.e_doc, self.e_field = e_term, e_doc, e_field
+        self.e_tf, self.pos = e_tf, pos
+        # Positions are stored entry after entry, so starts follow from tf
+        self.e_start = np.cumsum(e_tf, dtype=np.int64) - e_tf
+        n_terms = int(e_term.max()) + 1 if len(e_term) else 0
+        self.term_ptr = np.searchsorted(e_term, np.arange(n_terms + 1))
+
+    def arrays(self, prefix):
+        # e_start is derived and e_term is rebuilt from term_ptr
+        return {prefix + name: getattr(self, name) for name in ("term_ptr", "e_doc", "e_field", "e_tf", "pos")}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix):
+        term_ptr = arrays[prefix + "term_ptr"]
+        e_term = np.repeat(np.arange(len(term_ptr) - 1, dtype=np.int32), np.diff(term_ptr))
+        return cls(e_term, *(arrays[prefix + name] for name in ("e_doc", "e_field", "e_tf", "pos")))
+
+    @classmethod
+    def empty(cls):
+        none = np.zeros(0, dtype=np.int32)
+        return cls(none, none, none.astype(np.int8), none, none)
+
+    @classmethod
+    def build(cls, docs):
+        """Segment from {doc_id: [term ids per field]}."""
+        terms, doc_ids, fields, positions = [], [], [], []
+        for doc_id, field_terms in docs.items():
+            for field, term_ids in enumerate(field_terms):
+                n = len(term_ids)
+                terms.append(np.asarray(term_ids, dtype=np.int32))
+                doc_ids.append(np.full(n, doc_id, dtype=np.int32))
+                fields.append(np.full(n, field, dtype=np.int8))
+                positions.append(np.arange(n, dtype=np.int32))
+        if not terms or not sum(map(len, terms)):
+            return cls.empty()
+        terms, doc_ids = np.concatenate(terms), np.concatenate(doc_ids)
+        fields, positions = np.concatenate(fields), np.concatenate(positions)
+        order = np.lexsort((positions, fields, doc_ids, terms))
+        terms, doc_ids, fields, positions = terms[order], doc_ids[order], fields[order], positions[order]
+        # One entry per run of equal (term, doc, field)
+        new_entry = np.ones(len(terms), dtype=bool)
+        new_entry[1:] = (terms[1:] != terms[:-1]) | (doc_ids[1:] != doc_ids[:-1]) | (fields[1:] != fields[:-1])
+        starts = np.flatnonzero(new_entry)
+        tf = np.diff(np.append(starts, len(terms))).astype(np.int32)
+        return cls(terms[starts], doc_ids[starts], fields[starts], tf, positions)
+
+    def merge(self, other, live):
+        """New segment with this one's live docs followed by ``other`` (all newer doc ids)."""
+        keep = live[self.e_doc]
+        e_tf = np.concatenate([self.e_tf[keep], other.e_tf])
+        e_start = np.concatenate([self.e_start[keep], other.e_start + len(self.pos)])
+        e_term = np.concatenate([self.e_term[keep], other.e_term])
+        # Doc ids only grow, so a stable sort by term keeps (term, doc) order
+        order = np.argsort(e_term, kind="stable")
+        e_tf, e_start = e_tf[order], e_start[order]
+        gather = np.repeat(e_start, e_tf) + _ranges(e_tf)
+        return _Segment(
+            e_term[order],
+            np.concatenate([self.e_doc[keep], other.e_doc])[order],
+            np.concatenate([self.e_field[keep], other.e_field])[order],
+            e_tf,
+            np.concatenate([self.pos, other.pos])[gather],
+        )
+
+    def entries(self, term_id):
+        if term_id >= len(self.term_ptr) - 1:
+            return slice(0, 0)
+        return slice(self.term_ptr[term_id], self.term_ptr[term_id + 1])
+
+
+# -------------------
+# Index
+# -------------------
+class SearchIndex:
+    """Inverted index over SEARCH_FIELDS of every report in a folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, INDEX_DIR, SEARCH_FILE)
+        self._lock = threading.RLock()
+        self.vocab = {}
+        self.files = {}       # filename -> doc id
+        self.stamps = {}      # filename -> (mtime_ns, size) that was indexed
+        self.doc_file = []    # doc id -> filename (None once deleted)
+        self.field_len = np.zeros((0, len(SEARCH_FIELDS)), dtype=np.int32)
+        self.live = np.zeros(0, dtype=bool)
+        self.base = _Segment.empty()
+        self.delta = _Segment.empty()
+        self._delta_docs = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as saved:
+                if int(saved["version"]) != SEARCH_VERSION:
+                    return
+                arrays = {name: saved[name] for name in saved.files}
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            return
+        terms = unpack_strings(arrays["vocab"])
+        self.vocab = dict(zip(terms, range(len(terms))))
+        self.doc_file = [name or None for name in unpack_strings(arrays["doc_file"])]
+        self.files = {name: doc_id for doc_id, name in enumerate(self.doc_file) if name is not None}
+        mtime, size = arrays["stamp_mtime_ns"].tolist(), arrays["stamp_size"].tolist()
+        self.stamps = {name: (mtime[doc_id], size[doc_id]) for name, doc_id in self.files.items()}
+        self.field_len, self.live = arrays["field_len"], arrays["live"]
+        self.base = _Segment.from_arrays(arrays, "base_")
+        # Delta docs' term ids, field after field; field_len gives the split
+        terms = arrays["delta_terms"].tolist()
+        cursor = 0
+        for doc_id in arrays["delta_docs"].tolist():
+            field_terms = []
+            for n in self.field_len[doc_id].tolist():
+                field_terms.append(terms[cursor:cursor + n])
+                cursor += n
+            self._delta_docs[doc_id] = field_terms
+        self.delta = _Segment.build(self._delta_docs)
+
+    def save(self):
+        """Persist the index if it changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            stamps = [self.stamps.get(name, (0, 0)) if name else (0, 0) for name in self.doc_file]
+            delta_docs = sorted(self._delta_docs)
+            arrays = {
+                "version": np.array(SEARCH_VERSION),
+                # vocab ids are dense, so the terms in id order are the whole vocab
+                "vocab": pack_strings(sorted(self.vocab, key=self.vocab.get)),
+                "doc_file": pack_strings(name or "" for name in self.doc_file),
+                "stamp_mtime_ns": np.array([s[0] for s in stamps], dtype=np.int64),
+                "stamp_size": np.array([s[1] for s in stamps], dtype=np.int64),
+                "field_len": self.field_len,
+                "live": self.live,
+                "delta_docs": np.array(delta_docs, dtype=np.int32),
+                "delta_terms": np.array(
+                    [t for doc_id in delta_docs for terms in self._delta_docs[doc_id] for t in terms], dtype=np.int32
+                ),
+                **self.base.arrays("base_"),
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".search.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._dirty = False
+
+    def __len__(self):
+        return len(self.files)
+
+    # -------------------
+    # Updates
+    # -------------------
+    def _term_ids(self, text):
+        vocab = self.vocab
+        return [vocab.setdefault(token, len(vocab)) for token in tokenize(text)]
+
+    def _remove(self, filename):
+        doc_id = self.files.pop(filename, None)
+        self.stamps.pop(filename, None)
+        if doc_id is not None:
+            self.live[doc_id] = False
+            self.doc_file[doc_id] = None
+            self._delta_docs.pop(doc_id, None)
+
+    def _add(self, filename, data, stamp):
+        doc_id = len(self.doc_file)
+        field_terms = [self._term_ids(str(data.get(field) or "")) for field in SEARCH_FIELDS]
+        self.doc_file.append(filename)
+        self.files[filename] = doc_id
+        self.stamps[filename] = stamp
+        if doc_id >= len(self.live):
+            grow = max(1024, len(self.live))
+            self.live = np.concatenate([self.live, np.zeros(grow, dtype=bool)])
+            self.field_len = np.concatenate([self.field_len, np.zeros((grow, len(SEARCH_FIELDS)), dtype=np.int32)])
+        self.live[doc_id] = True
+        self.field_len[doc_id] = [len(t) for t in field_terms]
+        self._delta_docs[doc_id] = field_terms
+
+    def _flush(self, force_merge=False):
+        if force_merge or len(self._delta_docs) > MERGE_DOCS:
+            self.base = self.base.merge(_Segment.build(self._delta_docs), self.live)
+            self._delta_docs = {}
+        self.delta = _Segment.build(self._delta_docs)
+        self._dirty = True
+
+    def update(self, filename, data):
+        """(Re)index one report that was just written, e.g. from save_json()."""
+        with self._lock:
+            st = os.stat(os.path.join(self.folder, filename))
+            self._remove(filename)
+            self._add(filename, data, (st.st_mtime_ns, st.st_size))
+            self._flush()
+
+    def sync(self, records):
+        """Bring the index in line with ReportIndex records; returns the number of reports (re)indexed."""
+        with self._lock:
+            current = {r["file"]: (r["mtime_ns"], r["size"]) for r in records}
+            changed = [name for name, stamp in current.items() if self.stamps.get(name) != stamp]
+            removed = [name for name in self.files if name not in current]
+            for name in removed:
+                self._remove(name)
+            for name in changed:
+                try:
+                    data = load_report(os.path.join(self.folder, name))
+                except (OSError, ValueError):
+                    continue
+                self._remove(name)
+                self._add(name, data, current[name])
+                if len(self._delta_docs) >= BUILD_CHUNK_DOCS:
+                    self._flush(force_merge=True)
+            if changed or removed:
+                self._flush()
+            return len(changed)
+
+    # -------------------
+    # Queries
+    # -------------------
+    def _postings(self, term_id, field):
+        """(doc, field, positions-start, tf) arrays of live entries for one term."""
+        parts = []
+        for segment in (self.base, self.delta):
+            s = segment.entries(term_id)
+            doc, fld = segment.e_doc[s], segment.e_field[s]
+            keep = self.live[doc]
+            if field is not None:
+                keep &= fld == field
+            parts.append((doc[keep], fld[keep], segment.e_tf[s][keep], segment.e_start[s][keep], segment))
+        return parts
+
+    def _clause_tf(self, terms, field):
+        """Per-doc occurrence counts of a word or phrase: (docs, tf)."""
+        term_ids = [self.vocab.get(t) for t in terms]
+        if any(t is None for t in term_ids):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        if len(term_ids) == 1:
+            parts = self._postings(term_ids[0], field)
+            docs = np.concatenate([p[0] for p in parts])
+            tf = np.concatenate([p[2] for p in parts]).astype(float)
+            return _sum_by_doc(docs, tf)
+        # Phrase: first narrow to the (doc, field) slots that hold every term,
+        # then key each occurrence there by (slot, position - offset in phrase)
+        # and intersect the keys of all phrase terms. Entries are sorted by
+        # (doc, field) and positions within an entry ascend, so every array
+        # below is already sorted and membership is a searchsorted.
+        postings = [self._postings(term_id, field) for term_id in term_ids]
+        # Rarest term first: each intersection shrinks what the next term expands
+        order = sorted(range(len(postings)), key=lambda i: sum(len(p[0]) for p in postings[i]))
+        slots = None
+        for parts in (postings[i] for i in order):
+            term_slots = np.concatenate([doc.astype(np.int64) * 8 + fld for doc, fld, _, _, _ in parts])
+            slots = term_slots if slots is None else slots[_contains(term_slots, slots)]
+        keys = None
+        for offset in order:
+            parts = postings[offset]
+            if keys is not None:
+                slots = keys >> 32
+                slots = slots[np.append(True, slots[1:] != slots[:-1])]
+            term_keys = []
+            for doc, fld, tf, start, segment in parts:
+                slot = doc.astype(np.int64) * 8 + fld
+                keep = _contains(slots, slot)
+                slot, tf, start = slot[keep], tf[keep], start[keep]
+                positions = segment.pos[np.repeat(start, tf) + _ranges(tf)].astype(np.int64) - offset
+                key = (np.repeat(slot, tf) << 32) | (positions & 0xFFFFFFFF)
+                term_keys.append(key[positions >= 0])
+            term_keys = np.concatenate(term_keys)
+            keys = term_keys if keys is None else keys[_contains(term_keys, keys)]
+            if not len(keys):
+                break
+        docs = keys >> 35
+        return _sum_by_doc(docs, np.ones(len(docs)))
+
+    def search(self, query, limit=20):
+        """[(filename, score, clauses)] best first; clauses feed ``snippet``."""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        with self._lock:
+            n_docs = len(self.doc_file)
+            live = self.live[:n_docs]
+            n_live = max(int(live.sum()), 1)
+            lengths = self.field_len[:n_docs].astype(float)
+            scores = np.zeros(n_docs)
+            hits = np.zeros(n_docs, dtype=np.int32)
+            for field, terms in clauses:
+                field_id = None if field is None else SEARCH_FIELDS.index(field)
+                docs, tf = self._clause_tf(terms, field_id)
+                if not len(docs):
+                    continue
+                doc_len = lengths[:, field_id] if field_id is not None else lengths.sum(axis=1)
+                avg_len = max(doc_len[live].mean(), 1.0)
+                idf = math.log(1 + (n_live - len(docs) + 0.5) / (len(docs) + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[docs] / avg_len)
+                scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                hits[docs] += 1
+            matched = hits == len(clauses)
+            if not matched.any():
+                # No report has every clause; rank partial matches instead
+                matched = hits > 0
+            candidates = np.flatnonzero(matched)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self.doc_file[d], float(scores[d]), clauses) for d in candidates]
+
+
+def _ranges(lengths):
+    """Concatenated aranges: [0..l0) + [0..l1) + ..."""
+    offsets = np.cumsum(lengths, dtype=np.int64) - lengths
+    return np.arange(int(lengths.sum()), dtype=np.int64) - np.repeat(offsets, lengths)
+
+
+def _contains(sorted_haystack, needles):
+    """Boolean mask of ``needles`` found in the sorted array ``sorted_haystack``."""
+    if not len(sorted_haystack):
+        return np.zeros(len(needles), dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_haystack, needles), len(sorted_haystack) - 1)
+    return sorted_haystack[idx] == needles
+
+
+def _sum_by_doc(docs, values):
+    if not len(docs):
+        return docs.astype(np.int64), values
+    unique, inverse = np.unique(docs, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values)
+
+
+def parse_query(query):
+    """[(field or None, (terms...))] for each word, phrase or field:clause in ``query``."""
+    clauses = []
+    for field, phrase, word in QUERY_RE.findall(query):
+        target = FIELD_ALIASES.get(field.lower()) if field else None
+        text = phrase if phrase else word
+        if field and target is None:
+            # Not a known section ("ratio:1.5"), so search the text literally
+            text = f"{field}:{text}"
+        # An unquoted token like "pre-tax" tokenizes to a short phrase
+        terms = tuple(tokenize(text))
+        if terms:
+            clauses.append((target, terms))
+    return clauses
+
+
+# -------------------
+# Snippets
+# -------------------
+def snippet(data, clauses):
+    """(section label, markdown snippet) around the first match in the report."""
+    fields = [f for f, _ in clauses if f] or list(SEARCH_FIELDS)
+    wanted = {t for _, terms in clauses for t in terms}
+    for field in fields:
+        text = str(data.get(field) or "")
+        matches = list(TOKEN_RE.finditer(text.lower()))
+        hits = [i for i, m in enumerate(matches) if m.group() in wanted]
+        if not hits:
+            continue
+        first = max(hits[0] - SNIPPET_TOKENS // 2, 0)
+        last = min(first + SNIPPET_TOKENS * 2, len(matches)) - 1
+        out = []
+        cursor = matches[first].start()
+        for m in matches[first:last + 1]:
+            out.append(_escape(text[cursor:m.start()]))
+            word = _escape(text[m.start():m.end()])
+            out.append(f"**{word}**" if m.group() in wanted else word)
+            cursor = m.end()
+        body = " ".join("".join(out).split())
+        prefix = "… " if first > 0 else ""
+        suffix = " …" if last < len(matches) - 1 else ""
+        return FIELD_LABELS[field], prefix + body + suffix
+    return None, ""
+
+
+def _escape(text):
+    return re.sub(r"([\\`*_{}\[\]<>()#+\-.!|~$])", r"\\\1", text)
@@ -0,0 +1,333 @@
+# report_store.py
+"""Content-addressed storage for saved equity research reports.
+
+With ``REPORTS_STORAGE=sections`` a saved report file is a small manifest:
+short fields inline, every longer text section replaced by the SHA-256 of
+its text. Section texts live once each in ``<folder>/.objects/`` and are
+zlib-compressed, either whole (a keyframe) or as a delta: compressed with
+the keyframe of the same section in the previous version as a preset
+dictionary, so an edited section costs roughly the size of the edits since
+that keyframe. Deltas never chain, so any version decodes from at most two
+objects. Repeated saves of an unchanged section store nothing new.
+
+``report_index.load_report`` resolves manifests transparently, so every
+reader (listing, search, PDF export) sees plain report dicts.
+
+Saves, gc and the pack/unpack rewrites hold ``folder_lock``: a save may
+reuse an object that already exists, so gc must not be deciding what is
+unreferenced while a manifest naming that object is still being written.
+
+    python -m equity_research_template.report_store pack|unpack|gc|stats [folder]
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, run gc only while the app is stopped
+    fcntl = None
+
+OBJECTS_DIR = ".objects"
+LOCK_FILE = ".reports.lock"
+MANIFEST_FORMAT = "report-manifest"
+MANIFEST_VERSION = 1
+# Values up to this many characters stay inline in the manifest
+INLINE_MAX = 64
+# Start a new keyframe once a delta reaches this fraction of the whole compressed text
+KEYFRAME_RATIO = 0.5
+# zlib only looks back this far, so only the tail of a longer base helps a delta
+ZDICT_BYTES = 32 * 1024
+# Decompressed sections kept per process
+CACHE_SECTIONS = 4096
+
+
+def storage_mode():
+    """Report storage selected by REPORTS_STORAGE ("json" by default, or "sections")."""
+    mode = os.environ.get("REPORTS_STORAGE", "json")
+    if mode not in ("json", "sections"):
+        raise ValueError(f"Unknown REPORTS_STORAGE: {mode}")
+    return mode
+
+
+def is_manifest(data):
+    return isinstance(data, dict) and data.get("format") == MANIFEST_FORMAT
+
+
+@contextmanager
+def folder_lock(folder):
+    """Exclusive access to a reports folder's objects, across threads and processes."""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(os.path.join(folder, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # closing releases the flock
+
+
+def _atomic_write(path, payload):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".report.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# -------------------
+# Object Store
+# -------------------
+class ObjectStore:
+    """Immutable section texts keyed by SHA-256, stored whole or as zlib deltas.
+
+    Object file layout: a header line ``F`` (keyframe) or ``D <keyframe sha>``
+    (delta against a keyframe), then the zlib stream.
+    """
+
+    _cache = OrderedDict()  # (root, sha) -> text, shared by every store in the process
+    _cache_lock = threading.Lock()
+
+    def __init__(self, folder):
+        self.root = os.path.join(folder, OBJECTS_DIR)
+
+    def _path(self, sha):
+        return os.path.join(self.root, sha[:2], sha[2:])
+
+    def _remember(self, sha, text):
+        with self._cache_lock:
+            self._cache[(self.root, sha)] = text
+            self._cache.move_to_end((self.root, sha))
+            if len(self._cache) > CACHE_SECTIONS:
+                self._cache.popitem(last=False)
+
+    def _header(self, sha):
+        with open(self._path(sha), "rb") as f:
+            return f.readline().split()
+
+    def get(self, sha):
+        with self._cache_lock:
+            text = self._cache.get((self.root, sha))
+        if text is not None:
+            return text
+        with open(self._path(sha), "rb") as f:
+            header = f.readline().split()
+            body = f.read()
+        if header[0] == b"D":
+            zdict = self.get(header[1].decode())[-ZDICT_BYTES:].encode("utf-8")
+            text = zlib.decompressobj(zdict=zdict).decompress(body).decode("utf-8")
+        else:
+            text = zlib.decompress(body).decode("utf-8")
+        self._remember(sha, text)
+        return text
+
+    def put(self, text, base=None):
+        """Store ``text``, as a delta against ``base``'s keyframe when that pays off; returns its sha."""
+        raw = text.encode("utf-8")
+        sha = hashlib.sha256(raw).hexdigest()
+        path = self._path(sha)
+        if os.path.exists(path):
+            return sha
+        payload = b"F\n" + zlib.compress(raw, 9)
+        if base and base != sha:
+            try:
+                header = self._header(base)
+                keyframe = header[1].decode() if header[0] == b"D" else base
+                compressor = zlib.compressobj(9, zdict=self.get(keyframe)[-ZDICT_BYTES:].encode("utf-8"))
+                delta = compressor.compress(raw) + compressor.flush()
+                if len(delta) < len(payload) * KEYFRAME_RATIO:
+                    payload = f"D {keyframe}\n".encode() + delta
+            except FileNotFoundError:
+                pass  # base was collected; store a keyframe
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _atomic_write(path, payload)
+        self._remember(sha, text)
+        return sha
+
+    def bases(self, sha):
+        """Objects ``sha`` needs to be decoded (itself and its keyframe)."""
+        header = self._header(sha)
+        return [sha, header[1].decode()] if header[0] == b"D" else [sha]
+
+    def all(self):
+        """{sha: size on disk} for every stored object."""
+        objects = {}
+        if not os.path.isdir(self.root):
+            return objects
+        for prefix in os.listdir(self.root):
+            for entry in os.scandir(os.path.join(self.root, prefix)):
+                if not entry.name.startswith("."):
+                    objects[prefix + entry.name] = entry.stat().st_size
+        return objects
+
+
+# -------------------
+# Manifests
+# -------------------
+def pack(folder, data, base=None):
+    """Manifest for ``data``, storing its sections; ``base`` is an earlier version to delta against."""
+    store = ObjectStore(folder)
+    base_sections = base.get("sections", {}) if is_manifest(base) else {}
+    manifest = {"format": MANIFEST_FORMAT, "version": MANIFEST_VERSION, "fields": {}, "sections": {}}
+    for key, value in data.items():
+        if isinstance(value, str) and len(value) > INLINE_MAX:
+            manifest["sections"][key] = store.put(value, base_sections.get(key))
+            manifest["fields"][key] = None  # keeps the field order
+        else:
+            manifest["fields"][key] = value
+    return manifest
+
+
+def unpack(folder, manifest):
+    """Plain report dict for a manifest."""
+    store = ObjectStore(folder)
+    sections = manifest["sections"]
+    return {
+        key: store.get(sections[key]) if key in sections else value
+        for key, value in manifest["fields"].items()
+    }
+
+
+def read_manifest(path):
+    """Manifest of a saved report without resolving sections, or None for plain JSON."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    return data if is_manifest(data) else None
+
+
+def section_digests(path):
+    """{field: sha256} of a report's sections; cheap for manifests, hashes plain JSON."""
+    manifest = read_manifest(path)
+    if manifest is not None:
+        return dict(manifest["sections"])
+    with open(path, "r") as f:
+        data = json.load(f)
+    return {
+        key: hashlib.sha256(value.encode("utf-8")).hexdigest()
+        for key, value in data.items()
+        if isinstance(value, str) and len(value) > INLINE_MAX
+    }
+
+
+def write_report(folder, filename, data, base_file=None):
+    """Save ``data`` as ``folder/filename`` in the configured storage mode.
+
+    ``base_file`` is the report the edit started from; in sections mode
+    changed sections are stored as deltas against it.
+    """
+    path = os.path.join(folder, filename)
+    if storage_mode() == "json":
+        _atomic_write(path, json.dumps(data, indent=4).encode("utf-8"))
+        return path
+    with folder_lock(folder):
+        base = None
+        for candidate in (base_file, filename):
+            try:
+                base = read_manifest(os.path.join(folder, candidate)) if candidate else None
+            except (OSError, ValueError):
+                continue
+            if base is not None:
+                break
+        _atomic_write(path, json.dumps(pack(folder, data, base)).encode("utf-8"))
+    return path
+
+
+def version_history(records, company_name):
+    """ReportIndex records of every saved version of a company, oldest first."""
+    return sorted(
+        (r for r in records if r["company_name"] == company_name),
+        key=lambda r: (r["report_date"], r["file"]),
+    )
+
+
+# -------------------
+# Maintenance
+# -------------------
+def _report_files(folder):
+    return sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+
+
+def pack_folder(folder):
+    """Convert every plain JSON report to a manifest, each company's versions in date order."""
+    with folder_lock(folder):
+        reports = []
+        for name in _report_files(folder):
+            with open(os.path.join(folder, name), "r") as f:
+                data = json.load(f)
+            if not is_manifest(data):
+                reports.append((str(data.get("company_name", "")), str(data.get("report_date", "")), name, data))
+        previous = {}
+        for company, _, name, data in sorted(reports, key=lambda r: r[:3]):
+            manifest = pack(folder, data, previous.get(company))
+            _atomic_write(os.path.join(folder, name), json.dumps(manifest).encode("utf-8"))
+            previous[company] = manifest
+    return len(reports)
+
+
+def unpack_folder(folder):
+    """Rewrite every manifest as a plain JSON report."""
+    with folder_lock(folder):
+        count = 0
+        for name in _report_files(folder):
+            manifest = read_manifest(os.path.join(folder, name))
+            if manifest is not None:
+                _atomic_write(os.path.join(folder, name), json.dumps(unpack(folder, manifest), indent=4).encode("utf-8"))
+                count += 1
+    return count
+
+
+def gc(folder):
+    """Delete objects no manifest needs (directly or as a keyframe); returns bytes freed."""
+    with folder_lock(folder):
+        store = ObjectStore(folder)
+        needed = set()
+        for name in _report_files(folder):
+            manifest = read_manifest(os.path.join(folder, name))
+            if manifest is not None:
+                for sha in manifest["sections"].values():
+                    needed.update(store.bases(sha))
+        freed = 0
+        for sha, size in store.all().items():
+            if sha not in needed:
+                os.unlink(store._path(sha))
+                freed += size
+    return freed
+
+
+def stats(folder):
+    reports = _report_files(folder)
+    report_bytes = sum(os.path.getsize(os.path.join(folder, name)) for name in reports)
+    objects = ObjectStore(folder).all()
+    return {
+        "reports": len(reports),
+        "report_bytes": report_bytes,
+        "objects": len(objects),
+        "object_bytes": sum(objects.values()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed report store.")
+    parser.add_argument("command", choices=["pack", "unpack", "gc", "stats"])
+    parser.add_argument("folder", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "saved_reports"))
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        print(f"Packed {pack_folder(args.folder)} reports")
+    elif args.command == "unpack":
+        print(f"Unpacked {unpack_folder(args.folder)} reports")
+    elif args.command == "gc":
+        print(f"Freed {gc(args.folder)} bytes")
+    else:
+        s = stats(args.folder)
+        print(f"{s['reports']} reports ({s['report_bytes']} bytes), {s['objects']} objects ({s['object_bytes']} bytes)")
@@ -0,0 +1,196 @@
+# analytics.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from stock_dashbaord.storage import stock_name
+
+LEVELS = ("sector", "industry", "sub_industry")
+
+# Quote tables kept per process, one per hierarchy version in use: the
+# latest plus past versions sessions are viewing under History
+QUOTE_TABLES = 4
+
+# Per-group running sums, one row per group:
+# quoted stocks, sum of % change, advancers, decliners, weight, weight * % change
+N_ACC = 6
+
+
+class QuoteTable:
+    """Flat, columnar view of every stock with integer-coded hierarchy ids.
+
+    Row i is one listing of a symbol (a symbol listed in two sub-industries
+    has two rows). ``codes[level][i]`` is the group id of that row at each
+    level, -1 where the level does not apply (stocks directly under an
+    industry have no sub-industry). Quotes update per-group running sums in
+    place, so only the rows whose quote changed are touched; medians are
+    recomputed just for the groups those rows belong to.
+    """
+
+    def __init__(self, sectors):
+        self.keys = {level: [] for level in LEVELS}
+        symbols = []
+        codes = {level: [] for level in LEVELS}
+        weights = []
+        for sector_id, (sector, industries) in enumerate(sectors.items()):
+            self.keys["sector"].append(sector)
+            for industry, sub_data in industries.items():
+                industry_id = len(self.keys["industry"])
+                self.keys["industry"].append((sector, industry))
+                if isinstance(sub_data, list):
+                    lists = [(-1, sub_data)]
+                else:
+                    lists = []
+                    for sub, stocks in sub_data.items():
+                        if isinstance(stocks, list):
+                            lists.append((len(self.keys["sub_industry"]), stocks))
+                            self.keys["sub_industry"].append((sector, industry, sub))
+                for sub_id, stocks in lists:
+                    for stock in stocks:
+                        symbols.append(stock_name(stock))
+                        codes["sector"].append(sector_id)
+                        codes["industry"].append(industry_id)
+                        codes["sub_industry"].append(sub_id)
+                        weights.append(stock.get("market_cap", np.nan) if isinstance(stock, dict) else np.nan)
+
+        n = len(symbols)
+        self.symbols = np.array(symbols, dtype=object)
+        self.codes = {level: np.array(codes[level], dtype=np.int32) for level in LEVELS}
+        self.price = np.full(n, np.nan)
+        self.change = np.full(n, np.nan)
+        self.weight = np.array(weights, dtype=float)
+        self._rows = {}
+        if n:
+            uniques, inverse = np.unique(self.symbols.astype(str), return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            self._rows = dict(zip(uniques.tolist(), np.split(order, np.cumsum(np.bincount(inverse))[:-1])))
+        self._acc = {level: np.zeros((len(self.keys[level]), N_ACC)) for level in LEVELS}
+        self._median = {level: np.full(len(self.keys[level]), np.nan) for level in LEVELS}
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def _contrib(self, rows):
+        change = self.change[rows]
+        valid = ~np.isnan(change)
+        value = np.where(valid, change, 0.0)
+        weight = np.where(valid, np.nan_to_num(self.weight[rows], nan=1.0), 0.0)
+        return np.column_stack([valid, value, value > 0, value < 0, weight, weight * value]).astype(float)
+
+    def update(self, quotes):
+        """Fold new quotes ({symbol: {"price", "change", "market_cap"?}}) into the roll-ups."""
+        with self._lock:
+            changed = [
+                (symbol, quote) for symbol, quote in quotes.items()
+                if self._seen.get(symbol) is not quote and symbol in self._rows
+            ]
+            if not changed:
+                return 0
+            rows = np.concatenate([self._rows[symbol] for symbol, _ in changed])
+            counts = [len(self._rows[symbol]) for symbol, _ in changed]
+            new_change = np.repeat([float(q.get("change") or 0) for _, q in changed], counts)
+            new_price = np.repeat([float(q.get("price") or np.nan) for _, q in changed], counts)
+            new_cap = np.repeat([float(q.get("market_cap") or np.nan) for _, q in changed], counts)
+
+            before = self._contrib(rows)
+            self.change[rows] = new_change
+            self.price[rows] = new_price
+            has_cap = ~np.isnan(new_cap)
+            self.weight[rows[has_cap]] = new_cap[has_cap]
+            delta = self._contrib(rows) - before
+
+            for level in LEVELS:
+                group = self.codes[level][rows]
+                keep = group >= 0
+                np.add.at(self._acc[level], group[keep], delta[keep])
+                self._refresh_medians(level, np.unique(group[keep]))
+            for symbol, quote in changed:
+                self._seen[symbol] = quote
+            return len(rows)
+
+    def _refresh_medians(self, level, groups):
+        if not len(groups):
+            return
+        codes = self.codes[level]
+        mask = np.isin(codes, groups) & ~np.isnan(self.change)
+        medians = pd.Series(self.change[mask]).groupby(codes[mask]).median()
+        self._median[level][groups] = np.nan
+        self._median[level][medians.index.to_numpy()] = medians.to_numpy()
+
+    def rollup(self, level):
+        """DataFrame of roll-ups for every group at ``level`` that has quotes."""
+        with self._lock:
+            acc = self._acc[level].copy()
+            median = self._median[level].copy()
+        count = acc[:, 0]
+        quoted = count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = pd.DataFrame({
+                "key": pd.Series(self.keys[level], dtype=object),
+                "quoted": count.astype(int),
+                "mean_change": acc[:, 1] / count,
+                "median_change": median,
+                "advancers": acc[:, 2].astype(int),
+                "decliners": acc[:, 3].astype(int),
+                "cap_weighted_change": acc[:, 5] / acc[:, 4],
+            })
+        return frame[quoted].set_index("key")
+
+    def sector_symbols(self, sector):
+        """Every symbol listed under ``sector``; empty if this table does not have it."""
+        if sector not in self.keys["sector"]:
+            return self.symbols[:0]
+        return self.symbols[self.codes["sector"] == self.keys["sector"].index(sector)]
+
+    def rollups(self, sector=None):
+        """{level: {key: {column: value}}} for all levels, for the renderer; just ``sector``'s groups if given."""
+        result = {}
+        for level in LEVELS:
+            frame = self.rollup(level)
+            if sector is not None:
+                frame = frame[[(key if level == "sector" else key[0]) == sector for key in frame.index]]
+            result[level] = frame.to_dict("index")
+        return result
+
+
+class _TableHolder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = OrderedDict()  # version -> QuoteTable, least recently used first
+
+
+@st.cache_resource
+def _table_holder():
+    return _TableHolder()
+
+
+def get_quote_table(sectors, version):
+    """Process-wide QuoteTable of hierarchy ``version``, built on first use.
+
+    The last QUOTE_TABLES versions asked for are kept, so sessions on the
+    latest version and sessions viewing a past one do not rebuild each
+    other's table on every rerun.
+    """
+    holder = _table_holder()
+    with holder.lock:
+        table = holder.tables.get(version)
+        if table is None:
+            table = holder.tables[version] = QuoteTable(sectors)
+            if len(holder.tables) > QUOTE_TABLES:
+                holder.tables.popitem(last=False)
+        holder.tables.move_to_end(version)
+        return table
+
+
+def sector_rollups(model, engine, sector):
+    """``sector``'s roll-ups for the version ``model`` holds now, quoting its stocks through ``engine``.
+
+    For the grid's sector fragments: the table is shared with the full run,
+    whose one batched fetch leaves these quotes in the engine's cache.
+    """
+    sectors, _, version = model.snapshot()
+    table = get_quote_table(sectors, version)
+    table.update(engine.get_quotes(table.sector_symbols(sector)))
+    return table.rollups(sector)
@@ -0,0 +1,324 @@
+# api.py
+"""Headless JSON/HTTP API over the hierarchy, for services that need the mapping.
+
+    python -m stock_dashbaord.api [--host 127.0.0.1] [--port 8600]
+
+    GET  /sectors                 full tree
+    GET  /sectors/<sector>        one sector's industries
+    GET  /symbols/<symbol>        every path listing a symbol
+    GET  /search?q=<text>         symbols containing the text
+    POST /ops                     one edit, e.g. {"op": "add_stock", "path": [...], "stock": "TCS"}
+
+Every GET answers with an ETag and honours If-None-Match, so pollers get an
+empty 304 until something changes. The tree's ETag is the store's ``etag``
+(the stored version the model has read up to); a sector keeps the ETag of
+the version that last changed it, since copy-on-write commits leave
+untouched sectors as the same objects. Response bodies are encoded (and
+gzipped) once per version and shared by every reader. POST /ops accepts
+If-Match to refuse an edit made against an outdated tree.
+
+One asyncio loop serves all connections from one SharedHierarchy. Edits to
+the store by other processes (the Streamlit pages) are picked up on the
+next request. Commits and those catch-ups take the store's lock, which a
+bulk import can hold for seconds, so they run in worker threads; GETs
+against an unchanged store are answered on the loop from the model's last
+published state, whose tree and ETag always belong to the same version.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import threading
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import get_store, stock_name
+from stock_dashbaord.symbol_index import accepts_stocks
+
+DEFAULT_PORT = 8600
+# Larger request bodies are refused with 413
+MAX_BODY_BYTES = 64 * 1024
+# Bodies smaller than this are not worth gzipping
+GZIP_MIN_BYTES = 1024
+
+# Path length of every op the UI can make
+OP_PATHS = {
+    "add_sector": (1,),
+    "add_industry": (2,),
+    "add_sub_industry": (3,),
+    "add_stock": (2, 3),
+    "delete_sector": (1,),
+    "delete_industry": (2,),
+    "delete_sub_industry": (3,),
+    "delete_stock": (2, 3),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _encode(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match's weak comparison: W/"x" matches "x", as proxies that gzip weaken ETags."""
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return any(t == "*" or t.removeprefix("W/") == etag for t in tags)
+
+
+class _Body:
+    """An encoded response body, gzipped on first request."""
+
+    def __init__(self, payload, etag):
+        self.payload = payload
+        self.etag = f'"{etag}"'
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.payload, 6)
+        return self._gzipped
+
+
+# -------------------
+# Validation
+# -------------------
+def parse_op(body):
+    """The op in a request body, checked for shape; raises ApiError(400)."""
+    try:
+        op = json.loads(body)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Body is not JSON")
+    if not isinstance(op, dict) or op.get("op") not in OP_PATHS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"op must be one of: {', '.join(OP_PATHS)}")
+    path = op.get("path")
+    if (not isinstance(path, list) or len(path) not in OP_PATHS[op["op"]]
+            or not all(isinstance(name, str) and name.strip() for name in path)):
+        lengths = " or ".join(map(str, OP_PATHS[op["op"]]))
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{op['op']} needs a path of {lengths} non-empty names")
+    if op["op"].endswith("_stock"):
+        stock = op.get("stock")
+        if not (isinstance(stock, str) and stock.strip()) and not (isinstance(stock, dict) and stock_name(stock)):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{op['op']} needs a stock symbol")
+        return {"op": op["op"], "path": path, "stock": stock}
+    return {"op": op["op"], "path": path}
+
+
+def check_op(sectors, index, op):
+    """Refuse ops the store would silently ignore, as the sidebar forms do."""
+    kind, path = op["op"], op["path"]
+    parent = sectors
+    for name in path[:-1]:
+        parent = parent.get(name) if isinstance(parent, dict) else None
+    if kind == "add_stock":
+        if not accepts_stocks(sectors, path):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No stock list at {' › '.join(path)}")
+        if tuple(path) in index.locate(stock_name(op["stock"])):
+            raise ApiError(HTTPStatus.CONFLICT, f"{stock_name(op['stock'])} is already listed there")
+    elif kind == "delete_stock":
+        if tuple(path) not in index.locate(stock_name(op["stock"])):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"{stock_name(op['stock'])} is not listed there")
+    elif not isinstance(parent, dict):
+        raise ApiError(HTTPStatus.NOT_FOUND, f"{' › '.join(path[:-1])} does not exist or lists stocks directly")
+    elif kind.startswith("add_") and path[-1] in parent:
+        raise ApiError(HTTPStatus.CONFLICT, f"{path[-1]} already exists")
+    elif kind.startswith("delete_") and path[-1] not in parent:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"{path[-1]} does not exist")
+
+
+# -------------------
+# Request Handling
+# -------------------
+class HierarchyAPI:
+    """Maps requests to responses; transport-free, see ``serve`` for the HTTP side."""
+
+    def __init__(self, model=None):
+        self.model = model or SharedHierarchy(get_store())
+        self._tree = None  # (model version, _Body)
+        self._sectors = {}  # sector -> (industries object, _Body)
+        # GETs run on the loop and, while the store is stale, in worker threads too
+        self._cache_lock = threading.Lock()
+
+    def _state(self):
+        return self.model.current()
+
+    def tree(self):
+        with self._cache_lock:
+            # Read under the lock, so a thread holding an older version never replaces a newer body
+            sectors, _, version, etag = self._state()
+            if self._tree is None or self._tree[0] != version:
+                self._tree = (version, _Body(_encode(sectors), etag))
+            return self._tree[1]
+
+    def sector(self, name):
+        with self._cache_lock:
+            sectors, _, _, etag = self._state()
+            industries = sectors.get(name)
+            if industries is None:
+                self._sectors.pop(name, None)
+                raise ApiError(HTTPStatus.NOT_FOUND, f"No sector {name}")
+            cached = self._sectors.get(name)
+            if cached is None or cached[0] is not industries:
+                cached = self._sectors[name] = (industries, _Body(_encode({"sector": name, "industries": industries}), etag))
+            return cached[1]
+
+    def symbol(self, symbol):
+        _, index, _, etag = self._state()
+        paths = index.locate(symbol)
+        if not paths:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"{symbol} is not listed")
+        return _Body(_encode({"symbol": symbol, "paths": paths}), etag)
+
+    def search(self, query):
+        _, index, _, etag = self._state()
+        results = [{"symbol": name, "paths": paths} for name, paths in index.search(query)]
+        return _Body(_encode({"query": query, "results": results}), etag)
+
+    def commit(self, body, if_match=None):
+        op = parse_op(body)
+        sectors, index, _, etag = self._state()
+        if if_match and if_match not in ("*", f'"{etag}"'):
+            raise ApiError(HTTPStatus.PRECONDITION_FAILED, "The hierarchy changed since that ETag")
+        check_op(sectors, index, op)
+        self.model.commit(op)
+        _, _, version, etag = self._state()
+        return _Body(_encode({"op": op, "version": version}), etag)
+
+    def blocks(self, method):
+        """Whether ``handle`` may wait for the store's lock: a commit, or a read that must catch up first."""
+        return method == "POST" or self.model.stale()
+
+    def handle(self, method, target, headers, body=b""):
+        """(status, headers, payload) for one request, after catching up with the store."""
+        self.model.snapshot()
+        return self.respond(method, target, headers, body)
+
+    def respond(self, method, target, headers, body=b""):
+        """Like ``handle``, but GETs answer from the state last read without touching the store."""
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        try:
+            if method == "POST" and parts == ["ops"]:
+                response = self.commit(body, headers.get("if-match"))
+            elif method not in ("GET", "HEAD"):
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed")
+            elif parts == ["sectors"]:
+                response = self.tree()
+            elif len(parts) == 2 and parts[0] == "sectors":
+                response = self.sector(parts[1])
+            elif len(parts) == 2 and parts[0] == "symbols":
+                response = self.symbol(parts[1])
+            elif parts == ["search"]:
+                response = self.search(parse_qs(url.query).get("q", [""])[0])
+            else:
+                raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {url.path}")
+        except ApiError as e:
+            return e.status, {"Content-Type": "application/json"}, _encode({"error": str(e)})
+
+        out = {"ETag": response.etag, "Cache-Control": "no-cache"}
+        if method != "POST" and _etag_matches(headers.get("if-none-match", ""), response.etag):
+            return HTTPStatus.NOT_MODIFIED, out, b""
+        out["Content-Type"] = "application/json"
+        payload = response.payload
+        if len(payload) >= GZIP_MIN_BYTES and "gzip" in headers.get("accept-encoding", ""):
+            out["Content-Encoding"] = "gzip"
+            out["Vary"] = "Accept-Encoding"
+            payload = response.gzipped()
+        if method == "HEAD":
+            out["Content-Length"] = str(len(payload))
+            payload = b""
+        return HTTPStatus.OK, out, payload
+
+
+# -------------------
+# HTTP Server
+# -------------------
+async def _read_request(reader):
+    """(method, target, version, headers, body), or None once the client hangs up."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, version = line.decode("latin-1").split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+def _write_response(writer, status, headers, payload, keep_alive):
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    headers = {**headers, "Connection": "keep-alive" if keep_alive else "close"}
+    if status != HTTPStatus.NOT_MODIFIED:
+        headers.setdefault("Content-Length", str(len(payload)))
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+
+
+async def _serve_connection(api, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except ApiError as e:
+                _write_response(writer, e.status, {"Content-Type": "application/json"}, _encode({"error": str(e)}), False)
+                break
+            except ValueError:
+                _write_response(writer, HTTPStatus.BAD_REQUEST, {}, b"", False)
+                break
+            if request is None:
+                break
+            method, target, version, headers, body = request
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            if api.blocks(method):
+                status, out, payload = await asyncio.to_thread(api.handle, method, target, headers, body)
+            else:
+                status, out, payload = api.respond(method, target, headers, body)
+            _write_response(writer, status, out, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, api=None, ready=None):
+    """Serve ``api`` (a HierarchyAPI over the configured store by default) until cancelled.
+
+    ``ready(server)`` is called once the socket is listening.
+    """
+    api = api or HierarchyAPI()
+    server = await asyncio.start_server(lambda r, w: _serve_connection(api, r, w), host, port)
+    if ready:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the sector hierarchy as JSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    def announce(server):
+        print(f"Serving the hierarchy on http://{args.host}:{server.sockets[0].getsockname()[1]}/sectors")
+
+    try:
+        asyncio.run(serve(args.host, args.port, ready=announce))
+    except KeyboardInterrupt:
+        pass
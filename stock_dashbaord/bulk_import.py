@@ -0,0 +1,190 @@
+# bulk_import.py
+"""Bulk import of stocks from CSV / exchange master files.
+
+    python -m stock_dashbaord.bulk_import EQUITY_L.csv [--sector ... --industry ...]
+
+Rows are streamed, so memory does not grow with the file beyond the stocks
+actually added, and the whole import is persisted with one snapshot write.
+"""
+import argparse
+import csv
+import io
+import sys
+
+from stock_dashbaord.storage import _stock_list, apply_op, get_store
+from stock_dashbaord.symbol_index import SymbolIndex, accepts_stocks
+
+# Accepted spellings of each column, compared after normalising case,
+# dashes and underscores ("Sub-Industry" == "sub_industry")
+COLUMN_ALIASES = {
+    "symbol": ("symbol", "ticker", "tradingsymbol", "scrip id", "security id"),
+    "name": ("name", "name of company", "company name", "company", "security name"),
+    "sector": ("sector",),
+    "industry": ("industry",),
+    "sub_industry": ("sub industry", "subindustry"),
+}
+
+# Progress callback granularity
+PROGRESS_EVERY_ROWS = 1000
+
+
+def _normalise(header):
+    return " ".join(header.strip().casefold().replace("-", " ").replace("_", " ").split())
+
+
+def read_rows(f):
+    """Yield {symbol, name, sector, industry, sub_industry} dicts from a text CSV, one at a time."""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [_normalise(h) for h in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in header:
+                columns[field] = header.index(alias)
+                break
+    if "symbol" not in columns:
+        raise ValueError(f"No symbol column in CSV header: {', '.join(header)}")
+    for values in reader:
+        yield {
+            field: values[i].strip() if i < len(values) else ""
+            for field, i in columns.items()
+        }
+
+
+class BulkEdit:
+    """Copy-on-write edit of a shared tree that copies each container at most once.
+
+    ``apply_op_cow`` copies the containers on an op's path for every op, which
+    is quadratic when thousands of stocks land in the same list; here the copy
+    happens on first touch and later ops mutate the private copy in place.
+    """
+
+    def __init__(self, sectors):
+        self.sectors = dict(sectors)
+        self._owned = set()
+
+    def own(self, path):
+        """Make the containers along ``path`` private to this edit."""
+        for depth in range(1, len(path) + 1):
+            key = tuple(path[:depth])
+            if key in self._owned:
+                continue
+            parent = self.sectors
+            for name in path[:depth - 1]:
+                parent = parent[name]
+            if not isinstance(parent, dict) or path[depth - 1] not in parent:
+                return
+            parent[path[depth - 1]] = parent[path[depth - 1]].copy()
+            self._owned.add(key)
+
+
+def import_rows(sectors, index, rows, defaults=None, progress=None):
+    """Add ``rows`` to ``sectors``, creating missing nodes; returns (new_sectors, stats).
+
+    ``sectors`` itself is left untouched; ``index`` is updated in place.
+    Stocks already listed in the target list (in the tree or earlier in the
+    file) are counted as duplicates. ``defaults`` fills sector/industry/
+    sub_industry for files that lack those columns, and ``progress`` is
+    called as ``progress(stats)`` every PROGRESS_EVERY_ROWS rows.
+    """
+    defaults = defaults or {}
+    edit = BulkEdit(sectors)
+    stats = {"rows": 0, "added": 0, "duplicates": 0, "nodes": 0, "skipped": 0}
+
+    for row in rows:
+        stats["rows"] += 1
+        if progress and stats["rows"] % PROGRESS_EVERY_ROWS == 0:
+            progress(stats)
+        symbol = row.get("symbol", "")
+        place = [row.get(field) or defaults.get(field, "") for field in ("sector", "industry", "sub_industry")]
+        path = place if place[2] else place[:2]
+        if not symbol or not all(path):
+            stats["skipped"] += 1
+            continue
+
+        for depth, kind in ((1, "add_sector"), (2, "add_industry"), (3, "add_sub_industry")):
+            if depth > len(path):
+                break
+            node = edit.sectors
+            for name in path[:depth - 1]:
+                node = node.get(name) if isinstance(node, dict) else None
+            if isinstance(node, dict) and path[depth - 1] not in node:
+                edit.own(path[:depth - 1])
+                apply_op(edit.sectors, {"op": kind, "path": path[:depth]})
+                stats["nodes"] += 1
+        if not accepts_stocks(edit.sectors, path):
+            # e.g. a sub-industry under an industry that lists stocks directly
+            stats["skipped"] += 1
+            continue
+        if tuple(path) in index.locate(symbol):
+            stats["duplicates"] += 1
+            continue
+
+        name = row.get("name", "")
+        stock = {"symbol": symbol, "name": name} if name and name != symbol else symbol
+        # The index already ruled out duplicates, so skip apply_op's list scan
+        edit.own(path)
+        _stock_list(edit.sectors, path, create=True).append(stock)
+        index.add(path, stock)
+        stats["added"] += 1
+
+    if progress:
+        progress(stats)
+    return edit.sectors, stats
+
+
+def import_csv(model, f, defaults=None, progress=None):
+    """Stream a CSV (binary or text file object) into a SharedHierarchy with one write."""
+    wrapper = None
+    if not isinstance(f, io.TextIOBase):
+        f.seek(0)
+        f = wrapper = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+    stats = {}
+
+    def edit(sectors, index):
+        new_sectors, result = import_rows(sectors, index, read_rows(f), defaults, progress)
+        stats.update(result)
+        return new_sectors if result["added"] or result["nodes"] else None
+
+    try:
+        model.bulk_commit(edit)
+    finally:
+        # Hand the binary file back open; the caller owns it
+        if wrapper is not None:
+            wrapper.detach()
+    return stats
+
+
+def format_stats(stats):
+    return (
+        f"{stats['rows']} rows: {stats['added']} stocks added, {stats['nodes']} nodes created, "
+        f"{stats['duplicates']} duplicates, {stats['skipped']} skipped"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import stocks from a CSV into the hierarchy store.")
+    parser.add_argument("csv_file")
+    parser.add_argument("--sector", default="", help="sector for rows without one")
+    parser.add_argument("--industry", default="", help="industry for rows without one")
+    parser.add_argument("--sub-industry", default="", help="sub-industry for rows without one")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+
+    store = get_store()
+    defaults = {"sector": args.sector, "industry": args.industry, "sub_industry": args.sub_industry}
+
+    def report(stats):
+        print(f"\r{stats['rows']} rows, {stats['added']} added", end="", file=sys.stderr, flush=True)
+
+    # Hold the store for the whole import so no concurrent edit is overwritten
+    with store.transaction(), open(args.csv_file, "r", encoding="utf-8-sig", newline="") as f:
+        sectors = store.load()
+        sectors, stats = import_rows(sectors, SymbolIndex(sectors), read_rows(f), defaults, report)
+        print(file=sys.stderr)
+        if not args.dry_run and (stats["added"] or stats["nodes"]):
+            store.save(sectors)
+    print(("Would import " if args.dry_run else "Imported ") + format_stats(stats))
@@ -0,0 +1,210 @@
+# compact.py
+import math
+import sys
+from array import array
+
+import numpy as np
+
+SECTOR, INDUSTRY, SUB_INDUSTRY = 0, 1, 2
+
+# Numeric stock fields stored as float64 columns; NaN marks "not set"
+NUMERIC_FIELDS = ("price", "change", "market_cap")
+STOCK_KEYS = ("symbol", "name") + NUMERIC_FIELDS
+# stock_fields bitmask: one bit per STOCK_KEYS entry present, plus this one
+# for stocks stored as dicts rather than bare symbol strings
+IS_DICT = 1 << len(STOCK_KEYS)
+
+
+class _StringArena:
+    """Append-only UTF-8 buffer with an offsets column: ~len(s) + 4 bytes per string."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("I", [0])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def append(self, text):
+        self.data += text.encode()
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode()
+
+    def tolist(self):
+        data = self.data
+        # Offsets are byte offsets, so they index the decoded text only when it is ASCII
+        text = data.decode() if data.isascii() else None
+        source = text if text is not None else data
+        strings = [source[start:end] for start, end in zip(self.offsets, self.offsets[1:])]
+        return strings if text is not None else [b.decode() for b in strings]
+
+
+class CompactUniverse:
+    """Struct-of-arrays form of the sector -> industry -> sub-industry -> stock tree.
+
+    Nodes (sectors, industries, sub-industries) are kept in preorder in
+    parallel columns: ``node_names`` (interned), ``node_level`` and
+    ``node_parent`` (-1 for sectors). ``node_direct`` marks industries that
+    hold stocks directly (the list shape) rather than sub-industries.
+
+    Stocks are rows in their own columns with ``stock_parent`` pointing at the
+    node that lists them. Symbols and names are packed into UTF-8 arenas
+    rather than kept as one str object each, and numeric fields are float64
+    columns created only once some stock carries that field. Anything that
+    does not fit the columns (unusual stock dicts, non-list sub-industry
+    payloads) is kept verbatim in sparse side tables so ``to_json``
+    round-trips exactly.
+    """
+
+    def __init__(self):
+        self.node_names = []
+        self.node_level = array("b")
+        self.node_parent = array("i")
+        self.node_direct = array("b")
+        self.node_payload = {}
+
+        self.stock_symbols = _StringArena()
+        self.stock_names = _StringArena()
+        self.stock_parent = array("i")
+        self.stock_fields = array("B")
+        self.stock_columns = {}
+        self.stock_extra = {}
+
+    def __len__(self):
+        return len(self.stock_parent)
+
+    # -------------------
+    # Conversion
+    # -------------------
+    def _add_node(self, name, level, parent, direct=False):
+        self.node_names.append(sys.intern(name))
+        self.node_level.append(level)
+        self.node_parent.append(parent)
+        self.node_direct.append(direct)
+        return len(self.node_names) - 1
+
+    def _add_stock(self, stock, parent):
+        row = len(self.stock_parent)
+        self.stock_parent.append(parent)
+        if not isinstance(stock, dict):
+            self.stock_symbols.append(str(stock))
+            self.stock_names.append("")
+            self.stock_fields.append(0)
+            for column in self.stock_columns.values():
+                column.append(math.nan)
+            return
+        symbol = stock.get("symbol")
+        name = stock.get("name")
+        self.stock_symbols.append(symbol if isinstance(symbol, str) else "")
+        self.stock_names.append(name if isinstance(name, str) else "")
+        mask = IS_DICT
+        for bit, key in enumerate(STOCK_KEYS):
+            if key in stock:
+                mask |= 1 << bit
+        self.stock_fields.append(mask)
+        for field in NUMERIC_FIELDS:
+            value = stock.get(field)
+            if field not in self.stock_columns:
+                if not isinstance(value, float):
+                    continue
+                self.stock_columns[field] = array("d", [math.nan]) * row
+            self.stock_columns[field].append(value if isinstance(value, float) else math.nan)
+        # Dicts the columns cannot reproduce exactly (other keys, other key
+        # order, non-float numbers) are kept as-is
+        if list(stock) != self._keys(mask) or any(
+            not isinstance(stock[key], str if key in ("symbol", "name") else float) for key in stock if key in STOCK_KEYS
+        ):
+            self.stock_extra[row] = stock
+
+    @staticmethod
+    def _keys(mask):
+        return [key for bit, key in enumerate(STOCK_KEYS) if mask & (1 << bit)]
+
+    @classmethod
+    def from_json(cls, sectors):
+        universe = cls()
+        for sector, industries in sectors.items():
+            sector_id = universe._add_node(sector, SECTOR, -1)
+            for industry, sub_data in industries.items():
+                direct = isinstance(sub_data, list)
+                industry_id = universe._add_node(industry, INDUSTRY, sector_id, direct)
+                if direct:
+                    for stock in sub_data:
+                        universe._add_stock(stock, industry_id)
+                    continue
+                for sub, stocks in sub_data.items():
+                    sub_id = universe._add_node(sub, SUB_INDUSTRY, industry_id)
+                    if not isinstance(stocks, list):
+                        universe.node_payload[sub_id] = stocks
+                        continue
+                    for stock in stocks:
+                        universe._add_stock(stock, sub_id)
+        return universe
+
+    def stock(self, row):
+        """Row ``row`` in its original JSON shape (a str or a dict)."""
+        mask = self.stock_fields[row]
+        if not mask & IS_DICT:
+            return self.stock_symbols[row]
+        if row in self.stock_extra:
+            return self.stock_extra[row]
+        stock = {}
+        for key in self._keys(mask):
+            if key == "symbol":
+                stock[key] = self.stock_symbols[row]
+            elif key == "name":
+                stock[key] = self.stock_names[row]
+            else:
+                stock[key] = self.stock_columns[key][row]
+        return stock
+
+    def to_json(self):
+        sectors = {}
+        containers = {}
+        for node_id, name in enumerate(self.node_names):
+            level = self.node_level[node_id]
+            if level == SECTOR:
+                container = sectors[name] = {}
+            elif level == INDUSTRY:
+                container = [] if self.node_direct[node_id] else {}
+                containers[self.node_parent[node_id]][name] = container
+            else:
+                container = self.node_payload.get(node_id, [])
+                containers[self.node_parent[node_id]][name] = container
+            containers[node_id] = container
+        for row, parent in enumerate(self.stock_parent):
+            containers[parent].append(self.stock(row))
+        return sectors
+
+    # -------------------
+    # Traversal
+    # -------------------
+    def path(self, node_id):
+        names = []
+        while node_id != -1:
+            names.append(self.node_names[node_id])
+            node_id = self.node_parent[node_id]
+        return tuple(reversed(names))
+
+    def symbols(self):
+        return self.stock_symbols.tolist()
+
+    def sector_of_nodes(self):
+        """Sector node id for every node (parents always precede children)."""
+        sector_of = np.arange(len(self.node_names), dtype=np.int32)
+        parents = np.frombuffer(self.node_parent, dtype=np.int32)
+        for level in (INDUSTRY, SUB_INDUSTRY):
+            at_level = np.frombuffer(self.node_level, dtype=np.int8) == level
+            sector_of[at_level] = sector_of[parents[at_level]]
+        return sector_of
+
+    def stocks_per_sector(self):
+        """{sector: stock count} from the parent-index columns alone."""
+        stock_parent = np.frombuffer(self.stock_parent, dtype=np.int32)
+        counts = np.bincount(self.sector_of_nodes()[stock_parent], minlength=len(self.node_names))
+        return {
+            self.node_names[i]: int(counts[i])
+            for i in np.flatnonzero(np.frombuffer(self.node_level, dtype=np.int8) == SECTOR)
+        }
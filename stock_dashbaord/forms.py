@@ -0,0 +1,286 @@
+# forms.py
+"""Sidebar forms for editing the hierarchy, each an independently rerunning fragment.
+
+Call each form inside ``with st.sidebar:``. Browsing a form's selectboxes
+reruns only that form. Buttons commit in their ``on_click`` callback and
+then rerun just the fragments the edit touched: the sidebar forms (their
+options list the tree) and the card of the edited sector. Adding or
+deleting a sector changes the grid itself and reruns the whole page, as
+does an edit to a sector whose card this page has not drawn.
+Every form reads the latest snapshot when it runs, never the one the page
+took on its last full run.
+"""
+import streamlit as st
+
+from stock_dashbaord.bulk_import import format_stats, import_csv
+from stock_dashbaord.render import MARKET_MAP, sector_fragment_key
+from stock_dashbaord.shared_model import get_shared_hierarchy
+from stock_dashbaord.symbol_index import format_path
+
+# Ops that add or remove a whole grid cell
+LAYOUT_OPS = ("add_sector", "delete_sector")
+
+
+# -------------------
+# Messages & Reruns
+# -------------------
+def mark_drawn(form):
+    """Record that sidebar fragment ``form`` is on this page, so callbacks only rerun forms that exist."""
+    st.session_state.setdefault("sidebar_forms", set()).add(form)
+
+
+def flash(form, kind, text):
+    """Queue ``text`` for ``form``'s next run; ``kind`` names the st call ("success", "warning", ...)."""
+    st.session_state.setdefault("form_messages", {}).setdefault(form, []).append((kind, text))
+
+
+def show_flash(form):
+    """Draw and clear the messages queued for ``form``."""
+    for kind, text in st.session_state.get("form_messages", {}).pop(form, []):
+        getattr(st, kind)(text)
+
+
+def _commit(form, op, message, note=None):
+    """Commit ``op`` from a button callback and rerun what it changed."""
+    get_shared_hierarchy().commit(op)
+    flash(form, "success", message)
+    if note:
+        flash(form, "info", note)
+    card = sector_fragment_key(op["path"][0])
+    # The market map is one chart of the whole tree, with no per-sector fragments; a sector
+    # added elsewhere, or missing from the past version on screen, has no card to rerun either
+    if (op["op"] in LAYOUT_OPS or st.session_state.get("render_mode") == MARKET_MAP
+            or card not in st.session_state.get("sector_cards", ())):
+        st.rerun()
+    st.rerun(sorted(st.session_state["sidebar_forms"]) + [card])
+
+
+def _also_listed(stock, listed):
+    if listed:
+        return f"{stock} is also listed under {'; '.join(format_path(p) for p in listed)}"
+    return None
+
+
+# -------------------
+# ADD SECTION
+# -------------------
+def _add_sector():
+    sectors, _, _ = get_shared_hierarchy().snapshot()
+    new_sector = st.session_state.get("sector_input")
+    if new_sector and new_sector not in sectors:
+        _commit("add_forms", {"op": "add_sector", "path": [new_sector]}, f"Added sector: {new_sector}")
+    else:
+        flash("add_forms", "warning", "Sector already exists or invalid.")
+
+
+def _add_industry():
+    sectors, _, _ = get_shared_hierarchy().snapshot()
+    sector = st.session_state.get("sector_select")
+    new_industry = st.session_state.get("industry_input")
+    if sector in sectors and new_industry and new_industry not in sectors[sector]:
+        _commit("add_forms", {"op": "add_industry", "path": [sector, new_industry]}, f"Added industry: {new_industry}")
+    else:
+        flash("add_forms", "warning", "Industry already exists or invalid.")
+
+
+def _add_sub_industry():
+    sectors, _, _ = get_shared_hierarchy().snapshot()
+    sector = st.session_state.get("sub_sector_select")
+    industry = st.session_state.get("sub_industry_select")
+    new_subindustry = st.session_state.get("subindustry_input")
+    sub_data = sectors.get(sector, {}).get(industry)
+    if not isinstance(sub_data, dict):
+        flash("add_forms", "warning", "Cannot add sub-industry: Industry already has direct stocks.")
+    elif new_subindustry and new_subindustry not in sub_data:
+        _commit("add_forms", {"op": "add_sub_industry", "path": [sector, industry, new_subindustry]},
+                f"Added sub-industry: {new_subindustry}")
+    else:
+        flash("add_forms", "warning", "Sub-industry already exists or invalid.")
+
+
+def _add_stock(input_key, path_keys):
+    _, index, _ = get_shared_hierarchy().snapshot()
+    new_stock = st.session_state.get(input_key)
+    path = tuple(st.session_state.get(key) for key in path_keys)
+    listed = index.locate(new_stock) if new_stock else []
+    if new_stock and path not in listed:
+        _commit("add_forms", {"op": "add_stock", "path": list(path), "stock": new_stock},
+                f"Added {new_stock} to {path[-1]}", _also_listed(new_stock, listed))
+    else:
+        flash("add_forms", "warning", "Stock already exists or invalid.")
+
+
+@st.fragment(key="add_forms")
+def add_forms():
+    mark_drawn("add_forms")
+    sectors, _, _ = get_shared_hierarchy().snapshot()
+    st.subheader("➕ Add Elements")
+    show_flash("add_forms")
+
+    # --- Add Sector ---
+    st.text_input("New Sector:", key="sector_input")
+    st.button("Add Sector", on_click=_add_sector)
+
+    # --- Add Industry ---
+    if not sectors:
+        st.info("Add a sector first.")
+        return
+    st.selectbox("Select Sector for Industry", list(sectors.keys()), key="sector_select")
+    st.text_input("New Industry:", key="industry_input")
+    st.button("Add Industry", on_click=_add_industry)
+
+    # --- Add Sub-Industry ---
+    selected_sector_sub = st.selectbox("Select Sector for Sub-Industry", list(sectors.keys()), key="sub_sector_select")
+    industries = sectors[selected_sector_sub]
+    if industries:
+        st.selectbox("Select Industry", list(industries.keys()), key="sub_industry_select")
+        st.text_input("New Sub-Industry:", key="subindustry_input")
+        st.button("Add Sub-Industry", on_click=_add_sub_industry)
+    else:
+        st.info("Add an industry first.")
+
+    # --- Add Stock ---
+    selected_sector_stock = st.selectbox("Select Sector for Stock", list(sectors.keys()), key="stock_sector_select")
+    industries = sectors[selected_sector_stock]
+    if industries:
+        selected_industry_stock = st.selectbox("Select Industry", list(industries.keys()), key="stock_industry_select")
+        sub_data = industries[selected_industry_stock]
+        if isinstance(sub_data, dict) and sub_data:
+            st.selectbox("Select Sub-Industry", list(sub_data.keys()), key="stock_subindustry_select")
+            st.text_input("New Stock:", key="stock_input")
+            st.button("Add Stock", on_click=_add_stock, args=(
+                "stock_input", ("stock_sector_select", "stock_industry_select", "stock_subindustry_select")))
+        else:
+            st.text_input("New Stock Directly under Industry:", key="stock_input_direct")
+            st.button("Add Stock Directly", on_click=_add_stock, args=(
+                "stock_input_direct", ("stock_sector_select", "stock_industry_select")))
+
+
+# -------------------
+# FIND SECTION
+# -------------------
+def _delete_found(name, path):
+    _commit("find_form", {"op": "delete_stock", "path": list(path), "stock": name},
+            f"Deleted stock: {name} from {format_path(path)}")
+
+
+@st.fragment(key="find_form")
+def find_form():
+    mark_drawn("find_form")
+    _, index, _ = get_shared_hierarchy().snapshot()
+    st.subheader("🔎 Find Stock")
+    show_flash("find_form")
+    find_query = st.text_input("Symbol or name:", key="find_stock_input")
+    if find_query:
+        matches = index.search(find_query)
+        if not matches:
+            st.info("No matching stocks.")
+        for name, paths in matches:
+            for path in paths:
+                st.markdown(f"**{name}** — {format_path(path)}")
+                st.button("Delete", key=f"find_delete_{name}_{format_path(path)}", on_click=_delete_found, args=(name, path))
+
+
+# -------------------
+# BULK IMPORT SECTION
+# -------------------
+@st.fragment(key="bulk_import_form")
+def bulk_import_form():
+    mark_drawn("bulk_import_form")
+    st.subheader("📥 Bulk Import")
+    show_flash("bulk_import_form")
+    upload = st.file_uploader("CSV (symbol, name, sector, industry, sub-industry)", type="csv", key="bulk_import_file")
+    if upload is not None and st.button("Import CSV"):
+        bar = st.progress(0.0)
+        size = upload.size or 1
+        try:
+            stats = import_csv(get_shared_hierarchy(), upload,
+                               progress=lambda s: bar.progress(min(upload.tell() / size, 1.0), text=f"{s['rows']} rows"))
+        except (ValueError, UnicodeDecodeError) as e:
+            # Nothing was written (bulk_commit stores only a finished import), so just say why here
+            bar.empty()
+            flash("bulk_import_form", "error", f"Could not import {upload.name}: {e}")
+            show_flash("bulk_import_form")
+            return
+        flash("bulk_import_form", "success", f"Imported {format_stats(stats)}")
+        # An import can touch any sector or add new ones: redraw the whole page
+        st.rerun()
+
+
+# -------------------
+# DELETE SECTION
+# -------------------
+def _delete(op, path_keys, message, stock_key=None):
+    sectors, _, _ = get_shared_hierarchy().snapshot()
+    path = [st.session_state.get(key) for key in path_keys]
+    node = sectors
+    for name in path:
+        node = node.get(name) if isinstance(node, dict) else None
+    stock = st.session_state.get(stock_key) if stock_key else None
+    if node is None or (stock_key and stock not in node):
+        flash("delete_forms", "warning", "Already deleted.")
+        return
+    if stock_key:
+        _commit("delete_forms", {"op": op, "path": path, "stock": stock}, message.format(stock))
+    else:
+        _commit("delete_forms", {"op": op, "path": path}, message.format(path[-1]))
+
+
+@st.fragment(key="delete_forms")
+def delete_forms():
+    mark_drawn("delete_forms")
+    sectors, _, _ = get_shared_hierarchy().snapshot()
+    st.subheader("🗑️ Delete Elements")
+    show_flash("delete_forms")
+    if not sectors:
+        return
+
+    # --- Delete Sector ---
+    del_sector = st.selectbox("Select Sector to Delete", [""] + list(sectors.keys()), key="del_sector_select")
+    if del_sector:
+        st.button("Delete Sector", on_click=_delete, args=(
+            "delete_sector", ["del_sector_select"], "Deleted sector: {} and all its contents."))
+
+    # --- Delete Industry ---
+    sel_sector_del_ind = st.selectbox("Select Sector for Industry Delete", [""] + list(sectors.keys()), key="del_ind_sector_select")
+    if sel_sector_del_ind and sectors[sel_sector_del_ind]:
+        del_industry = st.selectbox("Select Industry to Delete", [""] + list(sectors[sel_sector_del_ind].keys()), key="del_ind_select")
+        if del_industry:
+            st.button("Delete Industry", on_click=_delete, args=(
+                "delete_industry", ["del_ind_sector_select", "del_ind_select"], "Deleted industry: {}"))
+
+    # --- Delete Sub-Industry ---
+    sel_sector_sub_del = st.selectbox("Select Sector for Sub-Industry Delete", [""] + list(sectors.keys()), key="del_sub_sector_select")
+    if sel_sector_sub_del and sectors[sel_sector_sub_del]:
+        industries_sub_del = sectors[sel_sector_sub_del]
+        sel_ind_sub_del = st.selectbox("Select Industry for Sub-Industry Delete", [""] + list(industries_sub_del.keys()), key="del_sub_ind_select")
+        if sel_ind_sub_del:
+            sub_industries = industries_sub_del[sel_ind_sub_del]
+            if isinstance(sub_industries, dict) and sub_industries:
+                del_sub = st.selectbox("Select Sub-Industry to Delete", [""] + list(sub_industries.keys()), key="del_sub_select")
+                if del_sub:
+                    st.button("Delete Sub-Industry", on_click=_delete, args=(
+                        "delete_sub_industry", ["del_sub_sector_select", "del_sub_ind_select", "del_sub_select"],
+                        "Deleted sub-industry: {}"))
+
+    # --- Delete Stock ---
+    sel_sector_stock_del = st.selectbox("Select Sector for Stock Delete", [""] + list(sectors.keys()), key="del_stock_sector_select")
+    if sel_sector_stock_del and sectors[sel_sector_stock_del]:
+        industries_stock_del = sectors[sel_sector_stock_del]
+        sel_ind_stock_del = st.selectbox("Select Industry for Stock Delete", [""] + list(industries_stock_del.keys()), key="del_stock_ind_select")
+        if sel_ind_stock_del:
+            sub_data_stock = industries_stock_del[sel_ind_stock_del]
+            if isinstance(sub_data_stock, dict) and sub_data_stock:
+                sel_sub_stock_del = st.selectbox("Select Sub-Industry", [""] + list(sub_data_stock.keys()), key="del_stock_sub_select")
+                if sel_sub_stock_del and sub_data_stock[sel_sub_stock_del]:
+                    del_stock = st.selectbox("Select Stock to Delete", [""] + sub_data_stock[sel_sub_stock_del], key="del_stock_select")
+                    if del_stock:
+                        st.button("Delete Stock", on_click=_delete, args=(
+                            "delete_stock", ["del_stock_sector_select", "del_stock_ind_select", "del_stock_sub_select"],
+                            "Deleted stock: {}", "del_stock_select"))
+            elif isinstance(sub_data_stock, list) and sub_data_stock:
+                del_stock = st.selectbox("Select Stock to Delete", [""] + sub_data_stock, key="del_stock_list_select")
+                if del_stock:
+                    st.button("Delete Stock Directly", on_click=_delete, args=(
+                        "delete_stock", ["del_stock_sector_select", "del_stock_ind_select"],
+                        "Deleted stock: {}", "del_stock_list_select"))
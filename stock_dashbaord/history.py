@@ -0,0 +1,349 @@
+# history.py
+"""Version history of the hierarchy, for undo/redo, point-in-time views and diffs.
+
+Every change to the store is one line of ``sectors.history`` (JSON lines,
+append-only, written under the store's transaction so it follows commit
+order):
+
+    {"ts": 1760000000.0, "kind": "start", "tree": {...}}   first version
+    {"ts": ..., "kind": "op", "op": {...}}                  a sidebar/API edit
+    {"ts": ..., "kind": "import", "tree": {...}}            a bulk import
+    {"ts": ..., "kind": "external", "tree": {...}}          the store changed behind our back
+    {"ts": ..., "kind": "undo" | "redo" | "restore", "to": 12}
+    {"ts": ..., "kind": "checkpoint", "number": 4000, "tree": {...}, ...}
+
+Versions are numbered from 0 in the order their lines were written. At
+twice SECTORS_HISTORY_KEEP versions (HISTORY_KEEP by default) the file is
+rewritten atomically to start with a checkpoint: the oldest version kept,
+with its whole tree, followed by the lines of the versions after it.
+Memory use and the replay at startup are therefore bounded, and
+numbering carries on from the checkpoint.
+
+Every version kept holds its whole tree, and consecutive trees share
+structure: an op is applied copy-on-write (apply_op_cow copies only the
+containers on its path), undo/redo/restore reuse the target version's
+tree object, and full trees read from the file are folded onto the
+previous version so equal subtrees become the same objects. A version
+therefore costs the path it changed, and ``diff`` can skip any subtree
+that is the same object in both trees.
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from stock_dashbaord.storage import apply_op_cow, stock_name
+from stock_dashbaord.symbol_index import format_path
+
+HISTORY_FILE = Path("sectors.history")
+# Versions kept when the file is compacted; it is compacted at twice this many
+HISTORY_KEEP = 1000
+
+
+def history_file():
+    """SECTORS_HISTORY, or sectors.history in the working directory."""
+    return Path(os.environ.get("SECTORS_HISTORY", HISTORY_FILE))
+
+
+def history_keep():
+    """SECTORS_HISTORY_KEEP, or HISTORY_KEEP."""
+    return max(int(os.environ.get("SECTORS_HISTORY_KEEP", HISTORY_KEEP)), 1)
+
+
+class Version:
+    """One history entry: the tree after it and how it came about.
+
+    ``base`` is the number of the change whose state this version shows:
+    its own for edits and restores, the target's for undo/redo. ``redo``
+    is the redo stack right after it, which a checkpoint has to carry.
+    """
+
+    __slots__ = ("number", "ts", "kind", "op", "to", "tree", "base", "redo")
+
+    def __init__(self, number, ts, kind, tree, op=None, to=None, base=None, redo=()):
+        self.number = number
+        self.ts = ts
+        self.kind = kind
+        self.tree = tree
+        self.op = op
+        self.to = to
+        self.base = number if base is None else base
+        self.redo = redo
+
+    def record(self, first=0):
+        """The history line for this version in a file starting at version ``first``.
+
+        An undo/redo/restore whose target is older than ``first`` carries
+        the tree and base itself, as the target will not be in the file.
+        """
+        record = {"ts": self.ts, "kind": self.kind}
+        if self.kind == "op":
+            record["op"] = self.op
+        elif self.kind in ("undo", "redo", "restore"):
+            record["to"] = self.to
+            if self.to < first:
+                record["base"] = self.base
+                record["tree"] = self.tree
+        else:
+            record["tree"] = self.tree
+        return record
+
+    def checkpoint(self):
+        return {"ts": self.ts, "kind": "checkpoint", "number": self.number, "of": self.kind, "op": self.op,
+                "to": self.to, "base": self.base, "redo": list(self.redo), "tree": self.tree}
+
+
+# -------------------
+# Trees
+# -------------------
+def share(new, old):
+    """``new`` with every subtree equal to the one at the same place in ``old`` replaced by ``old``'s object."""
+    if new == old:
+        return old
+    if not (isinstance(new, dict) and isinstance(old, dict)):
+        return new
+    return {key: share(value, old[key]) if key in old else value for key, value in new.items()}
+
+
+def _stocks_in(node, path):
+    if isinstance(node, list):
+        for stock in node:
+            yield path, stock
+    elif isinstance(node, dict):
+        for name, child in node.items():
+            yield from _stocks_in(child, path + (name,))
+
+
+def diff(old, new, path=()):
+    """Changes from ``old`` to ``new`` as (sign, path, stock) tuples.
+
+    ``sign`` is "+" (added), "-" (removed) or "~" (a stock's details
+    changed). ``stock`` is None for a sector, industry or sub-industry,
+    whose stocks follow as their own entries. Subtrees that are the same
+    object in both trees are not looked into.
+    """
+    if old is new:
+        return []
+    if isinstance(old, list) and isinstance(new, list):
+        before = {stock_name(s): s for s in old}
+        after = {stock_name(s): s for s in new}
+        return (
+            [("-", path, s) for name, s in before.items() if name not in after]
+            + [("+", path, s) for name, s in after.items() if name not in before]
+            + [("~", path, s) for name, s in after.items() if name in before and before[name] != s]
+        )
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for name, child in old.items():
+            if name not in new:
+                changes.append(("-", path + (name,), None))
+                changes.extend(("-", p, s) for p, s in _stocks_in(child, path + (name,)))
+            else:
+                changes.extend(diff(child, new[name], path + (name,)))
+        for name, child in new.items():
+            if name not in old:
+                changes.append(("+", path + (name,), None))
+                changes.extend(("+", p, s) for p, s in _stocks_in(child, path + (name,)))
+        return changes
+    # An industry switched between listing stocks and holding sub-industries
+    return [("-", p, s) for p, s in _stocks_in(old, path)] + [("+", p, s) for p, s in _stocks_in(new, path)]
+
+
+def summarize(changes):
+    """Changes worth showing: nodes, and stocks whose list was not itself added or removed."""
+    nodes = {(sign, path) for sign, path, stock in changes if stock is None}
+    return [
+        (sign, path, stock) for sign, path, stock in changes
+        if stock is None and not any((sign, path[:i]) in nodes for i in range(1, len(path)))
+        or stock is not None and not any((sign, path[:i]) in nodes for i in range(1, len(path) + 1))
+    ]
+
+
+# -------------------
+# History
+# -------------------
+class History:
+    """The versions of the hierarchy kept since the history file was started.
+
+    Callers hold the store's transaction around ``sync`` and ``record`` so
+    the file and the store change together. Versions before ``first`` have
+    been compacted away.
+    """
+
+    def __init__(self, path=None, keep=None):
+        self.path = Path(path or history_file())
+        self.keep = keep or history_keep()
+        self.versions = []
+        self.first = 0
+        self._offset = 0
+        self._inode = None
+        self._skip = 0  # lines after a re-read checkpoint that are already in ``versions``
+        self._redo = []  # bases undone and not yet redone, most recent last
+
+    def __len__(self):
+        """Number of the next version (versions before ``first`` included)."""
+        return self.first + len(self.versions)
+
+    @property
+    def head(self):
+        return self.versions[-1] if self.versions else None
+
+    def __contains__(self, number):
+        """Whether version ``number`` is kept."""
+        return self.first <= number < len(self)
+
+    def version(self, number):
+        if number not in self:
+            raise IndexError(f"version {number} is not kept (versions {self.first}-{len(self) - 1} are)")
+        return self.versions[number - self.first]
+
+    def tree(self, number):
+        return self.version(number).tree
+
+    def _add(self, record, tree=None):
+        kind = record["kind"]
+        previous = self.head
+        to = record.get("to")
+        base = None
+        if kind == "op":
+            tree = tree if tree is not None else apply_op_cow(previous.tree, record["op"])
+        elif kind in ("undo", "redo", "restore") and "tree" not in record:
+            tree = self.tree(to)
+            base = self.version(to).base if kind != "restore" else None
+        elif tree is None:
+            # Full trees, and jumps to versions compacted away, which carry their own
+            tree = share(record["tree"], previous.tree) if previous else record["tree"]
+            base = record.get("base") if kind in ("undo", "redo") else None
+        if kind == "undo":
+            self._redo.append(previous.base)
+        elif kind == "redo":
+            self._redo.pop()
+        else:
+            self._redo.clear()
+        version = Version(len(self), record["ts"], kind, tree, record.get("op"), to, base, tuple(self._redo))
+        self.versions.append(version)
+        return version
+
+    def _add_checkpoint(self, record):
+        number = record["number"]
+        if self.versions and self.first <= number <= self.head.number:
+            # The file was compacted by another process: keep what we already hold from here on
+            del self.versions[:number - self.first]
+            self.first = number
+            self._skip = self.head.number - number
+            return 0
+        tree = share(record["tree"], self.head.tree) if self.versions else record["tree"]
+        self.versions = [Version(number, record["ts"], record["of"], tree, record["op"], record["to"],
+                                 record["base"], tuple(record["redo"]))]
+        self.first = number
+        self._redo = list(record["redo"])
+        return 1
+
+    def catch_up(self):
+        """Read what others appended since the last call; returns how many versions were added."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self._offset):
+            # Replaced by a compaction: read it again from its checkpoint
+            self._offset = 0
+        self._inode = stat.st_ino
+        added = 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from an interrupted append
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self._offset += len(line)
+                if record["kind"] == "checkpoint":
+                    added += self._add_checkpoint(record)
+                elif self._skip:
+                    self._skip -= 1
+                else:
+                    self._add(record)
+                    added += 1
+        return added
+
+    def _append(self, record):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+        with open(self.path, "ab") as f:
+            f.write(line)
+        self._offset += len(line)
+        self._inode = os.stat(self.path).st_ino
+
+    def record(self, kind, tree=None, **fields):
+        """Append a version; ``tree`` is the resulting tree when the caller already has it."""
+        record = {"ts": time.time(), "kind": kind, **fields}
+        if kind in ("start", "import", "external"):
+            record["tree"] = tree
+        self._append(record)
+        version = self._add(record, tree)
+        if len(self.versions) >= 2 * self.keep:
+            self.compact()
+        return version
+
+    def compact(self, keep=None):
+        """Drop all but the last ``keep`` versions, rewriting the file to start with a checkpoint."""
+        drop = len(self.versions) - (keep or self.keep)
+        if drop <= 0:
+            return
+        kept = self.versions[drop:]
+        records = [kept[0].checkpoint()] + [version.record(kept[0].number) for version in kept[1:]]
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode() + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        stat = os.stat(self.path)
+        self._offset, self._inode = stat.st_size, stat.st_ino
+        self.versions = kept
+        self.first = kept[0].number
+
+    def sync(self, tree):
+        """Catch up and make sure the head version is ``tree``; returns the head's tree.
+
+        Starts the file with ``tree`` if there is none, and records the
+        difference as an external change when the store was edited without
+        going through the history (e.g. the bulk import CLI or a hand edit).
+        The returned tree is equal to ``tree`` but shares the history's objects.
+        """
+        self.catch_up()
+        if not self.versions:
+            self.record("start", tree)
+        elif self.head.tree != tree:
+            self.record("external", share(tree, self.head.tree))
+        return self.head.tree
+
+    def undo_target(self):
+        """Version to return to for undo: the state before the change shown now (None if there is none)."""
+        head = self.head
+        return head.base - 1 if head and head.base > self.first else None
+
+    def redo_target(self):
+        return self._redo[-1] if self._redo and self._redo[-1] >= self.first else None
+
+    def describe(self, number):
+        """One line saying what version ``number`` changed."""
+        version = self.version(number)
+        if version.kind == "op":
+            op = version.op
+            kind, target = op["op"].split("_", 1)
+            what = stock_name(op["stock"]) if target == "stock" else op["path"][-1]
+            where = format_path(op["path"] if target == "stock" else op["path"][:-1])
+            return f"{'Added' if kind == 'add' else 'Deleted'} {target.replace('_', '-')} {what}" + (f" in {where}" if where else "")
+        if version.kind in ("undo", "redo", "restore"):
+            return f"{version.kind.capitalize()} to version {version.to}"
+        return {"start": "History started", "import": "Bulk import", "external": "Edited outside the dashboard"}[version.kind]
@@ -0,0 +1,161 @@
+# history_panel.py
+"""Undo/redo, time travel and version diffs over the hierarchy's history (see history.py).
+
+``history_form`` is a sidebar fragment like the edit forms: undo, redo and
+the "View version" selector. Undo, redo and restore store an earlier tree
+as the latest version, so they are edits like any other and can
+themselves be undone. Viewing a past version changes nothing: the page
+draws that version read-only through ``version_view``.
+"""
+from datetime import datetime
+
+import streamlit as st
+
+from stock_dashbaord.forms import flash, mark_drawn, show_flash
+from stock_dashbaord.history import diff, summarize
+from stock_dashbaord.shared_model import get_shared_hierarchy
+from stock_dashbaord.storage import stock_name
+from stock_dashbaord.symbol_index import format_path
+
+# Newest versions offered in the selectors
+VERSION_CHOICES = 500
+# Diff lines shown before the rest are only counted
+DIFF_LINES = 200
+SIGNS = {"+": "added", "-": "removed", "~": "changed"}
+
+
+class PointInTime:
+    """Read-only stand-in for a SharedHierarchy showing one past version, for render_dashboard."""
+
+    def __init__(self, number, sectors):
+        self.number = number
+        self.sectors = sectors
+        # Never equal to a live version, so caches keyed on it do not mix the two
+        self.version = ("history", number)
+
+    def snapshot(self):
+        return self.sectors, None, self.version
+
+
+def _label(history, number):
+    if number is None:
+        return "Latest"
+    stamp = datetime.fromtimestamp(history.version(number).ts)
+    return f"v{number} · {stamp:%Y-%m-%d %H:%M} · {history.describe(number)}"
+
+
+def _choices(history, selected=None):
+    # Newest first; typing a date or a name into the selectbox filters them
+    newest = len(history) - 1
+    numbers = [None] + list(range(newest, max(newest - VERSION_CHOICES, history.first - 1), -1))
+    if selected is not None and selected not in numbers:
+        numbers.append(selected)
+    return numbers
+
+
+def _kept(key, history):
+    # A selection compacted out of the history since the last run falls back to the latest version
+    number = st.session_state.get(key)
+    if number is not None and number not in history:
+        st.session_state[key] = number = None
+    return number
+
+
+# -------------------
+# Undo / Redo
+# -------------------
+def _jump(kind, number=None):
+    model = get_shared_hierarchy()
+    history = model.history
+    # What undo takes back is the change shown now; redo and restore name their target
+    undone = history.head.base if kind == "undo" else None
+    version = model.jump(kind, number)
+    if version is None:
+        flash("history_form", "info", "Already the latest version." if kind == "restore" else f"Nothing to {kind}.")
+    elif kind == "undo":
+        flash("history_form", "success", f"Undid v{undone}: {history.describe(undone)}")
+    elif kind == "redo":
+        flash("history_form", "success", f"Redid v{version.to}: {history.describe(version.to)}")
+    else:
+        flash("history_form", "success", f"Restored v{version.to} as v{version.number}")
+    st.session_state["view_version"] = None
+    # Any sector may have changed: redraw the whole page
+    st.rerun()
+
+
+def _view_changed():
+    # Changing the selectbox only reruns this fragment; the page must redraw the picked version
+    st.rerun()
+
+
+@st.fragment(key="history_form")
+def history_form():
+    mark_drawn("history_form")
+    model = get_shared_hierarchy()
+    model.snapshot()  # catch up with other sessions' edits first
+    history = model.history
+    st.subheader("🕘 History")
+    show_flash("history_form")
+
+    undo, redo = history.undo_target(), history.redo_target()
+    left, right = st.columns(2)
+    left.button("↶ Undo", on_click=_jump, args=("undo",), disabled=undo is None, width="stretch",
+                help=f"Undo v{history.head.base}: {history.describe(history.head.base)}" if undo is not None else None)
+    right.button("↷ Redo", on_click=_jump, args=("redo",), disabled=redo is None, width="stretch",
+                 help=f"Redo v{redo}: {history.describe(redo)}" if redo is not None else None)
+
+    st.selectbox("View version", _choices(history, _kept("view_version", history)),
+                 format_func=lambda n: _label(history, n), key="view_version", on_change=_view_changed)
+
+
+# -------------------
+# Past Versions
+# -------------------
+def render_diff(old, new):
+    """Changes from tree ``old`` to tree ``new``, as a +/- listing with counts."""
+    changes = summarize(diff(old, new))
+    if not changes:
+        st.caption("No differences.")
+        return
+    counts = {sign: 0 for sign in SIGNS}
+    for sign, _, _ in changes:
+        counts[sign] += 1
+    st.caption(" · ".join(f"{n} {SIGNS[sign]}" for sign, n in counts.items() if n))
+    lines = [
+        f"{sign} {format_path(path)}" if stock is None else f"{sign} {stock_name(stock)} in {format_path(path)}"
+        for sign, path, stock in changes[:DIFF_LINES]
+    ]
+    if len(changes) > DIFF_LINES:
+        lines.append(f"… and {len(changes) - DIFF_LINES} more")
+    st.code("\n".join(lines), language="diff")
+
+
+@st.fragment(key="version_diff")
+def _version_diff(number):
+    history = get_shared_hierarchy().history
+    if number not in history:
+        st.caption(f"v{number} is no longer kept.")
+        return
+    other = st.selectbox("Compare with", _choices(history, _kept("compare_version", history)),
+                         format_func=lambda n: _label(history, n),
+                         key="compare_version")
+    other = len(history) - 1 if other is None else other
+    if other < number:
+        st.caption(f"Changes from v{other} to v{number}")
+        render_diff(history.tree(other), history.tree(number))
+    else:
+        st.caption(f"Changes from v{number} to v{other}")
+        render_diff(history.tree(number), history.tree(other))
+
+
+def version_view(model):
+    """The version the page should draw: ``model`` itself, or the past version picked in the sidebar."""
+    history = model.history
+    number = st.session_state.get("view_version")
+    if number is None or number not in history:
+        return model
+    st.info(f"Viewing {_label(history, number)} (read only). Sidebar edits apply to the latest version.")
+    st.button("Restore this version", on_click=_jump, args=("restore", number))
+    with st.expander("Compare versions"):
+        _version_diff(number)
+    return PointInTime(number, history.tree(number))
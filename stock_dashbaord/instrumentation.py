@@ -0,0 +1,318 @@
+# instrumentation.py
+"""Opt-in per-rerun timing spans, element counts and peak memory.
+
+Enable with DASHBOARD_PROFILE=1 or by opening a page with ``?profile=1``.
+A page runs its body inside ``with start_rerun(page) as profiler:`` and
+marks its phases. Leaving the block normally draws the debug panel and
+writes the rerun as a Chrome trace (load it in chrome://tracing or
+https://ui.perfetto.dev) to DASHBOARD_TRACE_DIR ("traces" by default).
+When the rerun ends early (``st.rerun``, ``st.stop`` or an error) the
+block still removes the element hook and releases tracemalloc, and
+reports nothing. When profiling is off every call is a no-op.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+TRACE_DIR = Path(os.environ.get("DASHBOARD_TRACE_DIR", "traces"))
+
+_local = threading.local()
+
+# tracemalloc is process-wide: profilers of concurrent reruns share it, and
+# it is stopped when the last one is done if this module started it
+_tracing_lock = threading.Lock()
+_tracing_profilers = set()
+_tracing_started = False
+
+
+def _acquire_tracemalloc(profiler):
+    global _tracing_started
+    with _tracing_lock:
+        if not _tracing_profilers:
+            _tracing_started = not tracemalloc.is_tracing()
+            if _tracing_started:
+                tracemalloc.start()
+        else:
+            # Traced memory and reset_peak() are process-wide too, so neither
+            # rerun's peak is its own any more
+            profiler.overlapped = True
+            for other in _tracing_profilers:
+                other.overlapped = True
+        _tracing_profilers.add(profiler)
+
+
+def _release_tracemalloc(profiler):
+    with _tracing_lock:
+        _tracing_profilers.discard(profiler)
+        if not _tracing_profilers and _tracing_started:
+            tracemalloc.stop()
+
+
+def profiling_enabled():
+    if os.environ.get("DASHBOARD_PROFILE", "") not in ("", "0"):
+        return True
+    try:
+        return st.query_params.get("profile") == "1"
+    except Exception:
+        # Not running inside a Streamlit script
+        return False
+
+
+class _NullProfiler:
+    enabled = False
+
+    @contextmanager
+    def span(self, name):
+        yield
+
+    def phase(self, name):
+        pass
+
+    def finish(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class Profiler:
+    """Timing spans for one rerun of one page.
+
+    ``span(name)`` nests; ``phase(name)`` ends the previous top-level phase
+    and starts the next, which suits flat page scripts. Each span records
+    wall time, the number of elements (deltas) the page sent while it was
+    open with their serialized size, and peak traced memory above the
+    level at span start. tracemalloc runs only while profiling, and slows
+    Python allocations noticeably, so compare timings between profiled runs
+    only. tracemalloc counts every thread's allocations, so when another
+    profiled rerun (another session) overlaps this one, ``overlapped`` is
+    set and no peaks are reported.
+    """
+
+    enabled = True
+
+    def __init__(self, page):
+        self.page = page
+        self.spans = []
+        self.elements = 0
+        self.element_bytes = 0
+        self.peak = 0
+        self.overlapped = False
+        self._stack = []
+        self._phase = None
+        self._ctx = get_script_run_ctx()
+        self._hook_enqueue()
+        _acquire_tracemalloc(self)
+        self._tracing = True
+        tracemalloc.reset_peak()
+        self.start_ns = time.perf_counter_ns()
+        self.started_at = datetime.now()
+        self._root = self._open(page)
+        # Whatever runs before the page's first phase() lands here
+        self.phase("setup")
+
+    # -------------------
+    # Element counting
+    # -------------------
+    def _hook_enqueue(self):
+        # ScriptRunContext hands every ForwardMsg of the rerun to _enqueue;
+        # counting deltas there sees elements from every page and helper.
+        ctx = self._ctx
+        if ctx is None or not hasattr(ctx, "_enqueue"):
+            return
+        enqueue = getattr(ctx._enqueue, "_unhooked", ctx._enqueue)
+
+        def counting_enqueue(msg):
+            if msg.WhichOneof("type") == "delta":
+                self.elements += 1
+                self.element_bytes += msg.ByteSize()
+            enqueue(msg)
+
+        counting_enqueue._unhooked = enqueue
+        ctx._enqueue = counting_enqueue
+
+    def _unhook_enqueue(self):
+        ctx = self._ctx
+        if ctx is not None and hasattr(getattr(ctx, "_enqueue", None), "_unhooked"):
+            ctx._enqueue = ctx._enqueue._unhooked
+
+    # -------------------
+    # Spans
+    # -------------------
+    def _fold_peak(self):
+        # reset_peak() is global, so fold the peak so far into every open span first
+        current, peak = tracemalloc.get_traced_memory()
+        for span in self._stack:
+            span["peak"] = max(span["peak"], peak)
+        self.peak = max(self.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _open(self, name):
+        current = self._fold_peak()
+        span = {
+            "name": name,
+            "depth": len(self._stack),
+            "start": time.perf_counter_ns(),
+            "elements": self.elements,
+            "element_bytes": self.element_bytes,
+            "mem_start": current,
+            "peak": current,
+        }
+        self._stack.append(span)
+        return span
+
+    def _close(self, span):
+        if not any(open_span is span for open_span in self._stack):
+            return
+        while self._stack:
+            self._fold_peak()
+            top = self._stack.pop()
+            top["duration"] = time.perf_counter_ns() - top["start"]
+            top["elements"] = self.elements - top["elements"]
+            top["element_bytes"] = self.element_bytes - top["element_bytes"]
+            top["peak"] = top["peak"] - top["mem_start"]
+            self.spans.append(top)
+            if top is span:
+                break
+
+    @contextmanager
+    def span(self, name):
+        span = self._open(name)
+        try:
+            yield span
+        finally:
+            self._close(span)
+
+    def phase(self, name):
+        if self._phase is not None:
+            self._close(self._phase)
+        self._phase = self._open(name)
+
+    # -------------------
+    # Reporting
+    # -------------------
+    def close(self):
+        """Remove the element hook and release tracemalloc; safe to call more than once."""
+        self._unhook_enqueue()
+        if getattr(_local, "profiler", None) is self:
+            _local.profiler = None
+        if self._tracing:
+            self._tracing = False
+            _release_tracemalloc(self)
+
+    def finish(self):
+        """Close all spans, draw the debug panel and write the trace file."""
+        if self._phase is not None:
+            self._close(self._phase)
+            self._phase = None
+        self._close(self._root)
+        self.close()
+        path = self.write_trace()
+        self.render(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A rerun that was cut short has nothing worth drawing, but must not leave the hooks behind
+        if exc_type is None:
+            self.finish()
+        else:
+            self.close()
+        return False
+
+    def trace(self):
+        """Chrome trace-event JSON for this rerun."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                "name": span["name"],
+                "cat": self.page,
+                "ph": "X",
+                "ts": (span["start"] - self.start_ns) / 1000,
+                "dur": span["duration"] / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {
+                    "elements": span["elements"],
+                    "element_bytes": span["element_bytes"],
+                    "peak_bytes": None if self.overlapped else span["peak"],
+                },
+            }
+            for span in sorted(self.spans, key=lambda s: (s["start"], s["depth"]))
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "metadata": {
+                "page": self.page,
+                "started_at": self.started_at.isoformat(),
+                "peak_bytes": None if self.overlapped else self.peak,
+            },
+        }
+
+    def write_trace(self):
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        path = TRACE_DIR / f"{self.page}-{self.started_at:%Y%m%d-%H%M%S-%f}.json"
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+        return path
+
+    def frame(self):
+        # pandas is slow to import and only the debug panel needs it
+        import pandas as pd
+
+        spans = sorted(self.spans, key=lambda s: (s["start"], s["depth"]))
+        total = self._root["duration"] or 1
+        return pd.DataFrame({
+            "span": ["  " * s["depth"] + s["name"] for s in spans],
+            "ms": [s["duration"] / 1e6 for s in spans],
+            "% of rerun": [100 * s["duration"] / total for s in spans],
+            "elements": [s["elements"] for s in spans],
+            "KB sent": [s["element_bytes"] / 1024 for s in spans],
+            "peak KB": [float("nan") if self.overlapped else s["peak"] / 1024 for s in spans],
+        })
+
+    def render(self, trace_path=None):
+        root = self._root
+        peak = "peak n/a" if self.overlapped else f"peak {self.peak / 1024 / 1024:.1f} MB"
+        with st.expander(f"🐞 Rerun profile: {root['duration'] / 1e6:.1f} ms, {root['elements']} elements, {peak}"):
+            if self.overlapped:
+                st.caption("Another profiled rerun ran at the same time; memory peaks would mix both, so none are shown.")
+            st.dataframe(self.frame(), hide_index=True, width="stretch")
+            st.download_button(
+                "Download Chrome trace",
+                json.dumps(self.trace()),
+                file_name=trace_path.name if trace_path else f"{self.page}-trace.json",
+                mime="application/json",
+                key=f"profile_trace_{self.page}",
+            )
+            if trace_path:
+                st.caption(f"Saved to {trace_path}")
+
+
+def start_rerun(page):
+    """Profiler for this rerun of ``page`` (a no-op one unless profiling is enabled)."""
+    profiler = Profiler(page) if profiling_enabled() else _NullProfiler()
+    _local.profiler = profiler
+    return profiler
+
+
+def current_profiler():
+    """The profiler of the rerun running on this thread, for spans inside helpers."""
+    return getattr(_local, "profiler", None) or _NullProfiler()
@@ -0,0 +1,196 @@
+# market_map.py
+"""Market map: the whole hierarchy as one treemap chart.
+
+Tile area comes from market cap (or is equal per stock), colour from %
+change. The layout is slice-and-dice: each group is cut into strips for
+its children along its longer side, which needs only a cumulative sum of
+sibling weights. Every level is computed with array operations over the
+QuoteTable's integer codes, so the cost grows with the number of stocks,
+not with the number of Python objects built, and the browser gets one
+chart element however large the universe is.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from stock_dashbaord.analytics import QuoteTable
+
+MAP_WIDTH = 1200
+MAP_HEIGHT = 700
+SIZE_OPTIONS = ["Market cap", "Equal"]
+# % change at which tile colour saturates
+CHANGE_DOMAIN = 5
+# Tiles smaller than this (in map units) get no symbol label
+LABEL_MIN_WIDTH = 40
+LABEL_MIN_HEIGHT = 14
+
+
+# -------------------
+# Layout
+# -------------------
+def _split(parent, weight, rects):
+    """Rectangles for children laid side by side, in order, inside ``rects[parent]``.
+
+    ``rects`` is an (n, 4) array of x0, y0, x1, y1. Each child gets a strip
+    proportional to its weight among its siblings, cut across the
+    parent's longer side.
+    """
+    order = np.argsort(parent, kind="stable")
+    p, w = parent[order], weight[order]
+    before = np.cumsum(w) - w
+    first = np.concatenate(([True], p[1:] != p[:-1]))
+    before -= before[first][np.cumsum(first) - 1]
+    total = np.bincount(parent, weights=weight, minlength=len(rects))[p]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        start = np.nan_to_num(before / total)
+        end = np.nan_to_num((before + w) / total)
+    x0, y0, x1, y1 = rects[p].T
+    across = (x1 - x0) >= (y1 - y0)
+    out = np.empty((len(parent), 4))
+    out[order] = np.column_stack([
+        np.where(across, x0 + start * (x1 - x0), x0),
+        np.where(across, y0, y0 + start * (y1 - y0)),
+        np.where(across, x0 + end * (x1 - x0), x1),
+        np.where(across, y1, y0 + end * (y1 - y0)),
+    ])
+    return out
+
+
+def _parents(child_codes, parent_codes, n_children):
+    """Parent id of every child group, scattered from the per-row codes."""
+    parent = np.zeros(n_children, dtype=np.int64)
+    keep = child_codes >= 0
+    parent[child_codes[keep]] = parent_codes[keep]
+    return parent
+
+
+def _names(codes, names):
+    """Categorical of ``names[codes]``, missing where the code is -1; names may repeat across groups."""
+    uniques, inverse = np.unique(np.array(names, dtype=object), return_inverse=True)
+    return pd.Categorical.from_codes(np.append(inverse, -1)[codes], uniques)
+
+
+def treemap_layout(table: QuoteTable, size="Market cap", width=MAP_WIDTH, height=MAP_HEIGHT):
+    """(tiles, groups) DataFrames for every stock row and every sector/industry.
+
+    Both carry x0, y0, x1, y1 in map units; tiles also carry the names,
+    % change and weight, groups their level and name. Groups and stocks
+    with no weight are left out.
+    """
+    codes = table.codes
+    n_sector, n_industry, n_sub = (len(table.keys[level]) for level in ("sector", "industry", "sub_industry"))
+    weight = np.ones(len(table.symbols))
+    if size == "Market cap":
+        known = ~np.isnan(table.weight)
+        # Stocks without a cap get the median one, so they neither vanish nor dominate
+        weight = np.where(known, table.weight, np.median(table.weight[known]) if known.any() else 1.0)
+        weight = np.clip(weight, 0, None)
+
+    sector_w = np.bincount(codes["sector"], weights=weight, minlength=n_sector)
+    industry_w = np.bincount(codes["industry"], weights=weight, minlength=n_industry)
+    has_sub = codes["sub_industry"] >= 0
+    sub_w = np.bincount(codes["sub_industry"][has_sub], weights=weight[has_sub], minlength=n_sub)
+
+    root = np.array([[0.0, 0.0, width, height]])
+    sector_rects = _split(np.zeros(n_sector, dtype=np.int64), sector_w, root)
+    industry_rects = _split(_parents(codes["industry"], codes["sector"], n_industry), industry_w, sector_rects)
+    sub_rects = _split(_parents(codes["sub_industry"], codes["industry"], n_sub), sub_w, industry_rects)
+    # A stock's parent is its sub-industry, or its industry when listed directly
+    leaf = np.where(has_sub, n_industry + codes["sub_industry"], codes["industry"])
+    tiles_rects = _split(leaf, weight, np.vstack([industry_rects, sub_rects]))
+
+    # float32 and categorical columns keep the Arrow payload sent to the browser small
+    tiles = pd.DataFrame(tiles_rects.astype(np.float32), columns=["x0", "y0", "x1", "y1"])
+    tiles["symbol"] = table.symbols
+    tiles["sector"] = _names(codes["sector"], table.keys["sector"])
+    tiles["industry"] = _names(codes["industry"], [key[1] for key in table.keys["industry"]])
+    tiles["sub_industry"] = _names(codes["sub_industry"], [key[2] for key in table.keys["sub_industry"]])
+    tiles["change"] = table.change.astype(np.float32)
+    tiles["weight"] = weight.astype(np.float32)
+    tiles = tiles[weight > 0]
+
+    groups = pd.DataFrame(np.vstack([sector_rects, industry_rects]), columns=["x0", "y0", "x1", "y1"])
+    groups["level"] = ["sector"] * n_sector + ["industry"] * n_industry
+    groups["name"] = list(table.keys["sector"]) + [key[1] for key in table.keys["industry"]]
+    groups = groups[np.concatenate([sector_w, industry_w]) > 0]
+    return tiles.reset_index(drop=True), groups.reset_index(drop=True)
+
+
+# -------------------
+# Chart
+# -------------------
+def market_map_spec(tiles, groups, width=MAP_WIDTH, height=MAP_HEIGHT):
+    """One layered Vega-Lite spec: stock tiles, sector/industry outlines and labels.
+
+    Written as a plain dict rather than through Altair, whose schema
+    validation costs more than the layout itself. The DataFrames go in
+    ``datasets``, which Streamlit sends as Arrow.
+    """
+    x = {"field": "x0", "type": "quantitative", "axis": None, "scale": {"domain": [0, width], "nice": False}}
+    y = {"field": "y0", "type": "quantitative", "axis": None,
+         "scale": {"domain": [0, height], "nice": False, "reverse": True}}
+    x2, y2 = {"field": "x1"}, {"field": "y1"}
+    sector = "datum.level == 'sector'"
+    labelled = tiles[((tiles.x1 - tiles.x0) >= LABEL_MIN_WIDTH) & ((tiles.y1 - tiles.y0) >= LABEL_MIN_HEIGHT)]
+    return {
+        "height": height,
+        "datasets": {"tiles": tiles, "labels": labelled[["x0", "y0", "symbol"]], "groups": groups},
+        "layer": [
+            {
+                "data": {"name": "tiles"},
+                "mark": {"type": "rect", "stroke": "white", "strokeWidth": 0.3},
+                "encoding": {
+                    "x": x, "x2": x2, "y": y, "y2": y2,
+                    "color": {
+                        "condition": {
+                            "test": "isValid(datum.change)", "field": "change", "type": "quantitative",
+                            "scale": {"scheme": "redyellowgreen", "domain": [-CHANGE_DOMAIN, CHANGE_DOMAIN], "clamp": True},
+                            "legend": {"title": "% change"},
+                        },
+                        "value": "#bdc3c7",
+                    },
+                    "tooltip": [
+                        {"field": "symbol", "type": "nominal"},
+                        {"field": "sector", "type": "nominal"},
+                        {"field": "industry", "type": "nominal"},
+                        {"field": "sub_industry", "type": "nominal"},
+                        {"field": "change", "type": "quantitative", "format": "+.2f"},
+                        {"field": "weight", "type": "quantitative", "format": ",.0f"},
+                    ],
+                },
+            },
+            {
+                "data": {"name": "groups"},
+                "mark": {"type": "rect", "fill": None},
+                "encoding": {
+                    "x": x, "x2": x2, "y": y, "y2": y2,
+                    "stroke": {"condition": {"test": sector, "value": "#2c3e50"}, "value": "#7f8c8d"},
+                    "strokeWidth": {"condition": {"test": sector, "value": 2}, "value": 0.8},
+                },
+            },
+            {
+                "data": {"name": "labels"},
+                "mark": {"type": "text", "align": "left", "baseline": "top", "dx": 2, "dy": 2, "fontSize": 9, "color": "#2c3e50"},
+                "encoding": {"x": x, "y": y, "text": {"field": "symbol", "type": "nominal"}},
+            },
+            {
+                "data": {"name": "groups"},
+                "transform": [{"filter": sector}],
+                "mark": {"type": "text", "align": "left", "baseline": "top", "dx": 3, "dy": 3,
+                         "fontSize": 12, "fontWeight": "bold", "color": "#2c3e50"},
+                "encoding": {"x": x, "y": y, "text": {"field": "name", "type": "nominal"}},
+            },
+        ],
+    }
+
+
+def render_market_map(table):
+    """Market map of ``table`` (a QuoteTable with the latest quotes folded in)."""
+    size = st.radio("Tile size", SIZE_OPTIONS, horizontal=True, key="map_size")
+    if not len(table.symbols):
+        st.info("No stocks to map yet.")
+        return
+    tiles, groups = treemap_layout(table, size)
+    st.vega_lite_chart(spec=market_map_spec(tiles, groups), width="stretch")
+    quoted = int((~np.isnan(table.change)).sum())
+    st.caption(f"{len(tiles)} stocks in {len(groups[groups.level == 'sector'])} sectors · {quoted} with quotes")
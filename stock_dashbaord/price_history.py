@@ -0,0 +1,298 @@
+# price_history.py
+"""Local per-symbol price history and the sparklines drawn from it.
+
+Each symbol is one append-only file of fixed-width records (int64 epoch
+seconds, float64 price) in the PRICE_HISTORY folder. Reads memory-map the
+file, so a lookup is a view onto the page cache rather than a parsed copy,
+and finding a time window is a binary search on the time column.
+
+Sparklines cover the last SPARKLINE_SPAN_SECONDS of a series, downsampled
+with LTTB (largest-triangle-three-buckets) to SPARKLINE_POINTS points, so a
+stock costs the same small inline SVG however much history it has.
+
+    python -m stock_dashbaord.price_history import prices.csv   # symbol,date,close
+    python -m stock_dashbaord.price_history mock [--days 750]    # random walks for every listed stock
+"""
+import argparse
+import csv
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote as quote_path
+
+import numpy as np
+import streamlit as st
+
+RECORD = np.dtype([("t", "<i8"), ("price", "<f8")])
+
+SPARKLINE_POINTS = 32
+SPARKLINE_SPAN_SECONDS = 365 * 24 * 3600
+SPARKLINE_WIDTH = 64
+SPARKLINE_HEIGHT = 16
+# Below this many points LTTB runs on Python floats rather than numpy slices
+LTTB_PYTHON_MAX = 2000
+# Cached sparklines are trusted this long before the files are checked for appends
+REFRESH_SECONDS = 30
+# Sparklines kept per process (one per stock and per group drawn), least recently used dropped first
+SPARKLINES = 20000
+
+
+# -------------------
+# Downsampling
+# -------------------
+def lttb(x, y, n_out):
+    """Indices of the ``n_out`` points of (x, y) that best keep the line's shape.
+
+    Largest-triangle-three-buckets: keeps the first and last point and, from
+    each of ``n_out - 2`` equal buckets in between, the point forming the
+    largest triangle with the previously kept point and the next bucket's mean.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Mean of the bucket after each one (the last point for the last bucket), all at once
+    counts = np.diff(edges[1:], append=n)
+    next_x = (np.add.reduceat(x, edges[1:]) / counts).tolist()
+    next_y = (np.add.reduceat(y, edges[1:]) / counts).tolist()
+    bounds = edges.tolist()
+    # With a handful of points per bucket, plain floats beat a few numpy calls per bucket
+    small = n <= LTTB_PYTHON_MAX
+    xs, ys = (x.tolist(), y.tolist()) if small else (x, y)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        xa, ya = float(xs[a]), float(ys[a])
+        # Twice the triangle's area is |y * c1 + x * c2 + c0| for a point (x, y) of this bucket
+        c1, c2, c0 = xa - next_x[i], next_y[i] - ya, next_x[i] * ya - xa * next_y[i]
+        if small:
+            best = -1.0
+            for j in range(lo, hi):
+                area = abs(ys[j] * c1 + xs[j] * c2 + c0)
+                if area > best:
+                    best, a = area, j
+        else:
+            a = lo + int(np.abs(y[lo:hi] * c1 + x[lo:hi] * c2 + c0).argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def sparkline_svg(x, y):
+    """Inline SVG polyline of (x, y) scaled to the sparkline box, green when it ends higher."""
+    if len(x) < 2:
+        return ""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_span = (x[-1] - x[0]) or 1.0
+    y_span = (y.max() - y.min()) or 1.0
+    px = (x - x[0]) * ((SPARKLINE_WIDTH - 1) / x_span)
+    py = (SPARKLINE_HEIGHT - 1) - (y - y.min()) * ((SPARKLINE_HEIGHT - 2) / y_span)
+    points = " ".join(f"{a},{b}" for a, b in zip(px.round().astype(int).tolist(), py.round().astype(int).tolist()))
+    color = "#27ae60" if y[-1] > y[0] else "#e74c3c" if y[-1] < y[0] else "#95a5a6"
+    return (
+        f"<svg class='spark' width='{SPARKLINE_WIDTH}' height='{SPARKLINE_HEIGHT}'>"
+        f"<polyline fill='none' stroke='{color}' stroke-width='1.2' points='{points}'/></svg>"
+    )
+
+
+# -------------------
+# Store
+# -------------------
+class PriceHistory:
+    """Append-only price series, one memory-mapped file per symbol, with cached sparklines."""
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._sparklines = OrderedDict()  # key -> (checked at, file sizes, svg), oldest use first
+        self._lock = threading.Lock()
+
+    def path(self, symbol):
+        return self.folder / f"{quote_path(symbol, safe='')}.bin"
+
+    def _size(self, symbol):
+        try:
+            return os.stat(self.path(symbol)).st_size
+        except FileNotFoundError:
+            return 0
+
+    def series(self, symbol):
+        """The symbol's records as a read-only memory map (None without history).
+
+        The map is a view of the file as it is now; later appends need
+        another call.
+        """
+        size = self._size(symbol)
+        if size < RECORD.itemsize:
+            return None
+        return np.memmap(self.path(symbol), dtype=RECORD, mode="r", shape=(size // RECORD.itemsize,))
+
+    def window(self, symbol, seconds=SPARKLINE_SPAN_SECONDS):
+        """Records from the last ``seconds`` of the symbol's history (a view, not a copy)."""
+        records = self.series(symbol)
+        if records is None:
+            return None
+        return records[np.searchsorted(records["t"], records["t"][-1] - seconds):]
+
+    def append(self, symbol, times, prices):
+        """Append points, dropping any not newer than what is already stored; returns how many were kept."""
+        records = np.empty(len(times), dtype=RECORD)
+        records["t"] = times
+        records["price"] = prices
+        records = records[np.argsort(records["t"], kind="stable")]
+        if len(records):
+            records = records[np.concatenate(([True], np.diff(records["t"]) > 0))]
+        stored = self.series(symbol)
+        if stored is not None:
+            records = records[records["t"] > stored["t"][-1]]
+            del stored
+        if len(records):
+            with open(self.path(symbol), "ab") as f:
+                f.write(records.tobytes())
+        return len(records)
+
+    def _cached(self, key, symbols, build):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._sparklines.get(key)
+            if cached and now - cached[0] < REFRESH_SECONDS:
+                self._sparklines.move_to_end(key)
+                return cached[2]
+        # Built outside the lock: sessions drawing different stocks do not wait on each other
+        sizes = tuple(self._size(s) for s in symbols)
+        if not cached or cached[1] != sizes:
+            cached = (now, sizes, build())
+        with self._lock:
+            self._sparklines[key] = (now, cached[1], cached[2])
+            self._sparklines.move_to_end(key)
+            if len(self._sparklines) > SPARKLINES:
+                self._sparklines.popitem(last=False)
+        return cached[2]
+
+    def _stock_svg(self, symbol):
+        records = self.window(symbol)
+        if records is None:
+            return ""
+        t = np.asarray(records["t"], dtype=float)
+        price = np.asarray(records["price"], dtype=float)
+        keep = lttb(t, price, SPARKLINE_POINTS)
+        return sparkline_svg(t[keep], price[keep])
+
+    def _group_svg(self, symbols):
+        # Equal-weighted: each member rebased to 1 at the start of the common window
+        windows = [w for w in map(self.window, symbols) if w is not None]
+        if not windows:
+            return ""
+        end = max(int(w["t"][-1]) for w in windows)
+        grid = np.linspace(end - SPARKLINE_SPAN_SECONDS, end, SPARKLINE_POINTS)
+        total = np.zeros(SPARKLINE_POINTS)
+        members = 0
+        for w in windows:
+            curve = np.interp(grid, w["t"], w["price"])
+            if not curve[0] > 0:
+                continue  # a zero (or missing) first price cannot be rebased
+            total += curve / curve[0]
+            members += 1
+        return sparkline_svg(grid, total / members) if members else ""
+
+    def stock_sparkline(self, symbol):
+        """Sparkline markup for one symbol ("" without history)."""
+        return self._cached(symbol, (symbol,), lambda: self._stock_svg(symbol))
+
+    def group_sparkline(self, symbols):
+        """Sparkline of the equal-weighted average of ``symbols`` ("" if none has history)."""
+        symbols = tuple(symbols)
+        return self._cached(symbols, symbols, lambda: self._group_svg(symbols))
+
+
+def history_from_env():
+    """PRICE_HISTORY: folder of the history files; unset disables sparklines."""
+    folder = os.environ.get("PRICE_HISTORY", "")
+    return PriceHistory(folder) if folder else None
+
+
+@st.cache_resource
+def get_price_history():
+    return history_from_env()
+
+
+# -------------------
+# Loading History
+# -------------------
+def _timestamp(value):
+    if value.lstrip("-").isdigit():
+        return int(value)
+    stamp = datetime.fromisoformat(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return int(stamp.timestamp())
+
+
+def import_csv(history, path):
+    """Append a CSV of symbol, date (ISO or epoch seconds), close/price rows; returns points kept."""
+    points = {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = set(reader.fieldnames or ())
+        if "symbol" not in columns or not columns & {"date", "timestamp"} or not columns & {"close", "price"}:
+            raise ValueError(
+                f"{path} needs columns symbol, date (or timestamp) and close (or price); "
+                f"found {', '.join(reader.fieldnames or ()) or 'none'}"
+            )
+        for row in reader:
+            price = row.get("close") or row.get("price")
+            when = row.get("date") or row.get("timestamp")
+            symbol = (row.get("symbol") or "").strip()
+            if symbol and price and when:
+                points.setdefault(symbol, []).append((_timestamp(when), float(price)))
+    kept = 0
+    for symbol, rows in points.items():
+        times, prices = zip(*rows)
+        kept += history.append(symbol, times, prices)
+    return kept
+
+
+def mock_history(history, symbols, days=750, end=None):
+    """Daily random walks for ``symbols``, seeded by the symbol so reruns agree."""
+    end = int(end or time.time()) // 86400 * 86400
+    times = end - 86400 * np.arange(days)[::-1]
+    for symbol in symbols:
+        rng = np.random.default_rng(int.from_bytes(hashlib.md5(symbol.encode()).digest()[:8], "big"))
+        start = 50 + rng.random() * 5000
+        prices = start * np.exp(np.cumsum(rng.normal(0.0003, 0.02, days)))
+        history.append(symbol, times, np.round(prices, 2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the local price history used for sparklines.")
+    parser.add_argument("--folder", default=os.environ.get("PRICE_HISTORY", "price_history"))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("import", help="append a symbol,date,close CSV").add_argument("csv")
+    commands.add_parser("mock", help="random walks for every listed stock").add_argument("--days", type=int, default=750)
+    args = parser.parse_args()
+
+    history = PriceHistory(args.folder)
+    if args.command == "import":
+        try:
+            kept = import_csv(history, args.csv)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Appended {kept} points to {args.folder}")
+    else:
+        from stock_dashbaord.storage import get_store, stock_name
+        from stock_dashbaord.symbol_index import iter_stock_lists
+
+        stocks = (s for _, stocks in iter_stock_lists(get_store().load()) for s in stocks)
+        # A dict stock without a symbol has no file to write
+        symbols = [s for s in dict.fromkeys(map(stock_name, stocks)) if s]
+        mock_history(history, symbols, args.days)
+        print(f"Wrote {args.days} days for {len(symbols)} symbols to {args.folder}")
@@ -0,0 +1,238 @@
+# quotes.py
+import asyncio
+import csv
+import hashlib
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote as quote_url, urlsplit
+
+import streamlit as st
+
+from stock_dashbaord.storage import stock_name
+
+# Quotes younger than this are served from cache without any provider call
+QUOTE_TTL_SECONDS = 30
+# A rerun waits at most this long for quotes; anything slower shows no price
+FETCH_TIMEOUT_SECONDS = 3.0
+
+
+# -------------------
+# Providers
+# -------------------
+# A provider turns a batch of symbols into {symbol: {"price": ..., "change": ...}}.
+# Symbols it does not know are simply left out of the result.
+
+class QuoteProvider:
+    batch_size = 50
+    concurrency = 8
+
+    async def fetch(self, symbols):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MockQuoteProvider(QuoteProvider):
+    """Deterministic offline quotes derived from the symbol; ``latency`` fakes a network."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    async def fetch(self, symbols):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        quotes = {}
+        for symbol in symbols:
+            digest = hashlib.md5(symbol.encode()).digest()
+            price = 50 + int.from_bytes(digest[:4], "big") % 500000 / 100
+            change = (int.from_bytes(digest[4:6], "big") % 1001 - 500) / 100
+            quotes[symbol] = {"price": round(price, 2), "change": change}
+        return quotes
+
+
+class FileQuoteProvider(QuoteProvider):
+    """Quotes from a local JSON ({symbol: {price, change}}) or CSV (symbol,price,change) file."""
+
+    batch_size = 1000
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._mtime = None
+        self._quotes = {}
+
+    def _refresh(self):
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self._mtime:
+            return
+        if self.path.suffix == ".csv":
+            with open(self.path, newline="") as f:
+                quotes = {
+                    row["symbol"]: {"price": float(row["price"]), "change": float(row.get("change") or 0)}
+                    for row in csv.DictReader(f)
+                }
+        else:
+            with open(self.path, "r") as f:
+                quotes = json.load(f)
+        self._quotes, self._mtime = quotes, mtime
+
+    async def fetch(self, symbols):
+        self._refresh()
+        return {s: self._quotes[s] for s in symbols if s in self._quotes}
+
+
+class HttpQuoteProvider(QuoteProvider):
+    """Batched JSON quote endpoint, e.g. ``https://host/quotes?symbols={symbols}``.
+
+    The endpoint must answer {symbol: {"price": ..., "change": ...}} for the
+    comma-separated symbols. Keep-alive connections are pooled and reused
+    across batches and reruns; each blocking request runs in a worker thread so
+    the batches of one rerun are in flight concurrently.
+    """
+
+    def __init__(self, url_template, batch_size=50, concurrency=8, timeout=FETCH_TIMEOUT_SECONDS):
+        self.url_template = url_template
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        parts = urlsplit(url_template)
+        self._scheme, self._host = parts.scheme, parts.netloc
+        self._pool = queue.LifoQueue()
+
+    def _connection(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            return cls(self._host, timeout=self.timeout)
+
+    def _get(self, symbols):
+        url = urlsplit(self.url_template.format(symbols=quote_url(",".join(symbols))))
+        target = url.path + (f"?{url.query}" if url.query else "")
+        conn = self._connection()
+        try:
+            conn.request("GET", target, headers={"Accept": "application/json"})
+            response = conn.getresponse()
+            body = response.read()
+        except Exception:
+            conn.close()
+            raise
+        self._pool.put(conn)
+        if response.status != 200:
+            raise OSError(f"Quote request failed with HTTP {response.status}")
+        return json.loads(body)
+
+    async def fetch(self, symbols):
+        return await asyncio.to_thread(self._get, symbols)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+def provider_from_env():
+    """QUOTES_PROVIDER: "mock", "file:<path>" or an http(s) URL template; unset disables quotes."""
+    spec = os.environ.get("QUOTES_PROVIDER", "")
+    if not spec:
+        return None
+    if spec == "mock":
+        return MockQuoteProvider()
+    if spec.startswith("file:"):
+        return FileQuoteProvider(spec[len("file:"):])
+    if spec.startswith(("http://", "https://")):
+        return HttpQuoteProvider(spec)
+    raise ValueError(f"Unknown QUOTES_PROVIDER: {spec}")
+
+
+# -------------------
+# Quote Engine
+# -------------------
+class QuoteEngine:
+    """TTL cache in front of a provider, fetching misses in concurrent batches."""
+
+    def __init__(self, provider, ttl=QUOTE_TTL_SECONDS, timeout=FETCH_TIMEOUT_SECONDS):
+        self.provider = provider
+        self.ttl = ttl
+        self.timeout = timeout
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.monotonic()
+        self.calls = 0
+
+    async def _fetch_all(self, symbols):
+        semaphore = asyncio.Semaphore(self.provider.concurrency)
+        batches = [symbols[i:i + self.provider.batch_size] for i in range(0, len(symbols), self.provider.batch_size)]
+
+        async def fetch_batch(batch):
+            async with semaphore:
+                # Sessions fetch from their own threads, each with its own event loop
+                with self._lock:
+                    self.calls += 1
+                return await self.provider.fetch(batch)
+
+        tasks = {asyncio.create_task(fetch_batch(batch)): batch for batch in batches}
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+        results = {}
+        answered = []
+        for task in done:
+            if task.exception() is None:
+                results.update(task.result())
+                answered.extend(tasks[task])
+        return results, answered
+
+    def get_quotes(self, symbols):
+        now = time.monotonic()
+        quotes = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cached = self._cache.get(symbol)
+            if cached and now - cached[0] < self.ttl:
+                if cached[1] is not None:
+                    quotes[symbol] = cached[1]
+            else:
+                missing.append(symbol)
+        if missing:
+            fetched, answered = asyncio.run(self._fetch_all(missing))
+            now = time.monotonic()
+            # Symbols from failed or timed-out batches stay uncached and are retried
+            # next rerun; ones the provider does not know are cached as None.
+            with self._lock:
+                for symbol in answered:
+                    quote = fetched.get(symbol)
+                    self._cache[symbol] = (now, quote)
+                    if quote is not None:
+                        quotes[symbol] = quote
+                if now - self._pruned_at >= self.ttl:
+                    self._prune(now)
+        return quotes
+
+    def _prune(self, now):
+        # Caller holds the lock. Drops the symbols of stocks since deleted, or
+        # only shown once, instead of keeping every symbol ever quoted
+        self._cache = {symbol: entry for symbol, entry in self._cache.items() if now - entry[0] < self.ttl}
+        self._pruned_at = now
+
+
+@st.cache_resource
+def get_quote_engine():
+    provider = provider_from_env()
+    return QuoteEngine(provider) if provider else None
+
+
+def with_quote(stock, quotes):
+    """The stock as a dict carrying price/change when a quote is available."""
+    if not quotes:
+        return stock
+    symbol = stock_name(stock)
+    quote = quotes.get(symbol)
+    if quote is None:
+        return stock
+    base = stock if isinstance(stock, dict) else {"symbol": symbol}
+    return {**base, "price": quote.get("price", ""), "change": quote.get("change", 0)}
@@ -0,0 +1,379 @@
+# render.py
+import math
+
+import streamlit as st
+
+from stock_dashbaord.instrumentation import current_profiler
+from stock_dashbaord.quotes import with_quote
+from stock_dashbaord.storage import stock_name
+
+# The market map (market_map.py) draws one chart instead of the sector grid
+MARKET_MAP = "Market map"
+RENDER_MODES = ["Lazy", "Batched", "Classic", MARKET_MAP]
+
+# Stocks shown per list before a "Show more" button in lazy mode
+PAGE_SIZE = 50
+
+DASHBOARD_CSS = """
+<style>
+    .sector-card {background: #f8f9fa; border-radius: 8px; padding: 15px; margin-bottom: 20px; border-left: 4px solid #3498db;}
+    .industry-header {background: #ecf0f1; padding: 10px; border-radius: 5px; margin: 10px 0;}
+    .sub-industry-box {background: white; border: 1px solid #ddd; border-radius: 4px; padding: 10px; margin: 5px 0; height: 100%;}
+    .stock-item {padding: 5px 0; border-bottom: 1px solid #eee; font-size: 13px;}
+    .stock-item:last-child {border-bottom: none;}
+    .empty-state {color: #95a5a6; font-style: italic; font-size: 12px;}
+    .sub-grid {display: grid; grid-template-columns: repeat(2, minmax(0, 1fr)); column-gap: 12px;}
+    .spark {vertical-align: middle; margin-left: 6px;}
+</style>
+"""
+
+
+def format_stock_display(stock_info):
+    """
+    Format stock display with symbol, name, and optional metrics.
+    stock_info can be string or dict with details.
+    """
+    if isinstance(stock_info, str):
+        return f"<span style='color:#2c3e50; font-weight:500;'>{stock_info}</span>"
+    elif isinstance(stock_info, dict):
+        symbol = stock_info.get('symbol', 'N/A')
+        name = stock_info.get('name', '')
+        price = stock_info.get('price', '')
+        change = stock_info.get('change', 0)
+
+        color = "#27ae60" if change > 0 else "#e74c3c" if change < 0 else "#95a5a6"
+        change_symbol = "▲" if change > 0 else "▼" if change < 0 else "●"
+
+        display = f"<span style='color:#2c3e50; font-weight:600;'>{symbol}</span>"
+        if name:
+            display += f"<span style='color:#7f8c8d; font-size:11px;'> - {name}</span>"
+        if price:
+            display += f"<span style='color:#34495e; margin-left:5px;'>₹{price}</span>"
+        if change:
+            display += f"<span style='color:{color}; margin-left:5px;'>{change_symbol} {abs(change)}%</span>"
+        return display
+    return str(stock_info)
+
+
+def stock_item_html(stock, quotes=None, history=None):
+    """One stock's display with its quote and, when ``history`` (a PriceHistory) has it, its sparkline."""
+    spark = history.stock_sparkline(stock_name(stock)) if history else ""
+    return format_stock_display(with_quote(stock, quotes)) + spark
+
+
+def group_sparkline(stocks, history=None):
+    return history.group_sparkline(map(stock_name, stocks)) if history and stocks else ""
+
+
+# -------------------
+# Batched Rendering
+# -------------------
+# One HTML string per sector, laid out with a CSS grid instead of nested
+# st.columns, so a sector costs a single markdown element however many
+# stocks it holds. The markup is kept on one line: a blank line or a 4-space
+# indent would end the HTML block and let markdown reinterpret the rest.
+
+EMPTY_STOCKS_HTML = "<p class='empty-state'>No stocks</p>"
+
+
+def _group_stats(rollups, level, key):
+    return rollups[level].get(key) if rollups else None
+
+
+def rollup_html(stats):
+    """Inline roll-up badge: mean % change and advancers/decliners, with
+    median and cap-weighted change in the tooltip."""
+    if not stats:
+        return ""
+    change = stats["mean_change"]
+    color = "#27ae60" if change > 0 else "#e74c3c" if change < 0 else "#95a5a6"
+    arrow = "▲" if change > 0 else "▼" if change < 0 else "●"
+    title = f"median {stats['median_change']:+.2f}% · cap-weighted {stats['cap_weighted_change']:+.2f}%"
+    return (
+        f"<span title='{title}' style='color:{color}; font-size:12px; margin-left:8px;'>"
+        f"{arrow} {abs(change):.2f}% · {stats['advancers']}↑ {stats['decliners']}↓</span>"
+    )
+
+
+def rollup_label(stats):
+    """Markdown version of rollup_html for widget labels."""
+    if not stats:
+        return ""
+    change = stats["mean_change"]
+    color = "green" if change > 0 else "red" if change < 0 else "gray"
+    arrow = "▲" if change > 0 else "▼" if change < 0 else "●"
+    return f" · :{color}[{arrow} {abs(change):.2f}%] {stats['advancers']}↑ {stats['decliners']}↓"
+
+
+def _stock_items_html(stocks, limit=None, quotes=None, history=None):
+    stocks = stocks if isinstance(stocks, list) else list(stocks)
+    shown = stocks if limit is None else stocks[:limit]
+    html = "".join(f"<div class='stock-item'>• {stock_item_html(s, quotes, history)}</div>" for s in shown)
+    if len(shown) < len(stocks):
+        html += f"<p class='empty-state'>… {len(stocks) - len(shown)} more</p>"
+    return html
+
+
+def industry_html(sector, industry, sub_data, limit=None, quotes=None, rollups=None, history=None):
+    """HTML for one industry. ``limit(sub)`` caps the stocks drawn per list
+    (``sub`` is None for stocks listed directly under the industry),
+    ``quotes`` fills in price/change for the symbols it covers,
+    ``rollups`` (QuoteTable.rollups()) adds group badges to the headers and
+    ``history`` (a PriceHistory) adds sparklines to stocks and sub-industries."""
+    limit = limit or (lambda sub: None)
+    parts = [
+        "<div class='industry-header'>"
+        f"<strong style='color:#2c3e50; font-size:15px;'>🏭 {industry}</strong>"
+        f"{rollup_html(_group_stats(rollups, 'industry', (sector, industry)))}"
+        "</div>"
+    ]
+    if isinstance(sub_data, dict):
+        if not sub_data:
+            parts.append("<p class='empty-state'>No sub-industries</p>")
+        else:
+            parts.append("<div class='sub-grid'>")
+            for sub, stocks in sub_data.items():
+                stock_count = len(stocks) if stocks else 0
+                parts.append(
+                    "<div class='sub-industry-box'>"
+                    f"<strong style='color:#7f8c8d; font-size:13px;'>📁 {sub} ({stock_count})</strong>"
+                    f"{rollup_html(_group_stats(rollups, 'sub_industry', (sector, industry, sub)))}"
+                    f"{group_sparkline(stocks, history)}"
+                )
+                parts.append(_stock_items_html(stocks, limit(sub), quotes, history) if stocks else EMPTY_STOCKS_HTML)
+                parts.append("</div>")
+            parts.append("</div>")
+    elif isinstance(sub_data, list):
+        if sub_data:
+            direct_limit = limit(None)
+            shown = sub_data if direct_limit is None else sub_data[:direct_limit]
+            parts.append("<div class='sub-grid'>")
+            for s in shown:
+                parts.append(f"<div class='sub-industry-box'><div class='stock-item'>• {stock_item_html(s, quotes, history)}</div></div>")
+            parts.append("</div>")
+            if len(shown) < len(sub_data):
+                parts.append(f"<p class='empty-state'>… {len(sub_data) - len(shown)} more</p>")
+        else:
+            parts.append(EMPTY_STOCKS_HTML)
+    return "".join(parts)
+
+
+def sector_html(sector, industries, quotes=None, rollups=None, history=None):
+    if not industries:
+        return "<p class='empty-state'>No industries added</p>"
+    return "".join(
+        industry_html(sector, industry, sub_data, quotes=quotes, rollups=rollups, history=history)
+        for industry, sub_data in industries.items()
+    ) + "<br>"
+
+
+def render_sector_batched(sector, industries, quotes=None, rollups=None, history=None):
+    st.markdown(sector_html(sector, industries, quotes, rollups, history), unsafe_allow_html=True)
+
+
+# -------------------
+# Lazy Rendering
+# -------------------
+# Collapsed sectors send only a header and their counts; the body is built
+# only for sectors the user has opened, and long stock lists are paged.
+
+def sector_summary(industries):
+    n_subs = n_stocks = 0
+    for sub_data in industries.values():
+        if isinstance(sub_data, dict):
+            n_subs += len(sub_data)
+            n_stocks += sum(len(stocks) for stocks in sub_data.values())
+        elif isinstance(sub_data, list):
+            n_stocks += len(sub_data)
+    return f"{len(industries)} industries · {n_subs} sub-industries · {n_stocks} stocks"
+
+
+def _toggle_sector(sector):
+    open_sectors = st.session_state.setdefault("open_sectors", set())
+    open_sectors.symmetric_difference_update({sector})
+
+
+def _show_more(key):
+    limits = st.session_state.setdefault("stock_limits", {})
+    limits[key] = limits.get(key, PAGE_SIZE) + PAGE_SIZE
+
+
+def render_sector_lazy(sector, industries, quotes=None, rollups=None, history=None):
+    if not industries:
+        st.markdown("<p class='empty-state'>No industries added</p>", unsafe_allow_html=True)
+        return
+    limits = st.session_state.setdefault("stock_limits", {})
+    for industry, sub_data in industries.items():
+        def limit(sub):
+            return limits.get((sector, industry, sub), PAGE_SIZE)
+
+        st.markdown(industry_html(sector, industry, sub_data, limit, quotes, rollups, history), unsafe_allow_html=True)
+
+        if isinstance(sub_data, dict):
+            lists = [(sub, stocks) for sub, stocks in sub_data.items() if isinstance(stocks, list)]
+        else:
+            lists = [(None, sub_data)]
+        for sub, stocks in lists:
+            if len(stocks) > limit(sub):
+                st.button(
+                    f"Show more in {sub or industry} ({limit(sub)}/{len(stocks)})",
+                    key=f"more_{sector}_{industry}_{sub}",
+                    on_click=_show_more,
+                    args=((sector, industry, sub),),
+                )
+
+
+def render_sector_card(sector, industries, quotes=None, rollups=None, history=None):
+    open_sectors = st.session_state.setdefault("open_sectors", set())
+    with st.container(border=True):
+        is_open = st.toggle(
+            f"🏦 **{sector}**{rollup_label(_group_stats(rollups, 'sector', sector))}",
+            value=sector in open_sectors,
+            key=f"open_{sector}",
+            on_change=_toggle_sector,
+            args=(sector,),
+        )
+        st.caption(sector_summary(industries))
+        if is_open:
+            render_sector_lazy(sector, industries, quotes, rollups, history)
+
+
+# -------------------
+# Classic Rendering
+# -------------------
+# One markdown element per header/box/stock with nested st.columns.
+def render_sector_classic(sector, industries, quotes=None, rollups=None, history=None):
+    if not industries:
+        st.markdown("<p class='empty-state'>No industries added</p>", unsafe_allow_html=True)
+        return
+    for industry, sub_data in industries.items():
+        st.markdown(f"""
+            <div class='industry-header'>
+                <strong style='color:#2c3e50; font-size:15px;'>🏭 {industry}</strong>{rollup_html(_group_stats(rollups, 'industry', (sector, industry)))}
+            </div>
+        """, unsafe_allow_html=True)
+
+        if isinstance(sub_data, dict):
+            if not sub_data:
+                st.markdown("<p class='empty-state'>No sub-industries</p>", unsafe_allow_html=True)
+            else:
+                sub_keys = list(sub_data.keys())
+                n_sub_rows = math.ceil(len(sub_keys) / 2)
+                for sub_row in range(n_sub_rows):
+                    sub_cols = st.columns(2, gap="small")
+                    for sub_col in range(2):
+                        sub_idx = sub_row * 2 + sub_col
+                        if sub_idx >= len(sub_keys):
+                            break
+                        sub = sub_keys[sub_idx]
+                        stocks = sub_data[sub]
+                        with sub_cols[sub_col]:
+                            stock_count = len(stocks) if stocks else 0
+                            st.markdown(f"""
+                                <div class='sub-industry-box'>
+                                    <strong style='color:#7f8c8d; font-size:13px;'>📁 {sub} ({stock_count})</strong>{rollup_html(_group_stats(rollups, 'sub_industry', (sector, industry, sub)))}{group_sparkline(stocks, history)}
+                            """, unsafe_allow_html=True)
+                            if stocks:
+                                for s in stocks:
+                                    st.markdown(f"<div class='stock-item'>• {stock_item_html(s, quotes, history)}</div>", unsafe_allow_html=True)
+                            else:
+                                st.markdown("<p class='empty-state'>No stocks</p>", unsafe_allow_html=True)
+                            st.markdown("</div>", unsafe_allow_html=True)
+        elif isinstance(sub_data, list):
+            if sub_data:
+                n_stock_rows = math.ceil(len(sub_data) / 2)
+                for stock_row in range(n_stock_rows):
+                    stock_cols = st.columns(2, gap="small")
+                    for stock_col in range(2):
+                        stock_idx = stock_row * 2 + stock_col
+                        if stock_idx >= len(sub_data):
+                            break
+                        with stock_cols[stock_col]:
+                            st.markdown(f"""
+                                <div class='sub-industry-box'>
+                                    <div class='stock-item'>• {stock_item_html(sub_data[stock_idx], quotes, history)}</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+            else:
+                st.markdown("<p class='empty-state'>No stocks</p>", unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+# -------------------
+# Main Dashboard Layout
+# -------------------
+def visible_symbols(sectors, mode="Batched"):
+    """Symbols the given layout will draw this rerun (open, unpaged ones in Lazy mode)."""
+    symbols = []
+    if mode == "Lazy":
+        open_sectors = st.session_state.get("open_sectors", set())
+        limits = st.session_state.get("stock_limits", {})
+    for sector, industries in sectors.items():
+        if mode == "Lazy" and sector not in open_sectors:
+            continue
+        for industry, sub_data in industries.items():
+            lists = sub_data.items() if isinstance(sub_data, dict) else [(None, sub_data)]
+            for sub, stocks in lists:
+                if not isinstance(stocks, list):
+                    continue
+                if mode == "Lazy":
+                    stocks = stocks[:limits.get((sector, industry, sub), PAGE_SIZE)]
+                symbols.extend(stock_name(s) for s in stocks)
+    return symbols
+
+
+def sector_fragment_key(sector):
+    """Fragment key of ``sector``'s grid cell, for ``st.rerun`` from edit callbacks."""
+    return f"sector_card:{sector}"
+
+
+def _render_sector_cell(model, sector, mode, get_quotes, get_rollups, history):
+    # Runs as the cell's own fragment: an edit to this sector or a toggle in
+    # its card reruns only this function, so read the tree, quotes and
+    # roll-ups afresh instead of trusting what the last full run passed in.
+    sectors, _, _ = model.snapshot()
+    industries = sectors.get(sector)
+    if industries is None:
+        return  # deleted; the next full run drops the cell
+    quotes = get_quotes(visible_symbols({sector: industries}, mode)) if get_quotes else None
+    rollups = get_rollups(sector) if get_rollups else None
+    with current_profiler().span(f"render: {sector}"):
+        if mode == "Lazy":
+            render_sector_card(sector, industries, quotes, rollups, history)
+            return
+        render_sector = render_sector_batched if mode == "Batched" else render_sector_classic
+        label = f"🏦 **{sector}**{rollup_label(_group_stats(rollups, 'sector', sector))}"
+        with st.expander(label, expanded=False):
+            render_sector(sector, industries, quotes, rollups, history)
+
+
+def render_dashboard(model, mode="Batched", get_quotes=None, get_rollups=None, history=None):
+    """Sector grid for ``model`` (a SharedHierarchy), every cell an independently rerunning fragment.
+
+    ``model`` may also be a history_panel.PointInTime to draw a past version.
+    ``get_quotes(symbols)`` supplies prices for the stocks a cell draws;
+    ``get_rollups(sector)`` (see analytics.sector_rollups) the badges for
+    one sector's groups; ``history`` (a PriceHistory) adds sparklines.
+    """
+    st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
+
+    sectors, _, _ = model.snapshot()
+    sector_keys = list(sectors.keys())
+    n_sector_rows = math.ceil(len(sector_keys) / 3)  # 3 sectors per row
+    # Fragment keys of the cards this run draws, so edit callbacks only rerun cards that exist
+    drawn = st.session_state["sector_cards"] = set()
+
+    for r in range(n_sector_rows):
+        cols = st.columns(3, gap="medium")
+
+        for c in range(3):
+            idx = r*3 + c
+            if idx >= len(sector_keys):
+                break
+
+            sector = sector_keys[idx]
+            with cols[c]:
+                cell = st.fragment(_render_sector_cell, key=sector_fragment_key(sector))
+                cell(model, sector, mode, get_quotes, get_rollups, history)
+                drawn.add(sector_fragment_key(sector))
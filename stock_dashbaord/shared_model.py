@@ -0,0 +1,156 @@
+# shared_model.py
+import threading
+
+from stock_dashbaord.history import History
+from stock_dashbaord.storage import apply_op_cow, get_store
+from stock_dashbaord.symbol_index import SymbolIndex
+
+
+class SharedHierarchy:
+    """One parsed hierarchy per server process, shared by every session.
+
+    Readers take ``snapshot()`` once per rerun and treat the tree as
+    read-only. ``commit`` builds the next tree copy-on-write (only the
+    containers on the op's path are copied) under a lock and swaps it in, so a
+    session that is still rendering the previous version is never disturbed.
+    Edits made by other processes are picked up through the store's stamp and
+    replayed op by op where the store can list them, without a full reload.
+    Every commit is also recorded in ``history`` (see history.py), which
+    undo/redo and restores go through.
+
+    Each change is published as one (sectors, index, version, etag) tuple,
+    so a reader on another thread never pairs one version's tree with
+    another's number or ETag.
+    """
+
+    def __init__(self, store=None, history=None):
+        self.store = store or get_store()
+        self.history = history if history is not None else History()
+        self._lock = threading.Lock()
+        self.sectors = {}
+        self.index = SymbolIndex()
+        self.version = 0
+        self._stamp = None
+        with self.store.transaction():
+            self._reload()
+
+    def _publish(self, sectors, index=None):
+        # Caller holds the lock and the store transaction
+        self.sectors = sectors
+        if index is not None:
+            self.index = index
+        self._stamp = self.store.stamp()
+        self.version += 1
+        self._current = (self.sectors, self.index, self.version, self.store.etag)
+
+    def _reload(self):
+        # Caller holds the store transaction
+        sectors = self.history.sync(self.store.load())
+        self._publish(sectors, SymbolIndex(sectors))
+
+    def _catch_up(self):
+        """Fold in what other processes stored since we last read; caller holds the store transaction."""
+        changes = self.store.changes()
+        if changes is None:
+            self._reload()
+            return
+        recorded = self.history.catch_up()
+        sectors = self.sectors
+        for op in changes:
+            self.index.apply(sectors, op)
+            sectors = apply_op_cow(sectors, op)
+            if not recorded:
+                # Journaled by a writer that does not keep the history
+                self.history.record("op", op=op)
+        if changes:
+            self._publish(sectors)
+        else:
+            self._stamp = self.store.stamp()
+
+    def stale(self):
+        """Whether the store changed on disk since this model last read it; only stats files."""
+        return self.store.stamp() != self._stamp
+
+    def current(self):
+        """(sectors, index, version, etag) as last published; never waits for the store's lock."""
+        return self._current
+
+    def snapshot(self):
+        """(sectors, index, version), catching up first if the store changed on disk."""
+        if self.stale():
+            with self._lock, self.store.transaction():
+                if self.stale():
+                    self._catch_up()
+        return self._current[:3]
+
+    def commit(self, op):
+        """Apply and persist ``op`` on top of the latest stored state; returns the new tree.
+
+        Edits committed meanwhile by other processes are replayed first, so a
+        session working from an older snapshot rebases its single op rather
+        than overwriting theirs.
+        """
+        with self._lock, self.store.transaction():
+            self._catch_up()
+            sectors = apply_op_cow(self.sectors, op)
+            self.index.apply(self.sectors, op)
+            self.store.append(sectors, op)
+            self.history.record("op", sectors, op=op)
+            self._publish(sectors)
+            return sectors
+
+    def bulk_commit(self, edit):
+        """Run ``edit(sectors, index)`` under the lock and persist its result in one write.
+
+        ``edit`` must leave ``sectors`` untouched and return the new tree (or
+        None for no change), updating ``index`` in place as it goes.
+        """
+        with self._lock, self.store.transaction():
+            self._catch_up()
+            try:
+                sectors = edit(self.sectors, self.index)
+            except Exception:
+                self.index = SymbolIndex(self.sectors)
+                self._current = (self.sectors, self.index, self.version, self.store.etag)
+                raise
+            if sectors is None:
+                return self.sectors
+            self.store.save(sectors)
+            self.history.record("import", sectors)
+            self._publish(sectors)
+            return sectors
+
+    def jump(self, kind, number=None):
+        """Undo, redo or restore version ``number``, storing that version's tree as the latest.
+
+        ``kind`` is "undo", "redo" or "restore". Returns the history Version
+        recorded, or None when there was nothing to undo/redo or the tree
+        would not change.
+        """
+        with self._lock, self.store.transaction():
+            self._catch_up()
+            if kind == "undo":
+                number = self.history.undo_target()
+            elif kind == "redo":
+                number = self.history.redo_target()
+            if number is None or number not in self.history or self.history.tree(number) is self.history.head.tree:
+                return None
+            sectors = self.history.tree(number)
+            self.store.save(sectors)
+            version = self.history.record(kind, to=number)
+            self._publish(sectors, SymbolIndex(sectors))
+            return version
+
+
+_cached_hierarchy = None
+
+
+def get_shared_hierarchy():
+    """The process-wide SharedHierarchy of the Streamlit pages, kept in st.cache_resource."""
+    global _cached_hierarchy
+    if _cached_hierarchy is None:
+        # Imported here: the headless API builds its own SharedHierarchy and never loads Streamlit
+        import streamlit as st
+
+        _cached_hierarchy = st.cache_resource(SharedHierarchy)
+    return _cached_hierarchy()
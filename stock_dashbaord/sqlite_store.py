@@ -0,0 +1,399 @@
+# sqlite_store.py
+import argparse
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from stock_dashbaord.storage import DB_FILE, JOURNAL_FILE, JsonStore, _stat, stock_name, symbol_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sectors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS industries (
+    id INTEGER PRIMARY KEY,
+    sector_id INTEGER NOT NULL REFERENCES sectors(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    direct INTEGER NOT NULL DEFAULT 0,  -- 1 when stocks sit directly under the industry
+    UNIQUE (sector_id, name)
+);
+CREATE TABLE IF NOT EXISTS sub_industries (
+    id INTEGER PRIMARY KEY,
+    industry_id INTEGER NOT NULL REFERENCES industries(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    payload TEXT,  -- JSON for the rare nested-dict sub-industry, stored as-is
+    UNIQUE (industry_id, name)
+);
+CREATE TABLE IF NOT EXISTS stocks (
+    id INTEGER PRIMARY KEY,
+    industry_id INTEGER NOT NULL REFERENCES industries(id) ON DELETE CASCADE,
+    sub_industry_id INTEGER REFERENCES sub_industries(id) ON DELETE CASCADE,
+    symbol TEXT NOT NULL,
+    payload TEXT  -- JSON for dict-shaped stocks, NULL for bare symbols
+);
+CREATE INDEX IF NOT EXISTS idx_stocks_symbol ON stocks(symbol);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_stocks_parent
+    ON stocks(industry_id, coalesce(sub_industry_id, 0), symbol);
+CREATE INDEX IF NOT EXISTS idx_sub_industries_parent ON sub_industries(industry_id);
+-- 'version' is bumped in the same transaction as every write; 'epoch' is
+-- drawn once per database, so a recreated file never repeats an old tag
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', lower(hex(randomblob(8))));
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+
+class SqliteStore:
+    """Normalized sector/industry/sub-industry/stock tables.
+
+    Each op runs in its own transaction and only touches the rows on its path,
+    so writes cost the same whether the universe has 20 stocks or 20,000.
+    Ops are applied to whatever the database holds at commit time, so
+    concurrent writers never overwrite each other; ``PRAGMA data_version``
+    tells this connection when another one has committed. ``etag`` comes
+    from the version stored in the ``meta`` table, so it names the same
+    data in every process and across restarts.
+
+    ``save`` is the exception: it replaces the whole tree, deleting and
+    reinserting every row, so it costs time proportional to the universe.
+    Only whole-tree writes use it (bulk imports, undo/redo, JSON compaction);
+    single edits go through ``append``.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = Path(db_file)
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        # Stocks are matched like apply_op matches them, so both backends agree on duplicates
+        self.conn.create_function("symbol_key", 1, symbol_key, deterministic=True)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._data_version = None
+        self._stored = None  # (epoch, version) from meta as of the last load or write
+
+    # -------------------
+    # Path Resolution
+    # -------------------
+    def _sector_id(self, sector):
+        row = self.conn.execute("SELECT id FROM sectors WHERE name = ?", (sector,)).fetchone()
+        return row[0] if row else None
+
+    def _industry(self, sector, industry):
+        return self.conn.execute(
+            "SELECT i.id, i.direct FROM industries i JOIN sectors s ON s.id = i.sector_id "
+            "WHERE s.name = ? AND i.name = ?",
+            (sector, industry),
+        ).fetchone()
+
+    def _sub_industry_id(self, industry_id, sub_industry):
+        row = self.conn.execute(
+            "SELECT id FROM sub_industries WHERE industry_id = ? AND name = ?",
+            (industry_id, sub_industry),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _stock_parent(self, path, create=False):
+        """(industry_id, sub_industry_id) for the stock list at ``path``."""
+        industry = self._industry(path[0], path[1])
+        if industry is None:
+            return None
+        industry_id, direct = industry
+        if len(path) == 2:
+            if not direct:
+                has_subs = self.conn.execute(
+                    "SELECT 1 FROM sub_industries WHERE industry_id = ? LIMIT 1", (industry_id,)
+                ).fetchone()
+                if has_subs or not create:
+                    return None
+                self.conn.execute("UPDATE industries SET direct = 1 WHERE id = ?", (industry_id,))
+            return industry_id, None
+        if direct:
+            return None
+        row = self.conn.execute(
+            "SELECT id FROM sub_industries WHERE industry_id = ? AND name = ? AND payload IS NULL",
+            (industry_id, path[2]),
+        ).fetchone()
+        return (industry_id, row[0]) if row else None
+
+    # -------------------
+    # Point Reads
+    # -------------------
+    def get_stocks(self, path):
+        parent = self._stock_parent(path)
+        if parent is None:
+            return []
+        industry_id, sub_id = parent
+        rows = self.conn.execute(
+            "SELECT symbol, payload FROM stocks WHERE industry_id = ? AND coalesce(sub_industry_id, 0) = ? "
+            "ORDER BY id",
+            (industry_id, sub_id or 0),
+        )
+        return [json.loads(payload) if payload else symbol for symbol, payload in rows]
+
+    def find_symbol(self, symbol):
+        """Every [sector, industry(, sub_industry)] path that lists ``symbol``, matched by symbol_key."""
+        rows = self.conn.execute(
+            "SELECT s.name, i.name, si.name FROM stocks st "
+            "JOIN industries i ON i.id = st.industry_id "
+            "JOIN sectors s ON s.id = i.sector_id "
+            "LEFT JOIN sub_industries si ON si.id = st.sub_industry_id "
+            "WHERE symbol_key(st.symbol) = ? ORDER BY st.id",
+            (symbol_key(symbol),),
+        )
+        return [[sector, industry] + ([sub] if sub is not None else []) for sector, industry, sub in rows]
+
+    # -------------------
+    # Backend Interface
+    # -------------------
+    @contextmanager
+    def transaction(self):
+        """Exclusive write access across threads and processes; reentrant.
+
+        BEGIN IMMEDIATE takes SQLite's write lock up front, so a writer's
+        ``changes`` and its ``append`` see and change the same state: no other
+        process can commit in between. Everything commits when the outermost
+        block exits, and rolls back if it raises.
+        """
+        with self._lock:
+            outer = self._depth == 0
+            if outer:
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                if outer:
+                    self.conn.rollback()
+                raise
+            else:
+                if outer:
+                    self.conn.commit()
+            finally:
+                self._depth -= 1
+
+    def _version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_stored(self):
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        return meta["epoch"], meta["version"]
+
+    def _bump(self):
+        # Called inside the write's transaction, so the version commits with the data
+        self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        self._stored = self._read_stored()
+
+    @property
+    def etag(self):
+        if self._stored is None:
+            return "0"
+        epoch, version = self._stored
+        return f"{epoch}-{version:x}"
+
+    def changes(self):
+        """[] if no other connection has committed since ``load``, else None (reload)."""
+        with self._lock:
+            return [] if self._version() == self._data_version else None
+
+    def load(self):
+        with self._lock:
+            # One read transaction (or the caller's write transaction), so all
+            # four tables come from the same commit
+            outer = self._depth == 0
+            if outer:
+                self.conn.execute("BEGIN")
+            try:
+                self._data_version = self._version()
+                self._stored = self._read_stored()
+                return self._load()
+            finally:
+                if outer:
+                    self.conn.commit()
+
+    def _load(self):
+        data = {}
+        by_industry = {}
+        by_sub = {}
+        for _, name in self.conn.execute("SELECT id, name FROM sectors ORDER BY id"):
+            data[name] = {}
+        for industry_id, sector, name, direct in self.conn.execute(
+            "SELECT i.id, s.name, i.name, i.direct FROM industries i "
+            "JOIN sectors s ON s.id = i.sector_id ORDER BY i.id"
+        ):
+            node = [] if direct else {}
+            data[sector][name] = node
+            by_industry[industry_id] = node
+        for sub_id, industry_id, name, payload in self.conn.execute(
+            "SELECT id, industry_id, name, payload FROM sub_industries ORDER BY id"
+        ):
+            if payload:
+                by_industry[industry_id][name] = json.loads(payload)
+                continue
+            stocks = []
+            by_industry[industry_id][name] = stocks
+            by_sub[sub_id] = stocks
+        for industry_id, sub_id, symbol, payload in self.conn.execute(
+            "SELECT industry_id, sub_industry_id, symbol, payload FROM stocks ORDER BY id"
+        ):
+            target = by_sub[sub_id] if sub_id is not None else by_industry[industry_id]
+            target.append(json.loads(payload) if payload else symbol)
+        return data
+
+    def save(self, data):
+        with self.transaction():
+            self.conn.execute("DELETE FROM sectors")
+            self._insert_tree(data)
+            self._bump()
+
+    def stamp(self):
+        stamps = []
+        for path in (self.db_file, self.db_file.with_name(self.db_file.name + "-wal")):
+            st = _stat(path)
+            stamps.append((st.st_mtime_ns, st.st_size) if st else None)
+        return tuple(stamps)
+
+    def append(self, data, op):
+        with self.transaction():
+            self._apply(op)
+            self._bump()
+
+    # -------------------
+    # Writes
+    # -------------------
+    def _listed(self, industry_id, sub_id):
+        """symbol_key of every stock in one list."""
+        return {
+            symbol_key(symbol) for (symbol,) in self.conn.execute(
+                "SELECT symbol FROM stocks WHERE industry_id = ? AND coalesce(sub_industry_id, 0) = ?",
+                (industry_id, sub_id or 0),
+            )
+        }
+
+    def _insert_stock(self, industry_id, sub_id, stock, listed=None):
+        # ``listed`` (from _listed) saves the lookup when inserting many stocks into one list
+        if listed is None:
+            listed = self._listed(industry_id, sub_id)
+        key = symbol_key(stock_name(stock))
+        if key in listed:
+            return
+        listed.add(key)
+        payload = json.dumps(stock, ensure_ascii=False) if isinstance(stock, dict) else None
+        self.conn.execute(
+            "INSERT OR IGNORE INTO stocks (industry_id, sub_industry_id, symbol, payload) VALUES (?, ?, ?, ?)",
+            (industry_id, sub_id, stock_name(stock), payload),
+        )
+
+    def _insert_tree(self, data):
+        """Merge a nested dict into the tables, skipping rows that already exist."""
+        for sector, industries in data.items():
+            self._apply({"op": "add_sector", "path": [sector]})
+            for industry, sub_data in industries.items():
+                self._apply({"op": "add_industry", "path": [sector, industry]})
+                industry_id, _ = self._industry(sector, industry)
+                if isinstance(sub_data, list):
+                    if self._stock_parent([sector, industry], create=True) is None:
+                        continue
+                    listed = self._listed(industry_id, None)
+                    for stock in sub_data:
+                        self._insert_stock(industry_id, None, stock, listed)
+                    continue
+                for sub, stocks in sub_data.items():
+                    self._apply({"op": "add_sub_industry", "path": [sector, industry, sub]})
+                    sub_id = self._sub_industry_id(industry_id, sub)
+                    if sub_id is None:
+                        continue
+                    if not isinstance(stocks, list):
+                        self.conn.execute(
+                            "UPDATE sub_industries SET payload = ? WHERE id = ?",
+                            (json.dumps(stocks, ensure_ascii=False), sub_id),
+                        )
+                        continue
+                    listed = self._listed(industry_id, sub_id)
+                    for stock in stocks:
+                        self._insert_stock(industry_id, sub_id, stock, listed)
+
+    def _apply(self, op):
+        kind = op["op"]
+        path = op["path"]
+
+        if kind == "add_sector":
+            self.conn.execute("INSERT OR IGNORE INTO sectors (name) VALUES (?)", (path[0],))
+        elif kind == "add_industry":
+            sector_id = self._sector_id(path[0])
+            if sector_id is not None:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO industries (sector_id, name) VALUES (?, ?)", (sector_id, path[1])
+                )
+        elif kind == "add_sub_industry":
+            industry = self._industry(path[0], path[1])
+            if industry is not None and not industry[1]:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO sub_industries (industry_id, name) VALUES (?, ?)", (industry[0], path[2])
+                )
+        elif kind == "add_stock":
+            parent = self._stock_parent(path, create=True)
+            if parent is not None:
+                self._insert_stock(parent[0], parent[1], op["stock"])
+        elif kind == "delete_sector":
+            self.conn.execute("DELETE FROM sectors WHERE name = ?", (path[0],))
+        elif kind == "delete_industry":
+            industry = self._industry(path[0], path[1])
+            if industry is not None:
+                self.conn.execute("DELETE FROM industries WHERE id = ?", (industry[0],))
+        elif kind == "delete_sub_industry":
+            industry = self._industry(path[0], path[1])
+            if industry is not None:
+                self.conn.execute(
+                    "DELETE FROM sub_industries WHERE industry_id = ? AND name = ?", (industry[0], path[2])
+                )
+        elif kind == "delete_stock":
+            parent = self._stock_parent(path)
+            if parent is not None:
+                self.conn.execute(
+                    "DELETE FROM stocks WHERE rowid = (SELECT rowid FROM stocks WHERE industry_id = ? "
+                    "AND coalesce(sub_industry_id, 0) = ? AND symbol_key(symbol) = ? ORDER BY rowid LIMIT 1)",
+                    (parent[0], parent[1] or 0, symbol_key(stock_name(op["stock"]))),
+                )
+        else:
+            raise ValueError(f"Unknown operation: {kind}")
+
+
+# -------------------
+# Migration
+# -------------------
+def migrate_json(json_files, db_file=DB_FILE):
+    """One-shot import of sectors.json files (plus any pending journal) into SQLite.
+
+    Files are merged in order, so nodes and stocks that appear in more than one
+    file are stored once.
+    """
+    store = SqliteStore(db_file)
+    for json_file in json_files:
+        json_file = Path(json_file)
+        data = JsonStore(json_file, json_file.with_name(JOURNAL_FILE.name)).load()
+        with store.transaction():
+            store._insert_tree(data)
+            store._bump()
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate sectors.json files into a SQLite hierarchy store.")
+    parser.add_argument("json_files", nargs="*", default=["sectors.json", "stock_dashbaord/sectors.json"])
+    parser.add_argument("--db", default=str(DB_FILE))
+    args = parser.parse_args()
+
+    store = migrate_json(args.json_files, args.db)
+    counts = {
+        table: store.conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        for table in ("sectors", "industries", "sub_industries", "stocks")
+    }
+    print(f"Migrated {', '.join(args.json_files)} -> {args.db}: {counts}")
@@ -0,0 +1,319 @@
+# storage.py
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writers rely on atomic replace only
+    fcntl = None
+
+DATA_FILE = Path("sectors.json")
+JOURNAL_FILE = Path("sectors.journal")
+DB_FILE = Path("sectors.db")
+
+# Once the journal grows past this many bytes the next mutation folds it
+# back into the snapshot.
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+
+
+# -------------------
+# Mutation Operations
+# -------------------
+# Every edit the UI can make is expressed as a small record:
+#   {"op": "add_stock", "path": ["Sector", "Industry", "Sub-Industry"], "stock": "HDFCBANK"}
+# "path" names the node being added/deleted (or, for stock ops, the list the
+# stock lives in: [sector, industry] for direct stocks). Applying an op is
+# idempotent so a journal can be replayed safely on top of a snapshot that
+# already contains some of its records. Stocks are matched by ``symbol_key``,
+# the same case-insensitive rule SymbolIndex looks them up by.
+
+def stock_name(stock):
+    if isinstance(stock, dict):
+        return stock.get("symbol") or stock.get("name")
+    return stock
+
+
+def symbol_key(name):
+    """What two listings of a symbol must share to be the same stock: " tcs" and "TCS" are."""
+    return name.strip().casefold() if name else ""
+
+
+def _stock_list(data, path, create=False):
+    sector, industry = path[0], path[1]
+    industries = data.get(sector)
+    if industries is None or industry not in industries:
+        return None
+    node = industries[industry]
+    if len(path) == 2:
+        # Stocks directly under an industry; an empty dict becomes a list
+        if isinstance(node, dict) and not node and create:
+            node = industries[industry] = []
+        return node if isinstance(node, list) else None
+    if not isinstance(node, dict):
+        return None
+    stocks = node.get(path[2])
+    return stocks if isinstance(stocks, list) else None
+
+
+def apply_op(data, op):
+    kind = op["op"]
+    path = op["path"]
+
+    if kind == "add_sector":
+        data.setdefault(path[0], {})
+    elif kind == "add_industry":
+        if path[0] in data:
+            data[path[0]].setdefault(path[1], {})
+    elif kind == "add_sub_industry":
+        industry = data.get(path[0], {}).get(path[1])
+        if isinstance(industry, dict):
+            industry.setdefault(path[2], [])
+    elif kind == "add_stock":
+        stocks = _stock_list(data, path, create=True)
+        key = symbol_key(stock_name(op["stock"]))
+        if stocks is not None and all(symbol_key(stock_name(s)) != key for s in stocks):
+            stocks.append(op["stock"])
+    elif kind == "delete_sector":
+        data.pop(path[0], None)
+    elif kind == "delete_industry":
+        data.get(path[0], {}).pop(path[1], None)
+    elif kind == "delete_sub_industry":
+        industry = data.get(path[0], {}).get(path[1])
+        if isinstance(industry, dict):
+            industry.pop(path[2], None)
+    elif kind == "delete_stock":
+        stocks = _stock_list(data, path)
+        if stocks is not None:
+            key = symbol_key(stock_name(op["stock"]))
+            for i, s in enumerate(stocks):
+                if symbol_key(stock_name(s)) == key:
+                    del stocks[i]
+                    break
+    else:
+        raise ValueError(f"Unknown operation: {kind}")
+    return data
+
+
+def copy_path(data, path):
+    """Shallow-copy the containers along ``path`` so an op applied to the result
+    leaves ``data`` untouched; every other subtree is shared between the two."""
+    root = dict(data)
+    industries = root.get(path[0])
+    if industries is None:
+        return root
+    industries = root[path[0]] = dict(industries)
+    if len(path) < 2 or path[1] not in industries:
+        return root
+    node = industries[path[1]] = industries[path[1]].copy()
+    if len(path) > 2 and isinstance(node, dict) and path[2] in node:
+        node[path[2]] = node[path[2]].copy()
+    return root
+
+
+def apply_op_cow(data, op):
+    """Copy-on-write apply_op: returns a new tree, ``data`` is not modified."""
+    return apply_op(copy_path(data, op["path"]), op)
+
+
+# -------------------
+# Storage Backends
+# -------------------
+# A backend persists the hierarchy. ``load`` returns the full nested dict,
+# ``save`` replaces everything, ``append`` persists a single op that has
+# already been applied to the in-memory copy, and ``stamp`` is a cheap value
+# that changes whenever the stored data does.
+#
+# Several server processes may share one store. Writers hold
+# ``transaction()`` and first call ``changes()``: the ops other processes
+# committed since this instance last read the store (or None when a full
+# ``load`` is needed). Applying those before their own op rebases the edit
+# onto the latest stored state instead of overwriting it.
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _atomic_write_json(path, data):
+    """Write ``data`` to a temp file next to ``path`` and rename it into place,
+    so readers see either the old or the new document, never a partial one."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class JsonStore:
+    """sectors.json snapshot plus an append-only journal of ops.
+
+    Writers serialize on an advisory lock file (``sectors.json.lock``) and
+    the snapshot is only ever replaced atomically. ``etag`` names the stored
+    version this instance has read up to: the snapshot's identity plus how
+    far into the journal it has replayed.
+    """
+
+    def __init__(self, data_file=DATA_FILE, journal_file=JOURNAL_FILE):
+        self.data_file = Path(data_file)
+        self.journal_file = Path(journal_file)
+        self.lock_file = self.data_file.with_name(self.data_file.name + ".lock")
+        self._thread_lock = threading.RLock()
+        self._lock_fd = None
+        self._depth = 0
+        self._snapshot_id = None
+        self._journal_id = None
+        self._journal_offset = 0
+
+    @contextmanager
+    def transaction(self):
+        """Exclusive access to the store across threads and processes; reentrant."""
+        with self._thread_lock:
+            if self._depth == 0 and fcntl is not None:
+                self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and self._lock_fd is not None:
+                    os.close(self._lock_fd)  # closing releases the flock
+                    self._lock_fd = None
+
+    @staticmethod
+    def _file_id(path):
+        st = _stat(path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size) if st else None
+
+    @property
+    def etag(self):
+        snapshot = self._snapshot_id or (0, 0, 0)
+        return f"{snapshot[0]:x}-{snapshot[1]:x}-{snapshot[2]:x}-{self._journal_offset:x}"
+
+    def _read_journal(self, offset=0):
+        """Ops in the journal from byte ``offset`` on; returns (ops, end offset)."""
+        ops = []
+        if not self.journal_file.exists():
+            return ops, 0
+        with open(self.journal_file, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from an interrupted append; nothing after it
+                    break
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    ops.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return ops, offset
+
+    def load(self):
+        with self.transaction():
+            data = {}
+            if self.data_file.exists():
+                with open(self.data_file, "r") as f:
+                    data = json.load(f)
+            ops, self._journal_offset = self._read_journal()
+            for op in ops:
+                apply_op(data, op)
+            self._snapshot_id = self._file_id(self.data_file)
+            self._journal_id = self._file_id(self.journal_file)
+            return data
+
+    def changes(self):
+        """Ops appended by others since the last load/changes, or None if a reload is needed."""
+        with self.transaction():
+            if self._file_id(self.data_file) != self._snapshot_id:
+                return None
+            journal = _stat(self.journal_file)
+            if journal is None:
+                return [] if self._journal_offset == 0 else None
+            if self._journal_id is not None and journal.st_ino != self._journal_id[0]:
+                return None
+            if journal.st_size < self._journal_offset:
+                return None
+            ops, self._journal_offset = self._read_journal(self._journal_offset)
+            self._journal_id = self._file_id(self.journal_file)
+            return ops
+
+    def save(self, data):
+        """Write a full snapshot and drop the journal it now contains."""
+        with self.transaction():
+            _atomic_write_json(self.data_file, data)
+            if self.journal_file.exists():
+                self.journal_file.unlink()
+            self._snapshot_id = self._file_id(self.data_file)
+            self._journal_id = None
+            self._journal_offset = 0
+
+    def stamp(self):
+        """Changes whenever the snapshot or journal is written by anyone."""
+        return tuple(
+            (st.st_mtime_ns, st.st_size) if (st := _stat(path)) else None
+            for path in (self.data_file, self.journal_file)
+        )
+
+    def append(self, data, op):
+        """Journal ``op``; ``data`` must already include every op in the journal."""
+        with self.transaction():
+            before = _stat(self.journal_file)
+            # Only when nothing unseen precedes this op is ``data`` known to be
+            # the full stored state; otherwise the next changes() returns the
+            # unseen ops and this one again, which is harmless as ops are idempotent
+            current = (before.st_size if before else 0) == self._journal_offset
+            with open(self.journal_file, "ab") as f:
+                f.write(json.dumps(op, separators=(",", ":"), ensure_ascii=False).encode() + b"\n")
+            if not current:
+                return
+            size = self.journal_file.stat().st_size
+            if size > COMPACT_THRESHOLD_BYTES:
+                self.save(data)
+            else:
+                self._journal_offset = size
+                self._journal_id = self._file_id(self.journal_file)
+
+
+_store = None
+
+
+def get_store():
+    """Backend selected by SECTORS_BACKEND ("json" by default, or "sqlite")."""
+    global _store
+    if _store is None:
+        backend = os.environ.get("SECTORS_BACKEND", "json")
+        if backend == "sqlite":
+            from stock_dashbaord.sqlite_store import SqliteStore
+            _store = SqliteStore(os.environ.get("SECTORS_DB", DB_FILE))
+        elif backend == "json":
+            _store = JsonStore()
+        else:
+            raise ValueError(f"Unknown SECTORS_BACKEND: {backend}")
+    return _store
+
+
+# -------------------
+# Data Functions
+# -------------------
+def load_data():
+    return get_store().load()
+
+
+def save_data(data):
+    get_store().save(data)
+
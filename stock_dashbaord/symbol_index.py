@@ -0,0 +1,114 @@
+# symbol_index.py
+from stock_dashbaord.storage import stock_name, symbol_key
+
+
+def iter_stock_lists(sectors):
+    """Yield (path, stocks) for every stock list, whichever shape the industry uses."""
+    for sector, industries in sectors.items():
+        for industry, sub_data in industries.items():
+            if isinstance(sub_data, list):
+                yield (sector, industry), sub_data
+            elif isinstance(sub_data, dict):
+                for sub, stocks in sub_data.items():
+                    if isinstance(stocks, list):
+                        yield (sector, industry, sub), stocks
+
+
+def accepts_stocks(sectors, path):
+    """Whether ``path`` names a stock list an add_stock op would add to."""
+    node = sectors.get(path[0], {}).get(path[1])
+    if len(path) == 2:
+        # An empty dict industry is turned into a direct stock list on first add
+        return isinstance(node, list) or node == {}
+    return isinstance(node, dict) and isinstance(node.get(path[2]), list)
+
+
+class SymbolIndex:
+    """Symbol/name -> paths of the stock lists that contain it.
+
+    A path is (sector, industry) for stocks listed directly under an industry
+    and (sector, industry, sub_industry) otherwise. Lookups are case-insensitive.
+    The index must be updated with ``apply`` *before* an op is applied to the
+    tree, because deletes need to see the stocks they are about to remove.
+    """
+
+    def __init__(self, sectors=None):
+        self._paths = {}
+        self._names = {}
+        if sectors:
+            for path, stocks in iter_stock_lists(sectors):
+                for stock in stocks:
+                    self.add(path, stock)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, symbol):
+        return symbol_key(symbol) in self._paths
+
+    def add(self, path, stock):
+        name = stock_name(stock)
+        if not name:
+            return
+        key = symbol_key(name)
+        paths = self._paths.setdefault(key, [])
+        if tuple(path) not in paths:
+            paths.append(tuple(path))
+        self._names.setdefault(key, name)
+
+    def remove(self, path, stock):
+        name = stock_name(stock)
+        if not name:
+            return
+        key = symbol_key(name)
+        paths = self._paths.get(key)
+        if paths and tuple(path) in paths:
+            paths.remove(tuple(path))
+            if not paths:
+                del self._paths[key]
+                del self._names[key]
+
+    def locate(self, symbol):
+        """Every path listing ``symbol`` (empty if it is not in the hierarchy)."""
+        return list(self._paths.get(symbol_key(symbol), ()))
+
+    def search(self, query, limit=20):
+        """(name, paths) for symbols containing ``query``, exact match first."""
+        query = symbol_key(query)
+        if not query:
+            return []
+        results = []
+        if query in self._paths:
+            results.append((self._names[query], self.locate(query)))
+        # list() snapshots the dict in one step; another session may be committing
+        for key, name in list(self._names.items()):
+            if len(results) >= limit:
+                break
+            if key != query and query in key:
+                results.append((name, list(self._paths[key])))
+        return results
+
+    def _remove_subtree(self, sectors, prefix):
+        for path, stocks in iter_stock_lists(sectors):
+            if path[:len(prefix)] == prefix:
+                for stock in stocks:
+                    self.remove(path, stock)
+
+    def apply(self, sectors, op):
+        kind = op["op"]
+        path = tuple(op["path"])
+        if kind == "add_stock":
+            if accepts_stocks(sectors, path):
+                self.add(path, op["stock"])
+        elif kind == "delete_stock":
+            self.remove(path, op["stock"])
+        elif kind == "delete_sector":
+            self._remove_subtree({path[0]: sectors.get(path[0], {})}, path)
+        elif kind in ("delete_industry", "delete_sub_industry"):
+            industries = sectors.get(path[0], {})
+            if path[1] in industries:
+                self._remove_subtree({path[0]: {path[1]: industries[path[1]]}}, path)
+
+
+def format_path(path):
+    return " › ".join(path)
@@ -0,0 +1,21 @@
+# conftest.py
+import json
+
+import pytest
+import streamlit as st
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A fresh working directory for the stores, with no cached models or env overrides."""
+    monkeypatch.chdir(tmp_path)
+    for name in ("SECTORS_BACKEND", "SECTORS_HISTORY", "QUOTES_PROVIDER", "PRICE_HISTORY"):
+        monkeypatch.delenv(name, raising=False)
+    st.cache_resource.clear()
+    yield tmp_path
+    st.cache_resource.clear()
+
+
+def write_sectors(path, tree):
+    with open(path / "sectors.json", "w") as f:
+        json.dump(tree, f)
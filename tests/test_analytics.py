@@ -0,0 +1,53 @@
+# test_analytics.py
+import math
+
+from stock_dashbaord.analytics import QUOTE_TABLES, QuoteTable, get_quote_table, sector_rollups
+from stock_dashbaord.history import History
+from stock_dashbaord.quotes import MockQuoteProvider, QuoteEngine
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from tests.conftest import write_sectors
+
+TREE = {
+    "A": {"Banks": ["HDFC", "SBI"], "IT": {"Services": ["TCS"]}},
+    "B": {"Energy": ["RIL", "HDFC"]},
+}
+
+
+def test_rollups():
+    table = QuoteTable(TREE)
+    assert table.update({"HDFC": {"price": 10, "change": 2.0}, "SBI": {"price": 5, "change": -1.0}}) == 3
+    rollups = table.rollups()
+    banks = rollups["industry"][("A", "Banks")]
+    assert banks["quoted"] == 2 and banks["advancers"] == 1 and banks["decliners"] == 1
+    assert math.isclose(banks["mean_change"], 0.5)
+    assert rollups["sector"]["B"]["quoted"] == 1
+    assert ("A", "IT", "Services") not in rollups["sub_industry"]
+
+
+def test_tables_kept_per_version(workdir):
+    latest = get_quote_table(TREE, 7)
+    past = get_quote_table({"A": {"Banks": ["HDFC"]}}, ("history", 3))
+    # A session on the latest version and one viewing v3 take turns without rebuilding
+    assert get_quote_table(TREE, 7) is latest
+    assert get_quote_table({"A": {"Banks": ["HDFC"]}}, ("history", 3)) is past
+
+    for version in range(QUOTE_TABLES - 1):
+        get_quote_table(TREE, version)
+    assert get_quote_table(TREE, ("history", 3)) is past
+    assert get_quote_table(TREE, 7) is not latest  # least recently used, dropped
+
+
+def test_sector_rollups_follow_edits(workdir):
+    write_sectors(workdir, TREE)
+    model = SharedHierarchy(JsonStore(), History())
+    engine = QuoteEngine(MockQuoteProvider())
+    rollups = sector_rollups(model, engine, "A")
+    assert rollups["sector"]["A"]["quoted"] == 3
+    assert "B" not in rollups["sector"] and ("B", "Energy") not in rollups["industry"]
+
+    # What a sector card's fragment sees after an edit to that sector, without a full run
+    model.commit({"op": "add_stock", "path": ["A", "Banks"], "stock": "ICICI"})
+    rollups = sector_rollups(model, engine, "A")
+    assert rollups["sector"]["A"]["quoted"] == 4
+    assert rollups["industry"][("A", "Banks")]["quoted"] == 3
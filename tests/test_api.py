@@ -0,0 +1,121 @@
+# test_api.py
+import asyncio
+import json
+import threading
+
+from stock_dashbaord.api import HierarchyAPI, serve
+from stock_dashbaord.history import History
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from tests.conftest import write_sectors
+
+ADD_SBI = json.dumps({"op": "add_stock", "path": ["A", "Banks"], "stock": "SBI"}).encode()
+
+
+def _api():
+    return HierarchyAPI(SharedHierarchy(JsonStore(), History()))
+
+
+async def _request(port, method, target, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {target} HTTP/1.0\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_etags(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}, "B": {"IT": ["TCS"]}})
+    api = _api()
+    status, out, _ = api.handle("GET", "/sectors", {})
+    assert status == 200
+    etag = out["ETag"]
+    _, sector, _ = api.handle("GET", "/sectors/B", {})
+    assert api.handle("GET", "/sectors", {"if-none-match": etag})[0] == 304
+    # A proxy that gzips weakens the ETag; a weak match still counts for GET
+    assert api.handle("GET", "/sectors", {"if-none-match": f'"other", W/{etag}'})[0] == 304
+
+    assert api.handle("POST", "/ops", {"if-match": etag}, ADD_SBI)[0] == 200
+    assert api.handle("POST", "/ops", {"if-match": etag}, ADD_SBI)[0] == 412
+    assert api.handle("GET", "/sectors", {"if-none-match": etag})[0] == 200
+    # Sector B did not change, so its ETag did not either
+    assert api.handle("GET", "/sectors/B", {"if-none-match": sector["ETag"]})[0] == 304
+
+
+def test_bodies_match_their_etags_under_concurrent_reads(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}, "B": {"IT": ["TCS"]}})
+    api = _api()
+    writer = SharedHierarchy(JsonStore(), History())
+    seen, mismatched = {}, []
+    done = threading.Event()
+
+    def read():
+        # As worker threads do while the store is stale, next to reads on the loop
+        while not done.is_set():
+            for target in ("/sectors", "/sectors/A"):
+                _, out, payload = api.handle("GET", target, {})
+                if seen.setdefault((target, out["ETag"]), payload) != payload:
+                    mismatched.append(target)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(30):
+        writer.commit({"op": "add_stock", "path": ["A", "Banks"], "stock": f"S{i}"})
+    done.set()
+    for reader in readers:
+        reader.join()
+    assert not mismatched
+    _, out, payload = api.handle("GET", "/sectors", {})
+    assert len(json.loads(payload)["A"]["Banks"]) == 30
+    assert api.tree() is api.tree()
+
+
+def test_edits_by_other_processes_are_served(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    api = _api()
+    api.handle("GET", "/sectors", {})
+    SharedHierarchy(JsonStore(), History()).commit(json.loads(ADD_SBI))
+    assert api.blocks("GET")
+    status, _, payload = api.handle("GET", "/sectors", {})
+    assert json.loads(payload) == {"A": {"Banks": ["SBI"]}}
+
+
+def test_reads_answered_while_a_commit_waits_for_the_lock(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    api = _api()
+    locked, release = threading.Event(), threading.Event()
+
+    def bulk_import():
+        # Another process holding the store's lock, as a long bulk import does
+        with JsonStore().transaction():
+            locked.set()
+            release.wait(10)
+
+    async def scenario():
+        listening = asyncio.Event()
+        ports = []
+
+        def ready(server):
+            ports.append(server.sockets[0].getsockname()[1])
+            listening.set()
+
+        server = asyncio.create_task(serve("127.0.0.1", 0, api, ready))
+        await listening.wait()
+        holder = threading.Thread(target=bulk_import)
+        holder.start()
+        locked.wait()
+        try:
+            post = asyncio.create_task(_request(ports[0], "POST", "/ops", ADD_SBI))
+            await asyncio.sleep(0.2)
+            assert await asyncio.wait_for(_request(ports[0], "GET", "/sectors"), 2) == (200, {"A": {"Banks": []}})
+            assert not post.done()
+        finally:
+            release.set()
+        assert (await asyncio.wait_for(post, 5))[0] == 200
+        assert await _request(ports[0], "GET", "/sectors") == (200, {"A": {"Banks": ["SBI"]}})
+        holder.join()
+        server.cancel()
+
+    asyncio.run(scenario())
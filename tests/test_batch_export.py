@@ -0,0 +1,38 @@
+# test_batch_export.py
+import json
+import os
+
+import pytest
+
+from equity_research_template.batch_export import CHUNK_REPORTS, export_path, export_reports
+
+
+def _reports(folder, n):
+    paths = []
+    for i in range(n):
+        path = os.path.join(folder, f"report_{i}.json")
+        with open(path, "w") as f:
+            json.dump({"company_name": f"Company {i}", "report_date": "2025-10-17", "conclusion": "Buy."}, f)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_reports_reported_per_file(tmp_path, workers):
+    good = _reports(tmp_path, CHUNK_REPORTS + 2)
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"company_name": ')
+    missing = str(tmp_path / "missing.json")
+    # The bad files share chunks with good ones, which must still be exported
+    paths = good[:3] + [str(broken)] + good[3:] + [missing]
+    out = tmp_path / "pdfs"
+    done = []
+
+    stats = export_reports(paths, str(out), workers=workers, progress=lambda n, total: done.append((n, total)))
+    assert stats["reports"] == len(paths) and stats["exported"] == len(good)
+    assert set(stats["failed"]) == {str(broken), missing}
+    assert stats["failed"][str(broken)].startswith("JSONDecodeError")
+    assert stats["failed"][missing].startswith("FileNotFoundError")
+    assert sorted(os.listdir(out)) == sorted(os.path.basename(export_path(p, out)) for p in good)
+    assert done[-1] == (len(paths), len(paths))
+
@@ -0,0 +1,90 @@
+# test_bulk_import.py
+import io
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from stock_dashbaord.bulk_import import import_csv, import_rows, read_rows
+from stock_dashbaord.history import History
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from stock_dashbaord.symbol_index import SymbolIndex
+from tests.conftest import write_sectors
+
+APP = str(Path(__file__).resolve().parent.parent / "stock_dashbaord" / "stock_dashboard.py")
+
+TREE = {"A": {"Banks": ["HDFC"], "IT": {"Services": ["TCS"]}}}
+
+
+def _import(tree, text, defaults=None):
+    return import_rows(tree, SymbolIndex(tree), read_rows(io.StringIO(text)), defaults)
+
+
+def test_duplicates_in_tree_and_file():
+    sectors, stats = _import(TREE, "Symbol,Sector,Industry\nhdfc,A,Banks\nSBIN,A,Banks\nsbin,A,Banks\n")
+    assert sectors["A"]["Banks"] == ["HDFC", "SBIN"]
+    assert stats == {"rows": 3, "added": 1, "duplicates": 2, "nodes": 0, "skipped": 0}
+    assert TREE["A"]["Banks"] == ["HDFC"]
+
+
+def test_missing_nodes_created():
+    text = "ticker,company name,sector,industry,sub-industry\nRIL,Reliance,B,Energy,Refining\nONGC,,B,Energy,\n"
+    sectors, stats = _import(TREE, text)
+    assert sectors["B"] == {"Energy": {"Refining": [{"symbol": "RIL", "name": "Reliance"}]}}
+    # ONGC names an industry that now holds sub-industries, so it has no list to join
+    assert stats == {"rows": 2, "added": 1, "duplicates": 0, "nodes": 3, "skipped": 1}
+
+
+def test_rows_with_no_stock_list_skipped():
+    text = "symbol,sector,industry,sub_industry\nSBIN,A,Banks,PSU\nINFY,A,IT,\nWIPRO,,IT,Services\n"
+    sectors, stats = _import(TREE, text)
+    assert sectors == TREE
+    assert stats == {"rows": 3, "added": 0, "duplicates": 0, "nodes": 0, "skipped": 3}
+
+
+def test_defaults_fill_missing_columns():
+    sectors, stats = _import(TREE, "Symbol\nINFY\n", {"sector": "A", "industry": "IT", "sub_industry": "Services"})
+    assert sectors["A"]["IT"]["Services"] == ["TCS", "INFY"]
+    assert stats["added"] == 1
+
+
+def test_file_without_header(workdir):
+    write_sectors(workdir, TREE)
+    model = SharedHierarchy(JsonStore(), History())
+    with pytest.raises(ValueError, match="No symbol column"):
+        import_csv(model, io.BytesIO(b"SBIN,State Bank,A,Banks\n"))
+    assert import_csv(model, io.BytesIO(b"")) == {"rows": 0, "added": 0, "duplicates": 0, "nodes": 0, "skipped": 0}
+    assert model.snapshot()[0] == TREE == JsonStore().load()
+
+
+def _upload(at, content):
+    at.sidebar.file_uploader[0].set_value(("stocks.csv", content, "text/csv"))
+    at.run()
+    next(b for b in at.sidebar.button if b.label == "Import CSV").click().run()
+
+
+def test_form_reports_bad_files(workdir):
+    write_sectors(workdir, TREE)
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+
+    _upload(at, b"SBIN,State Bank,A,Banks\n")
+    assert not at.exception
+    assert any("No symbol column" in e.value for e in at.sidebar.error)
+
+    _upload(at, b"symbol,sector,industry\n\xff\xfeSBIN,A,Banks\n")
+    assert not at.exception
+    assert any("utf-8" in e.value for e in at.sidebar.error)
+    assert JsonStore().load() == TREE
+
+
+def test_form_imports(workdir):
+    write_sectors(workdir, TREE)
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+
+    _upload(at, b"symbol,sector,industry\nSBIN,A,Banks\nHDFC,A,Banks\n")
+    assert not at.exception
+    assert "Imported 2 rows: 1 stocks added, 0 nodes created, 1 duplicates, 0 skipped" in [s.value for s in at.sidebar.success]
+    assert JsonStore().load()["A"]["Banks"] == ["HDFC", "SBIN"]
@@ -0,0 +1,38 @@
+# test_compact.py
+import json
+from pathlib import Path
+
+import pytest
+
+from stock_dashbaord.compact import CompactUniverse
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _round_trip(sectors):
+    out = CompactUniverse.from_json(sectors).to_json()
+    # Same shapes and key order too, as the dashboard would write them back
+    assert json.dumps(out) == json.dumps(sectors)
+    return out
+
+
+@pytest.mark.parametrize("path", ["sectors.json", "stock_dashbaord/sectors.json"])
+def test_shipped_hierarchies_round_trip(path):
+    with open(REPO / path) as f:
+        _round_trip(json.load(f))
+
+
+def test_shapes_round_trip():
+    sectors = {
+        "Empty": {},
+        "A": {
+            "No subs yet": {},
+            "Direct": ["HDFC", {"symbol": "SBIN", "name": "State Bank"}, {"symbol": "ICICI", "price": 1.5}],
+            "Nested": {"Private": [], "PSU": ["BOB", {"name": "Canara", "symbol": "CANBK"}], "Odd": None},
+        },
+        "B": {"Empty list": [], "Mixed": [{"symbol": "Ω", "price": 3, "note": "kept"}]},
+    }
+    _round_trip(sectors)
+    universe = CompactUniverse.from_json(sectors)
+    assert universe.stocks_per_sector() == {"Empty": 0, "A": 5, "B": 1}
+    assert universe.symbols() == ["HDFC", "SBIN", "ICICI", "BOB", "CANBK", "Ω"]
@@ -0,0 +1,67 @@
+# test_forms.py
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from stock_dashbaord.history import History
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from tests.conftest import write_sectors
+
+APP = str(Path(__file__).resolve().parent.parent / "stock_dashbaord" / "stock_dashboard.py")
+
+
+def _button(at, label):
+    return next(b for b in at.sidebar.button if b.label == label)
+
+
+def test_edit_to_sector_card_this_page_never_drew(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}})
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    assert not at.exception
+
+    # Another process adds sector B after this page was drawn
+    other = SharedHierarchy(JsonStore(), History())
+    other.commit({"op": "add_sector", "path": ["B"]})
+    other.commit({"op": "add_industry", "path": ["B", "Telecom"]})
+
+    # As if the add form had rerun on its own (as a fragment does) and now lists B
+    at.selectbox(key="stock_sector_select").options.append("B")
+    at.selectbox(key="stock_sector_select").select("B")
+    at.selectbox(key="stock_industry_select").options.append("Telecom")
+    at.selectbox(key="stock_industry_select").select("Telecom")
+    at.text_input(key="stock_input_direct").input("JIO")
+    _button(at, "Add Stock Directly").click().run()
+
+    assert not at.exception
+    assert "Added JIO to Telecom" in [s.value for s in at.sidebar.success]
+    assert other.snapshot()[0]["B"]["Telecom"] == ["JIO"]
+
+
+def test_edit_to_drawn_sector_card(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}})
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+
+    at.text_input(key="stock_input_direct").input("ICICI")
+    _button(at, "Add Stock Directly").click().run()
+
+    assert not at.exception
+    assert "Added ICICI to Banks" in [s.value for s in at.sidebar.success]
+    assert JsonStore().load() == {"A": {"Banks": ["HDFC", "ICICI"]}}
+
+
+def test_view_version_redraws_page_read_only(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}})
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    at.text_input(key="stock_input_direct").input("ICICI")
+    _button(at, "Add Stock Directly").click().run()
+
+    at.selectbox(key="view_version").select(0).run()
+    assert not at.exception
+    assert at.info[0].value.startswith("Viewing v0")
+    assert at.selectbox(key="view_version").value == 0
+    # The page's store is untouched by viewing
+    assert JsonStore().load() == {"A": {"Banks": ["HDFC", "ICICI"]}}
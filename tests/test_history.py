@@ -0,0 +1,131 @@
+# test_history.py
+from stock_dashbaord.history import History, diff, summarize
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.storage import JsonStore
+from tests.conftest import write_sectors
+
+
+def _model(keep=None):
+    return SharedHierarchy(JsonStore(), History(keep=keep))
+
+
+def _add(model, stock, path=("A", "Banks")):
+    return model.commit({"op": "add_stock", "path": list(path), "stock": stock})
+
+
+def test_undo_redo(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}})
+    model = _model()
+    _add(model, "ICICI")
+    _add(model, "AXIS")
+
+    assert model.jump("undo").to == 1
+    assert model.sectors == {"A": {"Banks": ["HDFC", "ICICI"]}}
+    assert model.jump("undo").to == 0
+    assert model.sectors == {"A": {"Banks": ["HDFC"]}}
+    assert model.jump("undo") is None
+
+    assert model.jump("redo").to == 1
+    assert model.jump("redo").to == 2
+    assert model.sectors == {"A": {"Banks": ["HDFC", "ICICI", "AXIS"]}}
+    assert model.jump("redo") is None
+    assert JsonStore().load() == model.sectors
+
+
+def test_new_edit_clears_redo(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    model = _model()
+    _add(model, "HDFC")
+    model.jump("undo")
+    _add(model, "SBI")
+    assert model.history.redo_target() is None
+    model.jump("undo")
+    assert model.sectors == {"A": {"Banks": []}}
+
+
+def test_undo_a_restore(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    model = _model()
+    _add(model, "HDFC")
+    _add(model, "SBI")
+    model.jump("restore", 0)
+    assert model.sectors == {"A": {"Banks": []}}
+    model.jump("undo")
+    assert model.sectors == {"A": {"Banks": ["HDFC", "SBI"]}}
+
+
+def test_versions_share_unchanged_subtrees(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}, "B": {"IT": {"Services": ["TCS"]}}})
+    model = _model()
+    _add(model, "ICICI")
+    history = model.history
+    assert history.tree(1)["B"] is history.tree(0)["B"]
+    assert diff(history.tree(0), history.tree(1)) == [("+", ("A", "Banks"), "ICICI")]
+
+    reloaded = History()
+    reloaded.catch_up()
+    assert reloaded.tree(1)["B"] is reloaded.tree(0)["B"]
+
+
+def test_diff_summary_hides_contents_of_removed_nodes():
+    old = {"A": {"Banks": ["HDFC", "SBI"]}, "B": {"IT": ["TCS"]}}
+    new = {"B": {"IT": ["TCS", {"symbol": "INFY"}]}}
+    assert summarize(diff(old, new)) == [("-", ("A",), None), ("+", ("B", "IT"), {"symbol": "INFY"})]
+
+
+def test_other_process_catches_up(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    one, two = _model(), _model()
+    _add(one, "HDFC")
+    _add(two, "SBI")
+    assert one.snapshot()[0] == {"A": {"Banks": ["HDFC", "SBI"]}}
+    assert one.jump("undo").to == 1
+    assert two.snapshot()[0] == {"A": {"Banks": ["HDFC"]}}
+    assert two.jump("redo").to == 2
+
+
+def test_external_edit_recorded_once(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    _model()
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}})
+    model = _model()
+    assert [v.kind for v in model.history.versions] == ["start", "external"]
+    assert [v.kind for v in _model().history.versions] == ["start", "external"]
+
+
+def test_compaction_keeps_recent_versions(workdir):
+    write_sectors(workdir, {"A": {"Banks": []}})
+    model = _model(keep=3)
+    for i in range(5):
+        _add(model, f"S{i}")
+    history = model.history
+    assert (history.first, len(history)) == (3, 6)
+    assert 2 not in history and 3 in history
+    assert model.jump("undo").to == 4
+    assert model.jump("undo").to == 3
+    assert model.jump("undo") is None
+
+    reloaded = History(keep=3)
+    reloaded.catch_up()
+    assert reloaded.first == history.first
+    assert reloaded.head.tree == model.sectors
+    assert reloaded.redo_target() == history.redo_target()
+
+
+def test_compaction_keeps_jumps_to_dropped_versions(workdir):
+    history = History(keep=2)
+    history.record("start", {"A": {}})
+    history.record("op", op={"op": "add_sector", "path": ["B"]})
+    history.record("op", op={"op": "add_sector", "path": ["C"]})
+    other = History(keep=2)
+    other.catch_up()
+    # Compacts to versions 2-3; version 3 returns to version 1, which is dropped
+    history.record("undo", to=history.undo_target())
+    assert (history.first, history.head.to) == (2, 1)
+
+    for reader in (other, History(keep=2)):
+        reader.catch_up()
+        assert reader.first == 2
+        assert reader.head.tree == {"A": {}, "B": {}}
+        assert reader.redo_target() == 2
+        assert reader.undo_target() is None
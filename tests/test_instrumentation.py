@@ -0,0 +1,52 @@
+# test_instrumentation.py
+import tracemalloc
+
+import pytest
+
+from stock_dashbaord import instrumentation
+from stock_dashbaord.instrumentation import current_profiler, start_rerun
+
+
+@pytest.fixture
+def profiling(workdir, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_PROFILE", "1")
+    monkeypatch.setattr(instrumentation, "TRACE_DIR", workdir / "traces")
+    assert not tracemalloc.is_tracing()
+
+
+def test_rerun_cut_short_releases_tracemalloc(profiling):
+    with pytest.raises(RuntimeError):
+        with start_rerun("page") as profiler:
+            profiler.phase("work")
+            assert tracemalloc.is_tracing()
+            raise RuntimeError("rerun")
+    assert not tracemalloc.is_tracing()
+    assert not current_profiler().enabled
+    assert not (instrumentation.TRACE_DIR).exists()
+
+
+def test_finished_rerun_writes_trace(profiling):
+    with start_rerun("page") as profiler:
+        profiler.phase("work")
+        with profiler.span("inner"):
+            [0] * 1000
+    assert not tracemalloc.is_tracing()
+    traces = list(instrumentation.TRACE_DIR.glob("page-*.json"))
+    assert len(traces) == 1
+    assert {s["name"] for s in profiler.spans} == {"page", "setup", "work", "inner"}
+
+
+def test_overlapping_reruns_share_tracemalloc(profiling):
+    alone = start_rerun("alone")
+    alone.close()
+    first = start_rerun("one")
+    second = start_rerun("two")
+    # Each would see the other's allocations, so neither reports a peak
+    assert first.overlapped and second.overlapped and not alone.overlapped
+    first.close()
+    assert tracemalloc.is_tracing()
+    second.close()
+    second.close()
+    assert not tracemalloc.is_tracing()
+    second.finish()
+    assert second.trace()["metadata"]["peak_bytes"] is None
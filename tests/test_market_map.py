@@ -0,0 +1,44 @@
+# test_market_map.py
+import numpy as np
+import pytest
+
+from stock_dashbaord.analytics import QuoteTable
+from stock_dashbaord.market_map import MAP_HEIGHT, MAP_WIDTH, treemap_layout
+
+TREE = {
+    "A": {
+        "Banks": [{"symbol": "HDFC", "market_cap": 300.0}, {"symbol": "SBI", "market_cap": 100.0}, "NEWCO"],
+        "IT": {"Services": [{"symbol": "TCS", "market_cap": 200.0}], "Products": []},
+    },
+    "B": {"Energy": [{"symbol": "RIL", "market_cap": 400.0}, {"symbol": "HDFC", "market_cap": 300.0}]},
+    "Empty": {"Nothing": []},
+}
+
+
+def _area(frame):
+    return ((frame["x1"] - frame["x0"]) * (frame["y1"] - frame["y0"])).to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize("size", ["Market cap", "Equal"])
+def test_tiles_fill_the_map_in_proportion(size):
+    tiles, groups = treemap_layout(QuoteTable(TREE), size)
+    assert len(tiles) == 6  # HDFC is listed twice
+    assert _area(tiles).sum() == pytest.approx(MAP_WIDTH * MAP_HEIGHT, rel=1e-5)
+    assert _area(tiles) / _area(tiles).sum() == pytest.approx(tiles["weight"] / tiles["weight"].sum(), rel=1e-4)
+    assert tiles["x0"].min() >= 0 and tiles["x1"].max() <= MAP_WIDTH
+    assert tiles["y0"].min() >= 0 and tiles["y1"].max() <= MAP_HEIGHT
+
+    # Each group's box is exactly covered by its stocks' tiles
+    for level in ("sector", "industry"):
+        boxes = groups[groups["level"] == level].set_index("name")
+        covered = tiles.assign(area=_area(tiles)).groupby(level, observed=True)["area"].sum()
+        assert covered.to_dict() == pytest.approx(dict(zip(boxes.index, _area(boxes))), rel=1e-4)
+    # Groups with no stocks get no box
+    assert "Empty" not in set(groups["name"]) and "Products" not in set(tiles["sub_industry"].dropna())
+
+
+def test_stocks_without_a_cap_get_the_median():
+    tiles, _ = treemap_layout(QuoteTable(TREE))
+    weights = dict(zip(tiles["symbol"], tiles["weight"]))
+    assert weights["NEWCO"] == np.median([300, 100, 200, 400, 300])
+    assert weights["RIL"] == 400
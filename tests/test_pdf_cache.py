@@ -0,0 +1,38 @@
+# test_pdf_cache.py
+import os
+
+from equity_research_template import pdf_cache
+from equity_research_template.pdf_cache import PdfCache, report_digest
+
+REPORT = {"company_name": "ABC Ltd", "ticker": "ABC", "report_date": "2025-10-17", "conclusion": "Buy."}
+
+
+def test_hits_and_misses_by_content(tmp_path, monkeypatch):
+    cache = PdfCache(str(tmp_path))
+    pdf, cached = cache.get_or_render(REPORT)
+    assert pdf.startswith(b"%PDF") and not cached
+    # Same content, a different dict, and fields the PDF does not show changed: a hit
+    assert cache.get_or_render({**REPORT, "notes": "not rendered"}) == (pdf, True)
+    assert cache.get_or_render({**REPORT, "conclusion": "Sell."})[1] is False
+    assert (cache.hits, cache.misses) == (1, 2)
+    # Another process sharing the folder sees the same entries
+    assert PdfCache(str(tmp_path)).get(REPORT) == pdf
+
+    # A template change invalidates every entry
+    digest = report_digest(REPORT)
+    monkeypatch.setattr(pdf_cache, "TEMPLATE_VERSION", 2)
+    assert report_digest(REPORT) != digest
+    assert cache.get(REPORT) is None
+
+
+def test_least_recently_used_evicted(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=350)
+    reports = [{**REPORT, "ticker": f"T{i}"} for i in range(3)]
+    for i, report in enumerate(reports):
+        cache.put(report, bytes(100))
+        path = cache._path(report_digest(report))
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    # Reading the oldest marks it used, so the next put evicts the second instead
+    assert cache.get(reports[0]) == bytes(100)
+    cache.put({**REPORT, "ticker": "T3"}, bytes(100))
+    assert [cache.get(r) is not None for r in reports] == [True, False, True]
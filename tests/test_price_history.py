@@ -0,0 +1,85 @@
+# test_price_history.py
+import runpy
+import sys
+
+import numpy as np
+import pytest
+
+from stock_dashbaord import price_history
+from stock_dashbaord.price_history import PriceHistory, import_csv, lttb
+from tests.conftest import write_sectors
+
+DAY = 86400
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[437] = 25.0
+    keep = lttb(x, y, 32)
+    assert len(keep) == 32
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    assert 437 in keep
+
+
+def test_lttb_short_series_kept_whole():
+    assert lttb([0, 1, 2], [5, 6, 7], 32).tolist() == [0, 1, 2]
+    assert lttb(range(10), range(10), 2).tolist() == list(range(10))
+
+
+def test_lttb_python_and_numpy_paths_agree(monkeypatch):
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0, 1000, 5000))
+    y = np.cumsum(rng.normal(size=5000))
+    monkeypatch.setattr(price_history, "LTTB_PYTHON_MAX", len(x))
+    floats = lttb(x, y, 64)
+    monkeypatch.setattr(price_history, "LTTB_PYTHON_MAX", 0)
+    assert lttb(x, y, 64).tolist() == floats.tolist()
+
+
+def test_group_sparkline_skips_members_starting_at_zero(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.append("DELISTED", [DAY, 2 * DAY, 3 * DAY], [0.0, 0.0, 1.0])
+    assert history.group_sparkline(["DELISTED"]) == ""
+
+    history.append("TCS", [DAY, 2 * DAY, 3 * DAY], [100.0, 110.0, 120.0])
+    svg = history.group_sparkline(["DELISTED", "TCS"])
+    assert svg == history.group_sparkline(["TCS"])
+    assert "nan" not in svg and "inf" not in svg
+
+
+def test_sparklines_least_recently_used_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_history, "SPARKLINES", 2)
+    history = PriceHistory(tmp_path)
+    for symbol in ("A", "B", "C"):
+        history.append(symbol, [DAY, 2 * DAY], [1.0, 2.0])
+    history.stock_sparkline("A")
+    history.stock_sparkline("B")
+    history.stock_sparkline("A")  # A is now the most recently used
+    history.stock_sparkline("C")
+    assert list(history._sparklines) == ["A", "C"]
+
+
+def test_mock_cli_skips_stocks_without_a_symbol(workdir, monkeypatch):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC", {"market_cap": 1.0}, "HDFC"]}})
+    monkeypatch.setattr(sys, "argv", ["price_history", "--folder", "history", "mock", "--days", "5"])
+    monkeypatch.delitem(sys.modules, "stock_dashbaord.price_history")
+    runpy.run_module("stock_dashbaord.price_history", run_name="__main__")
+    assert len(PriceHistory(workdir / "history").series("HDFC")) == 5
+    assert sorted(p.name for p in (workdir / "history").iterdir()) == ["HDFC.bin"]
+
+
+def test_import_csv(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("symbol,date,close\nTCS,2025-01-01,100\nTCS,2025-01-02,101\nINFY,,50\n")
+    history = PriceHistory(tmp_path / "history")
+    assert import_csv(history, path) == 2
+    assert history.series("TCS")["price"].tolist() == [100.0, 101.0]
+
+
+def test_import_csv_without_a_date_column(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("symbol,close\nTCS,100\n")
+    with pytest.raises(ValueError, match="date \\(or timestamp\\)"):
+        import_csv(PriceHistory(tmp_path / "history"), path)
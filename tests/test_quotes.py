@@ -0,0 +1,92 @@
+# test_quotes.py
+import asyncio
+import json
+
+from stock_dashbaord.quotes import FileQuoteProvider, MockQuoteProvider, QuoteEngine
+
+
+class RecordingProvider(MockQuoteProvider):
+    """Mock quotes for symbols starting with a capital; records each batch it is asked for."""
+
+    batch_size = 2
+
+    def __init__(self, slow=(), failing=()):
+        super().__init__()
+        self.batches = []
+        self.slow, self.failing = set(slow), set(failing)
+
+    async def fetch(self, symbols):
+        self.batches.append(list(symbols))
+        if self.slow & set(symbols):
+            await asyncio.sleep(5)
+        if self.failing & set(symbols):
+            raise OSError("provider down")
+        return await super().fetch([s for s in symbols if s[0].isupper()])
+
+
+def test_quotes_cached_until_ttl_expires():
+    provider = RecordingProvider()
+    engine = QuoteEngine(provider, ttl=60)
+    first = engine.get_quotes(["TCS", "INFY", "TCS"])
+    assert set(first) == {"TCS", "INFY"}
+    assert engine.get_quotes(["INFY", "TCS"]) == first
+    assert provider.batches == [["TCS", "INFY"]]
+
+    engine.ttl = 0
+    assert engine.get_quotes(["TCS"]) == {"TCS": first["TCS"]}
+    assert provider.batches[-1] == ["TCS"]
+
+
+def test_misses_fetched_in_batches():
+    provider = RecordingProvider()
+    engine = QuoteEngine(provider, ttl=60)
+    engine.get_quotes(["TCS"])
+    quotes = engine.get_quotes(["TCS", "INFY", "WIPRO", "HCL", "unknown"])
+    assert sorted(map(sorted, provider.batches[1:])) == [["HCL", "unknown"], ["INFY", "WIPRO"]]
+    assert engine.calls == 3
+    assert set(quotes) == {"TCS", "INFY", "WIPRO", "HCL"}
+    # Unknown to the provider: remembered, not asked for again
+    engine.get_quotes(["unknown"])
+    assert engine.calls == 3
+
+
+def test_slow_and_failed_batches_return_partial_results():
+    provider = RecordingProvider(slow={"SLOW"}, failing={"DOWN"})
+    engine = QuoteEngine(provider, ttl=60, timeout=0.2)
+    quotes = engine.get_quotes(["TCS", "INFY", "SLOW", "WIPRO", "DOWN", "HCL"])
+    assert set(quotes) == {"TCS", "INFY"}
+    # Symbols of the timed-out and failed batches are retried on the next call
+    provider.slow = provider.failing = set()
+    assert set(engine.get_quotes(["TCS", "SLOW", "WIPRO", "DOWN", "HCL"])) == {"TCS", "SLOW", "WIPRO", "DOWN", "HCL"}
+    assert ["TCS"] not in provider.batches[3:]
+
+
+def test_expired_quotes_pruned():
+    engine = QuoteEngine(RecordingProvider(), ttl=60)
+    engine.get_quotes(["TCS", "INFY"])
+    engine.ttl = 0
+    engine.get_quotes(["HCL"])
+    assert list(engine._cache) == []
+    engine.ttl = 60
+    engine.get_quotes(["WIPRO"])
+    assert list(engine._cache) == ["WIPRO"]
+
+
+def test_file_provider_json_and_csv(tmp_path):
+    path = tmp_path / "quotes.json"
+    path.write_text(json.dumps({"TCS": {"price": 4000.5, "change": 1.2}}))
+    engine = QuoteEngine(FileQuoteProvider(path), ttl=0)
+    assert engine.get_quotes(["TCS", "INFY"]) == {"TCS": {"price": 4000.5, "change": 1.2}}
+
+    path = tmp_path / "quotes.csv"
+    path.write_text("symbol,price,change\nTCS,4000.5,1.2\nINFY,1500,\n")
+    provider = FileQuoteProvider(path)
+    engine = QuoteEngine(provider, ttl=0)
+    assert engine.get_quotes(["TCS", "INFY"]) == {
+        "TCS": {"price": 4000.5, "change": 1.2},
+        "INFY": {"price": 1500.0, "change": 0.0},
+    }
+    # Re-read only when the file changes
+    path.write_text("symbol,price,change\nTCS,4100,2.5\n")
+    provider._mtime -= 1
+    assert engine.get_quotes(["TCS", "INFY"]) == {"TCS": {"price": 4100.0, "change": 2.5}}
@@ -0,0 +1,90 @@
+# test_render.py
+import re
+
+from streamlit.testing.v1 import AppTest
+
+from stock_dashbaord.analytics import QuoteTable
+from stock_dashbaord.render import PAGE_SIZE, industry_html, sector_html
+
+TREE = {
+    "A": {
+        "Banks": ["HDFC", {"symbol": "SBIN", "name": "State Bank"}],
+        "IT": {"Services": ["TCS", "INFY"], "Products": []},
+        "Empty": {},
+        "New": [],
+    },
+    "B": {},
+}
+
+
+def _stocks(html):
+    return re.findall(r"<div class='stock-item'>• <span[^>]*>([^<]+)</span>", html)
+
+
+def test_sector_is_one_html_block():
+    html = sector_html("A", TREE["A"])
+    # A newline could end the HTML block and let markdown reinterpret the rest
+    assert "\n" not in html
+    assert _stocks(html) == ["HDFC", "SBIN", "TCS", "INFY"]
+    assert "📁 Services (2)" in html and "📁 Products (0)" in html
+    assert html.count("No stocks") == 2 and html.count("No sub-industries") == 1
+    assert sector_html("B", TREE["B"]) == "<p class='empty-state'>No industries added</p>"
+
+
+def test_quotes_and_rollups_drawn():
+    quotes = {"TCS": {"price": 4000, "change": 1.5}, "INFY": {"price": 1500, "change": -0.5}}
+    table = QuoteTable(TREE)
+    table.update(quotes)
+    html = industry_html("A", "IT", TREE["A"]["IT"], quotes=quotes, rollups=table.rollups())
+    assert "₹4000" in html and "▲ 1.5%" in html and "▼ 0.5%" in html
+    # Industry and sub-industry badges: mean change and advancers/decliners
+    assert html.count("▲ 0.50% · 1↑ 1↓") == 2
+
+
+def test_limit_caps_each_list():
+    industries = {"Direct": [f"D{i}" for i in range(5)], "Nested": {"Sub": [f"S{i}" for i in range(4)]}}
+    html = "".join(
+        industry_html("A", industry, sub_data, limit=lambda sub: 2 if sub is None else 3)
+        for industry, sub_data in industries.items()
+    )
+    assert _stocks(html) == ["D0", "D1", "S0", "S1", "S2"]
+    assert "… 3 more" in html and "… 1 more" in html
+
+
+def _lazy_page():
+    import streamlit as st
+
+    from stock_dashbaord.render import render_sector_card, visible_symbols
+
+    sectors = {
+        "A": {"Banks": [f"B{i}" for i in range(120)], "IT": {"Services": [f"S{i}" for i in range(3)]}},
+        "B": {"Energy": ["RIL"]},
+    }
+    for sector, industries in sectors.items():
+        render_sector_card(sector, industries)
+    st.session_state["visible"] = visible_symbols(sectors, "Lazy")
+
+
+def test_lazy_sectors_open_and_page():
+    at = AppTest.from_function(_lazy_page, default_timeout=30)
+    at.run()
+    # Collapsed: headers and counts only, no stock drawn or quoted
+    assert at.session_state["visible"] == []
+    assert at.caption[0].value == "2 industries · 1 sub-industries · 123 stocks"
+
+    at.toggle(key="open_A").set_value(True).run()
+    visible = at.session_state["visible"]
+    assert visible == [f"B{i}" for i in range(PAGE_SIZE)] + ["S0", "S1", "S2"]
+    assert _stocks("".join(m.value for m in at.markdown)) == visible
+    more = at.button(key="more_A_Banks_None")
+    assert more.label == f"Show more in Banks ({PAGE_SIZE}/120)"
+
+    more.click().run()
+    assert len(at.session_state["visible"]) == 2 * PAGE_SIZE + 3
+    at.button(key="more_A_Banks_None").click().run()
+    # The last page is short, and then there is nothing more to show
+    assert at.session_state["visible"][:120] == [f"B{i}" for i in range(120)]
+    assert not [b for b in at.button if b.key == "more_A_Banks_None"]
+
+    at.toggle(key="open_A").set_value(False).run()
+    assert at.session_state["visible"] == []
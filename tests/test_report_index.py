@@ -0,0 +1,64 @@
+# test_report_index.py
+import json
+import os
+
+from equity_research_template.report_index import ReportIndex, filter_reports, report_label
+
+
+def _write(folder, name, **fields):
+    with open(folder / name, "w") as f:
+        json.dump(fields, f)
+
+
+def test_refresh_follows_added_changed_and_removed_files(tmp_path):
+    _write(tmp_path, "tcs.json", company_name="TCS Ltd", ticker="TCS", report_date="2025-01-02", recommendation="Buy")
+    _write(tmp_path, "infy.json", company_name="Infosys", ticker="INFY", report_date="2025-01-01", target_price=1800)
+    (tmp_path / "notes.txt").write_text("not a report")
+    index = ReportIndex(str(tmp_path))
+    records = {r["file"]: r for r in index.refresh()}
+    assert set(records) == {"tcs.json", "infy.json"} and index.parsed == 2
+    assert records["infy.json"]["target_price"] == "1800"
+    assert report_label(records["tcs.json"]) == "TCS · TCS Ltd · 2025-01-02 · Buy"
+
+    # Nothing changed: nothing is parsed again
+    index.refresh()
+    assert index.parsed == 0
+
+    _write(tmp_path, "tcs.json", company_name="TCS Ltd", ticker="TCS", report_date="2025-02-01", recommendation="Sell",
+           target_price=3500)
+    os.remove(tmp_path / "infy.json")
+    _write(tmp_path, "wipro.json", company_name="Wipro", ticker="WIPRO", report_date="2025-01-15", recommendation="Hold")
+    records = {r["file"]: r for r in index.refresh()}
+    assert set(records) == {"tcs.json", "wipro.json"} and index.parsed == 2
+    assert records["tcs.json"]["recommendation"] == "Sell" and records["tcs.json"]["target_price"] == "3500"
+
+    # A new process reads the stored index and has nothing to parse
+    reopened = ReportIndex(str(tmp_path))
+    assert {r["file"]: r for r in reopened.refresh()} == records and reopened.parsed == 0
+
+
+def test_unreadable_report_skipped_until_fixed(tmp_path):
+    (tmp_path / "half.json").write_text('{"ticker": "TC')
+    index = ReportIndex(str(tmp_path))
+    assert index.refresh() == []
+    _write(tmp_path, "half.json", ticker="TCS")
+    assert [r["ticker"] for r in index.refresh()] == ["TCS"]
+
+
+def test_record_saved_and_filters(tmp_path):
+    index = ReportIndex(str(tmp_path))
+    for name, ticker, company, date, rating in (
+        ("a.json", "TCS", "Tata Consultancy", "2025-01-02", "Buy"),
+        ("b.json", "TATAMOTORS", "Tata Motors", "2025-03-01", "Sell"),
+        ("c.json", "INFY", "Infosys", "2025-02-01", "Buy"),
+    ):
+        data = {"ticker": ticker, "company_name": company, "report_date": date, "recommendation": rating}
+        _write(tmp_path, name, **data)
+        index.record_saved(name, data)
+    records = index.refresh()
+    # record_saved stamped each file as written, so refresh parses none of them
+    assert index.parsed == 0
+
+    assert [r["file"] for r in filter_reports(records, "tata")] == ["b.json", "a.json"]
+    assert [r["file"] for r in filter_reports(records, ratings=["Buy"], sort="Ticker")] == ["c.json", "a.json"]
+    assert [r["file"] for r in filter_reports(records, sort="Rating")] == ["c.json", "a.json", "b.json"]
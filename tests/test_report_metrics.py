@@ -0,0 +1,65 @@
+# test_report_metrics.py
+import json
+import operator
+import re
+
+import numpy as np
+import pytest
+
+from equity_research_template.report_index import ReportIndex
+from equity_research_template.report_metrics import MetricsIndex, metric_name, parse_number, parse_screen
+
+
+def test_parse_screen_precedence():
+    assert parse_screen("pe_fy26e < 20 and roe > 10% or target_price > cmp") == (
+        "or",
+        ("and",
+         ("cmp", operator.lt, ("metric", "pe_fy26e"), ("value", 20.0)),
+         ("cmp", operator.gt, ("metric", "roe"), ("value", 10.0))),
+        ("cmp", operator.gt, ("metric", "target_price"), ("metric", "cmp")),
+    )
+
+
+def test_parse_screen_parentheses():
+    tree = parse_screen("pe < 20 AND (roe >= 15 OR debt_equity != 0)")
+    assert tree[0] == "and"
+    assert tree[2][0] == "or"
+    assert tree[2][2] == ("cmp", operator.ne, ("metric", "debt_equity"), ("value", 0.0))
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("pe <", "Expected a metric or number"),
+    ("pe 20", "Expected a comparison"),
+    ("(pe < 20", "Unbalanced parentheses"),
+    ("pe < 20 )", "Unexpected ')'"),
+    ("pe < 20 and", "Expected a metric or number"),
+])
+def test_parse_screen_errors(expression, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        parse_screen(expression)
+
+
+def test_numbers_and_metric_names():
+    assert parse_number("1,234.5") == 1234.5
+    assert parse_number("10%") == 10.0
+    assert parse_number("(3.2)") == -3.2
+    assert parse_number("n/a") is None
+    assert metric_name("P/E FY26E") == "pe_fy26e"
+
+
+def test_saved_metrics_round_trip_without_pickle(tmp_path):
+    for name, cmp, target in (("a.json", "100", "120"), ("b.json", "50", "45"), ("c.json", "10", "20")):
+        with open(tmp_path / name, "w") as f:
+            json.dump({"cmp": cmp, "target_price": target}, f)
+    index = MetricsIndex(str(tmp_path))
+    index.sync(ReportIndex(str(tmp_path)).refresh())
+    (tmp_path / "c.json").unlink()
+    index.sync(ReportIndex(str(tmp_path)).refresh())
+    index.save()
+    with np.load(index.path, allow_pickle=False) as saved:
+        assert all(saved[name].dtype != object for name in saved.files)
+
+    loaded = MetricsIndex(str(tmp_path))
+    assert (loaded.columns, loaded.rows, loaded.stamps) == (index.columns, index.rows, index.stamps)
+    assert loaded.screen("target_price > cmp")[0] == ["a.json"]
+    assert loaded.sync(ReportIndex(str(tmp_path)).refresh()) == 0
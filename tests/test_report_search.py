@@ -0,0 +1,77 @@
+# test_report_search.py
+import json
+
+import numpy as np
+
+from equity_research_template.report_index import ReportIndex
+from equity_research_template.report_search import SearchIndex, parse_query, snippet
+
+
+def test_parse_query():
+    assert parse_query('risk:"oil price" crude Thesis:margins pre-tax ratio:1.5') == [
+        ("risk_analysis", ("oil", "price")),
+        (None, ("crude",)),
+        ("investment_thesis", ("margins",)),
+        (None, ("pre", "tax")),
+        (None, ("ratio", "1", "5")),
+    ]
+    assert parse_query("  ") == []
+
+
+def _search_index(folder, reports):
+    for name, fields in reports.items():
+        with open(folder / name, "w") as f:
+            json.dump({"company_name": name[:-5], **fields}, f)
+    index = SearchIndex(str(folder))
+    index.sync(ReportIndex(str(folder)).refresh())
+    return index
+
+
+def test_bm25_ranking_and_phrases(tmp_path):
+    index = _search_index(tmp_path, {
+        "oil.json": {"risk_analysis": "Crude oil price swings. Oil price volatility hits margins. Oil oil."},
+        "once.json": {"risk_analysis": "A long note on many things, including the price of oil once, among other risks."},
+        "apart.json": {"risk_analysis": "The price of crude and oil majors.", "conclusion": "Buy."},
+        "bank.json": {"investment_thesis": "Deposit growth and oil price stability.", "risk_analysis": "Credit costs."},
+    })
+    ranking = [name for name, _, _ in index.search("oil")]
+    assert ranking[0] == "oil.json"
+    # Same term frequency: the shorter section ranks higher
+    assert ranking.index("apart.json") < ranking.index("once.json")
+    # The phrase needs the words adjacent and in order
+    assert {name for name, _, _ in index.search('"oil price"')} == {"oil.json", "bank.json"}
+    # ...and a section prefix restricts it to that section
+    assert [name for name, _, _ in index.search('risk:"oil price"')] == ["oil.json"]
+    # Every clause must match, unless no report has them all
+    assert [name for name, _, _ in index.search("crude majors")] == ["apart.json"]
+    assert index.search("deposit credit") and index.search("nothing matches this") == []
+
+
+def test_snippet_points_at_the_match():
+    report = {"risk_analysis": "Margins depend on the crude oil price and refining spreads."}
+    assert snippet(report, parse_query('"oil price"')) == (
+        "Risk Analysis", "Margins depend on the crude **oil** **price** and refining spreads",
+    )
+
+
+def test_saved_index_round_trips_without_pickle(tmp_path):
+    index = _search_index(tmp_path, {
+        "oil.json": {"risk_analysis": "Crude oil price swings."},
+        "bank.json": {"investment_thesis": "Deposit growth and oil price stability."},
+        "gone.json": {"conclusion": "Sell."},
+    })
+    index._flush(force_merge=True)
+    (tmp_path / "gone.json").unlink()
+    with open(tmp_path / "new.json", "w") as f:
+        json.dump({"valuation": "Cheap on oil price assumptions."}, f)
+    index.sync(ReportIndex(str(tmp_path)).refresh())
+    assert len(index.base.e_doc) and index._delta_docs
+    index.save()
+    with np.load(index.path, allow_pickle=False) as saved:
+        assert all(saved[name].dtype != object for name in saved.files)
+
+    loaded = SearchIndex(str(tmp_path))
+    assert (loaded.files, loaded.stamps, loaded.vocab) == (index.files, index.stamps, index.vocab)
+    assert loaded.search('"oil price"') == index.search('"oil price"')
+    # Nothing to reindex on the next sync
+    assert loaded.sync(ReportIndex(str(tmp_path)).refresh()) == 0
@@ -0,0 +1,49 @@
+# test_report_store.py
+import json
+import os
+import threading
+
+import pytest
+
+from equity_research_template.report_index import load_report
+from equity_research_template.report_store import ObjectStore, folder_lock, gc, pack, write_report
+
+THESIS = "Margins expand as the refining cycle turns. " * 10
+
+
+@pytest.fixture
+def sections(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTS_STORAGE", "sections")
+    return str(tmp_path)
+
+
+def _report(date, thesis=THESIS):
+    return {"company_name": "ABC Ltd", "report_date": date, "investment_thesis": thesis, "risk_analysis": "Crude. " * 20}
+
+
+def test_gc_keeps_what_manifests_need(sections):
+    write_report(sections, "abc_1.json", _report("2025-10-15"))
+    write_report(sections, "abc_2.json", _report("2025-10-16", THESIS + "Capex guidance raised."), "abc_1.json")
+    write_report(sections, "abc_3.json", _report("2025-10-17", "Rewritten from scratch. " * 10), "abc_2.json")
+    assert gc(sections) == 0
+
+    os.unlink(os.path.join(sections, "abc_3.json"))
+    assert gc(sections) > 0
+    assert load_report(os.path.join(sections, "abc_2.json"))["investment_thesis"] == THESIS + "Capex guidance raised."
+
+
+def test_gc_waits_for_a_save_in_progress(sections):
+    write_report(sections, "abc_1.json", _report("2025-10-15"))
+    os.unlink(os.path.join(sections, "abc_1.json"))  # its objects are unreferenced now
+    collector = threading.Thread(target=gc, args=(sections,))
+    with folder_lock(sections):
+        # What write_report does under the lock: pack reuses the existing objects, then the manifest lands
+        collector.start()
+        manifest = pack(sections, _report("2025-10-16"))
+        assert not ObjectStore(sections).all().keys() - set(manifest["sections"].values())
+        collector.join(0.2)
+        assert collector.is_alive()
+        with open(os.path.join(sections, "abc_2.json"), "w") as f:
+            json.dump(manifest, f)
+    collector.join(5)
+    assert set(manifest["sections"].values()) <= ObjectStore(sections).all().keys()
@@ -0,0 +1,103 @@
+# test_sqlite_store.py
+import threading
+
+from stock_dashbaord.history import History
+from stock_dashbaord.shared_model import SharedHierarchy
+from stock_dashbaord.sqlite_store import SqliteStore, migrate_json
+from tests.conftest import write_sectors
+
+
+def test_etag_survives_reopen(workdir):
+    store = SqliteStore("sectors.db")
+    store.load()
+    store.append(None, {"op": "add_sector", "path": ["A"]})
+    tag = store.etag
+    store.conn.close()
+
+    reopened = SqliteStore("sectors.db")
+    assert reopened.load() == {"A": {}}
+    assert reopened.etag == tag
+
+
+def test_etag_differs_for_different_trees_across_reopen(workdir):
+    store = SqliteStore("sectors.db")
+    store.load()
+    store.append(None, {"op": "add_sector", "path": ["A"]})
+    first = store.etag
+    store.conn.close()
+
+    store = SqliteStore("sectors.db")
+    store.load()
+    store.append(None, {"op": "add_sector", "path": ["B"]})
+    assert store.etag != first
+
+
+def test_etag_differs_between_recreated_databases(workdir):
+    one = SqliteStore("one.db")
+    one.save({"A": {}})
+    two = SqliteStore("two.db")
+    two.save({"B": {}})
+    assert one.etag != two.etag
+
+
+def test_etag_seen_by_other_connection(workdir):
+    writer = SqliteStore("sectors.db")
+    reader = SqliteStore("sectors.db")
+    reader.load()
+    writer.load()
+    writer.append(None, {"op": "add_sector", "path": ["A"]})
+    assert reader.changes() is None
+    reader.load()
+    assert reader.etag == writer.etag
+
+
+def test_migrate_json(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC", {"symbol": "ICICI", "name": "ICICI Bank"}],
+                                  "IT": {"Services": ["TCS"]}}})
+    store = migrate_json(["sectors.json"], "sectors.db")
+    assert store.load() == {"A": {"Banks": ["HDFC", {"symbol": "ICICI", "name": "ICICI Bank"}],
+                                  "IT": {"Services": ["TCS"]}}}
+    assert store.etag.endswith("-1")
+
+
+def test_stocks_match_case_insensitively(workdir):
+    store = SqliteStore("sectors.db")
+    store.save({"A": {"Banks": ["HDFC"]}})
+    store.append(None, {"op": "add_stock", "path": ["A", "Banks"], "stock": "hdfc "})
+    assert store.load() == {"A": {"Banks": ["HDFC"]}}
+    store.append(None, {"op": "delete_stock", "path": ["A", "Banks"], "stock": "Hdfc"})
+    assert store.load() == {"A": {"Banks": []}}
+
+
+def test_commit_is_atomic_across_processes(workdir):
+    SqliteStore("sectors.db").save({"A": {"Banks": []}})
+    model = SharedHierarchy(SqliteStore("sectors.db"), History())
+    other = SqliteStore("sectors.db")
+    other.load()
+    caught_up = model.store.changes
+    writer = threading.Thread(
+        target=other.append, args=(None, {"op": "add_stock", "path": ["A", "Banks"], "stock": "SBIN"}),
+    )
+
+    def changes():
+        # Another process commits right after this one has caught up
+        ops = caught_up()
+        writer.start()
+        writer.join(0.2)
+        return ops
+
+    model.store.changes = changes
+    model.commit({"op": "add_stock", "path": ["A", "Banks"], "stock": "HDFC"})
+    model.store.changes = caught_up
+    writer.join(5)
+    # The other write waited for this commit, so the model sees it as a later change
+    assert model.stale()
+    assert model.snapshot()[0] == {"A": {"Banks": ["HDFC", "SBIN"]}}
+
+
+def test_find_symbol_matches_like_apply_op(workdir):
+    store = SqliteStore("sectors.db")
+    store.save({"A": {"Banks": ["HDFC"], "IT": {"Services": [{"symbol": "tcs", "name": "TCS"}]}}})
+    assert store.find_symbol(" hdfc") == [["A", "Banks"]]
+    assert store.find_symbol("TCS") == [["A", "IT", "Services"]]
+    assert store.find_symbol("INFY") == []
@@ -0,0 +1,93 @@
+# test_storage.py
+import json
+
+from stock_dashbaord import storage
+from stock_dashbaord.storage import JsonStore, apply_op, apply_op_cow
+from stock_dashbaord.symbol_index import SymbolIndex, accepts_stocks
+from tests.conftest import write_sectors
+
+
+def test_stocks_match_case_insensitively_like_the_index():
+    sectors = {"A": {"Banks": ["HDFC", {"symbol": "SBIN", "name": "State Bank"}]}}
+    index = SymbolIndex(sectors)
+    for op in ({"op": "add_stock", "path": ["A", "Banks"], "stock": " hdfc"},
+               {"op": "add_stock", "path": ["A", "Banks"], "stock": "sbin"}):
+        assert ("A", "Banks") in index.locate(op["stock"])
+        index.apply(sectors, op)
+        apply_op(sectors, op)
+    assert sectors == {"A": {"Banks": ["HDFC", {"symbol": "SBIN", "name": "State Bank"}]}}
+
+    op = {"op": "delete_stock", "path": ["A", "Banks"], "stock": "Sbin"}
+    index.apply(sectors, op)
+    apply_op(sectors, op)
+    assert sectors == {"A": {"Banks": ["HDFC"]}}
+    assert index.locate("SBIN") == []
+
+
+def test_accepts_stocks():
+    sectors = {"A": {"Banks": ["HDFC"], "IT": {"Services": []}, "Empty": {}}}
+    assert accepts_stocks(sectors, ("A", "Banks"))
+    assert accepts_stocks(sectors, ("A", "Empty"))
+    assert accepts_stocks(sectors, ("A", "IT", "Services"))
+    assert not accepts_stocks(sectors, ("A", "IT"))
+    assert not accepts_stocks(sectors, ("A", "Banks", "Private"))
+    assert not accepts_stocks(sectors, ("B", "Banks"))
+
+
+def test_cow_apply_leaves_the_old_tree_alone():
+    old = {"A": {"Banks": ["HDFC"]}, "B": {"IT": {"Services": ["TCS"]}}}
+    new = apply_op_cow(old, {"op": "add_stock", "path": ["A", "Banks"], "stock": "SBIN"})
+    assert old == {"A": {"Banks": ["HDFC"]}, "B": {"IT": {"Services": ["TCS"]}}}
+    assert new["A"]["Banks"] == ["HDFC", "SBIN"]
+    assert new["B"] is old["B"]
+
+
+def _append(store, data, op):
+    apply_op(data, op)
+    store.append(data, op)
+
+
+def test_journal_replayed_on_load(workdir):
+    write_sectors(workdir, {"A": {"Banks": ["HDFC"]}})
+    store = JsonStore()
+    data = store.load()
+    _append(store, data, {"op": "add_stock", "path": ["A", "Banks"], "stock": "SBIN"})
+    _append(store, data, {"op": "add_sector", "path": ["B"]})
+    assert json.loads((workdir / "sectors.json").read_text()) == {"A": {"Banks": ["HDFC"]}}
+    assert JsonStore().load() == {"A": {"Banks": ["HDFC", "SBIN"]}, "B": {}}
+
+
+def test_torn_journal_line_is_ignored(workdir):
+    write_sectors(workdir, {"A": {}})
+    with open(workdir / "sectors.journal", "w") as f:
+        f.write('{"op":"add_industry","path":["A","Banks"]}\n{"op":"add_indus')
+    assert JsonStore().load() == {"A": {"Banks": {}}}
+
+
+def test_journal_folded_into_snapshot(workdir, monkeypatch):
+    monkeypatch.setattr(storage, "COMPACT_THRESHOLD_BYTES", 200)
+    write_sectors(workdir, {"A": {"Banks": []}})
+    store = JsonStore()
+    data = store.load()
+    for n in range(10):
+        _append(store, data, {"op": "add_stock", "path": ["A", "Banks"], "stock": f"S{n}"})
+    journal = workdir / "sectors.journal"
+    assert not journal.exists() or journal.stat().st_size <= 200
+    snapshot = json.loads((workdir / "sectors.json").read_text())
+    assert len(snapshot["A"]["Banks"]) > 1
+    assert JsonStore().load() == data
+
+
+def test_changes_from_another_writer(workdir):
+    write_sectors(workdir, {"A": {}})
+    mine, theirs = JsonStore(), JsonStore()
+    mine.load()
+    data = theirs.load()
+    op = {"op": "add_industry", "path": ["A", "Banks"]}
+    _append(theirs, data, op)
+    assert mine.changes() == [op]
+    assert mine.changes() == []
+    assert mine.etag == theirs.etag
+
+    theirs.save(data)
+    assert mine.changes() is None  # the snapshot was replaced: reload